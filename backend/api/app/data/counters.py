@@ -0,0 +1,51 @@
+import asyncio
+
+from app.data.models.post import CloneModel, LikeModel, PostModel
+from app.data.models.user import UserModel, user_following
+from core.config.database_config import SessionLocal
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+
+def reconcile_post_counters(db: Session) -> int:
+    likes = select(func.count(LikeModel.id)).where(
+        LikeModel.post_id == PostModel.id).scalar_subquery()
+    clones = select(func.count(CloneModel.id)).where(
+        CloneModel.post_id == PostModel.id).scalar_subquery()
+
+    result = db.execute(
+        update(PostModel)
+        .where(or_(PostModel.like_count != likes, PostModel.clone_count != clones))
+        .values(like_count=likes, clone_count=clones)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def reconcile_follow_counters(db: Session) -> int:
+    followers = select(func.count(user_following.c.follower_id)).where(
+        user_following.c.following_id == UserModel.id).scalar_subquery()
+    following = select(func.count(user_following.c.following_id)).where(
+        user_following.c.follower_id == UserModel.id).scalar_subquery()
+
+    result = db.execute(
+        update(UserModel)
+        .where(or_(UserModel.followers_count != followers, UserModel.following_count != following))
+        .values(followers_count=followers, following_count=following)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+async def main():
+    async with SessionLocal() as db:
+        repaired = await db.run_sync(reconcile_post_counters)
+        print(f'Repaired counters on {repaired} posts')
+        repaired = await db.run_sync(reconcile_follow_counters)
+        print(f'Repaired counters on {repaired} users')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -5,9 +5,10 @@ from abc import ABC, abstractmethod
 import jwt
 from app.data.models.user import UserModel
 from app.domain.entities.auth import Auth, AuthEntity
-from core.common.password import verify_password
+from core.common.password import verify_and_update_password
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
@@ -21,15 +22,19 @@ class AuthLocalDataSource(ABC):
                 
 class AuthLocalDataSourceImpl(AuthLocalDataSource):
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         
     async def get_token(self, auth: Auth) -> AuthEntity:
-        _user = self.db.query(UserModel).filter(UserModel.email == auth.email).first()
+        _user = await self.db.scalar(select(UserModel).where(UserModel.email == auth.email))
         if _user is None:
             raise CacheException("No user is found exists")
-        if not verify_password(auth.password, _user.password):
+        verified, new_hash = await verify_and_update_password(auth.password, _user.password)
+        if not verified:
             raise CacheException("Invalid password")
+        if new_hash is not None:
+            _user.password = new_hash
+            await self.db.commit()
         expire = datetime.datetime.utcnow() + datetime.timedelta(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
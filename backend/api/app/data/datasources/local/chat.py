@@ -1,30 +1,75 @@
-import os
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
-import requests
 from app.data.datasources.remote.ai import AiGeneration
-from app.data.models.chat import ChatModel
+from app.data.datasources.remote.generation import generate
+from app.data.models.chat import ChatMessageModel, ChatModel, chat_preview
 from app.data.models.user import UserModel
-from app.domain.entities.chat import ChatEntity, Notify
+from app.domain.entities.chat import ChatEntity, ChatSummaryEntity, Notify
 from app.domain.entities.message import Message, MessageEntity
-from cloudinary.uploader import upload
+from core.common.cursor import decode_cursor
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, desc, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only
+
+
+def chat_message_rows(chat_id: str, first_seq: int, messages: List[MessageEntity]) -> List[ChatMessageModel]:
+    rows = []
+    for seq, message in enumerate(messages, start=first_seq):
+        message.seq = seq
+        rows.append(ChatMessageModel(
+            chat_id=chat_id,
+            seq=seq,
+            id=message.id,
+            sender=message.sender,
+            content=message.content,
+            date=message.date
+        ))
+    return rows
+
+
+async def append_chat_messages(db: AsyncSession, chat_id: str, messages: List[MessageEntity]):
+    await db.execute(
+        update(ChatModel)
+        .where(ChatModel.id == chat_id)
+        .values(
+            message_count=ChatModel.message_count + len(messages),
+            last_message=chat_preview(message.content for message in messages),
+            updated_at=messages[-1].date
+        )
+        .execution_options(synchronize_session=False)
+    )
+    last_seq = await db.scalar(select(ChatModel.message_count).where(ChatModel.id == chat_id))
+    db.add_all(chat_message_rows(chat_id, last_seq - len(messages) + 1, messages))
+
 
-baseUrl = os.getenv("BASE_URL")
+def chat_message_json(row: ChatMessageModel) -> str:
+    return MessageEntity(
+        id=row.id,
+        sender=row.sender,
+        content=row.content,
+        date=row.date,
+        seq=row.seq
+    ).to_json()
 
 
 class ChatLocalDataSource(ABC):
     @abstractmethod
-    async def get_chat(self, chat_id: str) -> ChatEntity:
+    async def get_chat(self, chat_id: str, before: Optional[int] = None, after: Optional[int] = None,
+                       limit: Optional[int] = None) -> ChatEntity:
         ...
 
     @abstractmethod
     async def get_chats(self, user_id) -> List[ChatEntity]:
         ...
 
+    @abstractmethod
+    async def get_chat_summaries(self, user_id: str, cursor: Optional[str] = None,
+                                 limit: Optional[int] = None) -> List[ChatSummaryEntity]:
+        ...
+
     @abstractmethod
     async def create_chat(self, message: Message):
         ...
@@ -35,38 +80,98 @@ class ChatLocalDataSource(ABC):
 
 
 class ChatLocalDataSourceImpl(ChatLocalDataSource):
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, ai_generation: AiGeneration = None):
         self.db = db
+        self.ai_generation = ai_generation or AiGeneration()
 
-    async def get_chat(self, chat_id: str) -> ChatEntity:
-        existing_chat = self.db.query(ChatModel).filter(
-            ChatModel.id == chat_id).first()
+    async def get_chat(self, chat_id: str, before: Optional[int] = None, after: Optional[int] = None,
+                       limit: Optional[int] = None) -> ChatEntity:
+        existing_chat = await self.db.scalar(select(ChatModel).where(
+            ChatModel.id == chat_id))
         if not existing_chat:
             raise CacheException("Chat does not exist")
 
+        query = select(ChatMessageModel).where(ChatMessageModel.chat_id == chat_id)
+        if before is not None:
+            query = query.where(ChatMessageModel.seq < before)
+        if after is not None:
+            query = query.where(ChatMessageModel.seq > after)
+        forward = after is not None and before is None
+        query = query.order_by(ChatMessageModel.seq if forward else ChatMessageModel.seq.desc())
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = (await self.db.scalars(query)).all()
+        if not forward:
+            rows = rows[::-1]
+
+        next_cursor = None
+        if limit is not None and rows and len(rows) == limit:
+            next_cursor = rows[-1].seq if forward else rows[0].seq
+
         return ChatEntity(
             id=existing_chat.id,
             title=existing_chat.title,
             user_id=existing_chat.user_id,
-            messages=existing_chat.messages
+            messages=[chat_message_json(row) for row in rows],
+            next_cursor=next_cursor
         )
 
     async def get_chats(self, user_id: str) -> List[ChatEntity]:
-        existing_chats = self.db.query(ChatModel).filter(
-            ChatModel.user_id == user_id).all()
+        existing_chats = (await self.db.scalars(select(ChatModel).options(
+            defer(ChatModel.messages)).where(ChatModel.user_id == user_id))).all()
+        messages = {chat.id: [] for chat in existing_chats}
+        if messages:
+            rows = await self.db.scalars(
+                select(ChatMessageModel)
+                .where(ChatMessageModel.chat_id.in_(messages))
+                .order_by(ChatMessageModel.chat_id, ChatMessageModel.seq)
+            )
+            for row in rows:
+                messages[row.chat_id].append(chat_message_json(row))
         filtered_chats = [
             ChatEntity(
                 id=chat.id,
                 title=chat.title,
                 user_id=chat.user_id,
-                messages=chat.messages
+                messages=messages[chat.id]
             ) for chat in existing_chats
         ]
         return filtered_chats
 
+    async def get_chat_summaries(self, user_id: str, cursor: Optional[str] = None,
+                                 limit: Optional[int] = None) -> List[ChatSummaryEntity]:
+        query = select(ChatModel).options(load_only(
+            ChatModel.id, ChatModel.title, ChatModel.last_message,
+            ChatModel.updated_at, ChatModel.message_count
+        )).where(ChatModel.user_id == user_id)
+        if cursor:
+            try:
+                updated_at, chat_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise CacheException(str(e))
+            query = query.where(or_(
+                ChatModel.updated_at < updated_at,
+                and_(ChatModel.updated_at == updated_at, ChatModel.id < chat_id)
+            ))
+        query = query.order_by(desc(ChatModel.updated_at), desc(ChatModel.id))
+        if limit is not None:
+            query = query.limit(limit)
+
+        chats = (await self.db.scalars(query)).all()
+        return [
+            ChatSummaryEntity(
+                id=chat.id,
+                title=chat.title,
+                last_message=chat.last_message or '',
+                updated_at=chat.updated_at,
+                message_count=chat.message_count
+            ) for chat in chats
+        ]
+
     async def create_chat(self, message: Message):
-        exits_user = self.db.query(UserModel).filter(
-            UserModel.id == message.user_id).first()
+        exits_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == message.user_id))
         if not exits_user:
             raise CacheException("No user found")
 
@@ -75,101 +180,15 @@ class ChatLocalDataSourceImpl(ChatLocalDataSource):
         if 'prompt' not in message.payload:
             raise CacheException("No prompt found")
 
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json"
-        }
-
-        ai_generation = AiGeneration(requests, upload)
-        response = ""
-        userImage = ''
-        chatResponse = ''
-        analysis = {'title': '', 'detail': ''}
-        threeD = ""
+        generation = await generate(self.ai_generation, message.model, message.payload)
         aiMessageID = str(uuid4())
         chat_id = str(uuid4())
 
-        if message.model == 'text_to_image':
-            url = f"{baseUrl}/text-to-image"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-            except Exception as e:
-                raise CacheException("Error getting image")
-        elif message.model == 'image_to_image':
-            url = f"{baseUrl}/image-to-image"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'controlNet':
-            url = f"{baseUrl}/controlnet"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'painting':
-            url = f"{baseUrl}/inpaint"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'instruction':
-            url = f"{baseUrl}/instruct"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'image_variant':
-            try:
-                response = await ai_generation.image_variant(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image variant")
-        elif message.model == 'image_from_text':
-            try:
-                response = await ai_generation.create_from_text(message.payload)
-            except:
-                raise CacheException("Error getting image from text")
-        elif message.model == 'edit_image':
-            try:
-                response = await ai_generation.create_from_image(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image edit")
-        elif message.model == 'chatbot':
-            try:
-                chatResponse = await ai_generation.chatbot(message.payload)
-            except:
-                raise CacheException("Chatbot error")
-        elif message.model == 'analysis':
-            try:
-                analysis = await ai_generation.analysis(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Analysis error")
-        elif message.model == 'text_to_3D':
-            try:
-                threeD = await ai_generation.text_to_threeD(message.payload)
-            except:
-                raise CacheException("3D error from text")
-        elif message.model == 'image_to_3D':
-            try:
-                threeD = await ai_generation.image_to_threeD(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("3D error")
-        else:
-            raise CacheException("Model not found")
-
         message_from_user = MessageEntity(
             id=str(uuid4()),
             content={
                 'prompt': message.payload['prompt'],
-                'imageUser': userImage,
+                'imageUser': generation.user_image,
                 'imageAI': '',
                 'model': message.model,
                 'analysis': {},
@@ -183,7 +202,6 @@ class ChatLocalDataSourceImpl(ChatLocalDataSource):
         chat = ChatModel(
             id=chat_id,
             user_id=message.user_id,
-            messages=[message_from_user.to_json()],
             title=message.payload['prompt'][:128],
         )
 
@@ -192,40 +210,46 @@ class ChatLocalDataSourceImpl(ChatLocalDataSource):
             content={
                 'prompt': '',
                 'imageUser': '',
-                'imageAI': response,
+                'imageAI': generation.image,
                 'model': message.model,
-                'analysis': analysis,
-                '3D':  {'status': 'success', 'fetch_result': threeD},
-                'chat': chatResponse
+                'analysis': generation.analysis,
+                '3D':  {'status': 'success', 'fetch_result': generation.threeD},
+                'chat': generation.chat
             },
             sender='ai',
             date=date
         )
 
-        chat.add_message(message_from_ai.to_json())
+        new_messages = [message_from_user, message_from_ai]
+        chat.message_count = len(new_messages)
+        chat.last_message = chat_preview(new_message.content for new_message in new_messages)
+        chat.updated_at = date
 
         self.db.add(chat)
-        self.db.commit()
+        await self.db.flush()
+        self.db.add_all(chat_message_rows(chat_id, 1, new_messages))
+        await self.db.commit()
 
         return ChatEntity(
             id=chat.id,
             user_id=message.user_id,
             title=chat.title,
-            messages=chat.messages
+            messages=[new_message.to_json() for new_message in new_messages]
         )
 
     async def delete_chat(self, chat_id: str) -> ChatEntity:
-        existing_chat = self.db.query(ChatModel).filter(
-            ChatModel.id == chat_id).first()
+        existing_chat = await self.db.scalar(select(ChatModel).where(
+            ChatModel.id == chat_id))
         if not existing_chat:
             raise CacheException("Chat does not exist")
 
-        self.db.delete(existing_chat)
-        self.db.commit()
+        await self.db.execute(delete(ChatMessageModel).where(ChatMessageModel.chat_id == chat_id))
+        await self.db.delete(existing_chat)
+        await self.db.commit()
 
         return ChatEntity(
             id=existing_chat.id,
             title=existing_chat.title,
             user_id=existing_chat.user_id,
-            messages=existing_chat.messages
+            messages=[]
         )
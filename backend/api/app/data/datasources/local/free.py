@@ -1,12 +1,10 @@
 from abc import ABC, abstractmethod
 from uuid import uuid4
 
-import requests
 from app.data.datasources.remote.ai import AiGeneration
 from app.domain.entities.free import Free, FreeEntity
-from cloudinary.uploader import upload
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class FreeLocalDataSource(ABC):
@@ -16,14 +14,14 @@ class FreeLocalDataSource(ABC):
 
 
 class FreeLocalDataSourceImpl(FreeLocalDataSource):
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def free_chat(self, free: Free) -> FreeEntity:
         response = ""
-        ai_generation = AiGeneration(requests, upload)
+        ai_generation = AiGeneration()
         try:
-            response = await ai_generation.create_from_text({'prompt': free.prompt})
+            response = await ai_generation.create_from_text({'prompt': free.prompt, 'fresh': free.fresh})
         except Exception as e:
             print(e)
             raise CacheException("Error getting image from text")
@@ -0,0 +1,124 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from time import monotonic
+from typing import Optional
+from uuid import uuid4
+
+from app.data.datasources.remote.generation import model_handlers
+from app.data.datasources.remote.storage import is_media_url
+from app.data.jobs.notifier import JOB_SUBMITTED, job_notifier
+from app.data.models.chat import ChatModel
+from app.data.models.job import JOB_DEAD, JOB_QUEUED, JOB_SUCCEEDED, JobModel
+from app.domain.entities.job import JobEntity
+from app.domain.entities.message import Message
+from core.errors.exceptions import CacheException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_JOB_WAIT = 60
+JOB_POLL_INTERVAL = 1
+
+
+def queue_job(db: AsyncSession, kind: str, user_id: str, payload: dict,
+              chat_id: Optional[str] = None) -> JobModel:
+    job = JobModel(
+        id=str(uuid4()),
+        kind=kind,
+        user_id=user_id,
+        chat_id=chat_id,
+        payload=payload,
+        status=JOB_QUEUED,
+        attempts=0,
+        run_at=datetime.utcnow()
+    )
+    db.add(job)
+    return job
+
+
+def queue_image_variants(db: AsyncSession, target: str, target_id: str, user_id: str,
+                         image: Optional[str]) -> Optional[JobModel]:
+    if not is_media_url(image):
+        return None
+    return queue_job(db, 'image_variants', user_id, {'target': target, 'id': target_id, 'image': image})
+
+
+class JobLocalDataSource(ABC):
+
+    @abstractmethod
+    async def submit_job(self, message: Message, user_id: str, chat_id: Optional[str] = None) -> JobEntity:
+        ...
+
+    @abstractmethod
+    async def view_job(self, job_id: str, user_id: str, wait: float = 0) -> JobEntity:
+        ...
+
+    @abstractmethod
+    async def retry_job(self, job_id: str, user_id: str) -> JobEntity:
+        ...
+
+
+class JobLocalDataSourceImpl(JobLocalDataSource):
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def submit_job(self, message: Message, user_id: str, chat_id: Optional[str] = None) -> JobEntity:
+        if message.model not in model_handlers:
+            raise CacheException("Model not found")
+        if 'prompt' not in message.payload:
+            raise CacheException("No prompt found")
+        if chat_id is not None:
+            existing_chat = await self.db.scalar(select(ChatModel).where(
+                ChatModel.id == chat_id))
+            if not existing_chat:
+                raise CacheException("Chat does not exist")
+
+        job = queue_job(self.db, 'chat' if chat_id is None else 'message', user_id,
+                        {**message.dict(), 'user_id': user_id}, chat_id)
+        await self.db.commit()
+        job_notifier.notify(JOB_SUBMITTED)
+
+        return self._get_job_entity(job)
+
+    async def view_job(self, job_id: str, user_id: str, wait: float = 0) -> JobEntity:
+        job = await self._get_job(job_id, user_id)
+        deadline = monotonic() + min(wait, MAX_JOB_WAIT)
+        while job.status not in (JOB_SUCCEEDED, JOB_DEAD) and monotonic() < deadline:
+            await self.db.commit()
+            await job_notifier.wait(job_id, min(deadline - monotonic(), JOB_POLL_INTERVAL))
+            await self.db.refresh(job)
+
+        return self._get_job_entity(job)
+
+    async def retry_job(self, job_id: str, user_id: str) -> JobEntity:
+        job = await self._get_job(job_id, user_id)
+        if job.status != JOB_DEAD:
+            raise CacheException("Only dead jobs can be retried")
+
+        job.status = JOB_QUEUED
+        job.attempts = 0
+        job.run_at = datetime.utcnow()
+        await self.db.commit()
+        job_notifier.notify(JOB_SUBMITTED)
+
+        return self._get_job_entity(job)
+
+    async def _get_job(self, job_id, user_id):
+        job = await self.db.scalar(select(JobModel).where(
+            JobModel.id == job_id, JobModel.user_id == user_id))
+        if not job:
+            raise CacheException("Job not found")
+        return job
+
+    def _get_job_entity(self, job):
+        return JobEntity(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            attempts=job.attempts,
+            chat_id=job.chat_id,
+            result=job.result,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at
+        )
@@ -1,18 +1,21 @@
-import os
+import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import AsyncIterator, Tuple
 from uuid import uuid4
 
-import requests
+from app.data.datasources.local.chat import append_chat_messages
 from app.data.datasources.remote.ai import AiGeneration
+from app.data.datasources.remote.generation import Generation, generate
+from app.data.realtime import TeamChatHub, get_team_chat_hub
 from app.data.models.chat import ChatModel
 from app.data.models.user import UserModel
 from app.domain.entities.message import Message, MessageEntity
-from cloudinary.uploader import upload
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-baseUrl = os.getenv("BASE_URL")
+logger = logging.getLogger(__name__)
 
 
 class MessageLocalDataSource(ABC):
@@ -20,120 +23,82 @@ class MessageLocalDataSource(ABC):
     async def create_chat(self, message: Message, chat_id: str, user_id: str) -> MessageEntity:
         pass
 
+    @abstractmethod
+    async def stream_chat(self, message: Message, chat_id: str, user_id: str) -> AsyncIterator[Tuple[str, object]]:
+        pass
+
 
 class MessageLocalDataSourceImpl(MessageLocalDataSource):
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, ai_generation: AiGeneration = None, hub: TeamChatHub = None):
         self.db = db
+        self.ai_generation = ai_generation or AiGeneration()
+        self.hub = hub or get_team_chat_hub()
 
     async def create_chat(self, message: Message, chat_id: str, user_id: str) -> MessageEntity:
 
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
 
         date = datetime.utcnow()
         if 'prompt' not in message.payload:
             raise CacheException("No prompt found")
 
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json"
-        }
+        existing_chat = await self.db.scalar(select(ChatModel).where(
+            ChatModel.id == chat_id))
+        if not existing_chat:
+            raise CacheException("Chat does not exist")
+
+        generation = await generate(self.ai_generation, message.model, message.payload)
 
-        existing_chat = self.db.query(ChatModel).filter(
-            ChatModel.id == chat_id).first()
+        message_from_user, message_from_ai = self._message_pair(user, message, date, generation)
+        await append_chat_messages(self.db, chat_id, [message_from_user, message_from_ai])
+        await self.db.commit()
+        if message.isTeam:
+            self.hub.publish(chat_id, [message_from_user.to_dict(), message_from_ai.to_dict()])
+
+        return message_from_ai
+
+    async def stream_chat(self, message: Message, chat_id: str, user_id: str) -> AsyncIterator[Tuple[str, object]]:
+        if 'prompt' not in message.payload:
+            raise CacheException("No prompt found")
+        if message.model != 'chatbot':
+            raise CacheException("Streaming is only supported for the chatbot model")
+
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
+        existing_chat = await self.db.scalar(select(ChatModel.id).where(ChatModel.id == chat_id))
         if not existing_chat:
             raise CacheException("Chat does not exist")
 
-        ai_generation = AiGeneration(requests, upload)
-        response = ""
-        userImage = ''
-        chatResponse = ''
-        analysis = {'title': '', 'detail': ''}
-        threeD = {}
-        aiMessageID = str(uuid4())
-
-        if message.model == 'text_to_image':
-            url = f"{baseUrl}/text-to-image"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'image_to_image':
-            url = f"{baseUrl}/image-to-image"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'controlNet':
-            url = f"{baseUrl}/controlnet"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'painting':
-            url = f"{baseUrl}/inpaint"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'instruction':
-            url = f"{baseUrl}/instruct"
-            try:
-                response = await ai_generation.get_image(url, headers, message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image")
-        elif message.model == 'image_variant':
-            try:
-                response = await ai_generation.image_variant(message.payload)
-            except:
-                raise CacheException("Error getting image from variant")
-        elif message.model == 'image_from_text':
-            try:
-                response = await ai_generation.create_from_text(message.payload)
-            except:
-                raise CacheException("Error getting image from text")
-        elif message.model == 'edit_image':
-            try:
-                response = await ai_generation.image_variant(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Error getting image edit")
-        elif message.model == 'chatbot':
-            try:
-                chatResponse = await ai_generation.chatbot(message.payload)
-            except Exception as e:
-                print(e)
-                raise CacheException("Chatbot error")
-        elif message.model == 'analysis':
-            try:
-                analysis = await ai_generation.analysis(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("Analysis error")
-        elif message.model == 'text_to_3D':
-            try:
-                threeD = await ai_generation.text_to_threeD(message.payload)
-            except:
-                raise CacheException("3D error from text")
-        elif message.model == 'image_to_3D':
-            try:
-                threeD = await ai_generation.image_to_threeD(message.payload)
-                userImage = await ai_generation.upload_image(message.payload['image'])
-            except:
-                raise CacheException("3D error")
-        else:
-            raise CacheException("Model not found")
+        return self._stream_chat(user, message, chat_id)
+
+    async def _stream_chat(self, user: UserModel, message: Message, chat_id: str) -> AsyncIterator[Tuple[str, object]]:
+        date = datetime.utcnow()
+        tokens = []
+        try:
+            async for token in self.ai_generation.chatbot_stream(message.payload):
+                tokens.append(token)
+                yield 'token', token
+        except Exception:
+            logger.exception("Chatbot stream failed for chat %s", chat_id)
+            yield 'error', "Chatbot error"
+            return
+
+        message_from_user, message_from_ai = self._message_pair(
+            user, message, date, Generation(chat=''.join(tokens)))
+        await append_chat_messages(self.db, chat_id, [message_from_user, message_from_ai])
+        await self.db.commit()
+        if message.isTeam:
+            self.hub.publish(chat_id, [message_from_user.to_dict(), message_from_ai.to_dict()])
+        yield 'message', message_from_ai.to_dict()
 
+    def _message_pair(self, user: UserModel, message: Message, date: datetime,
+                      generation: Generation) -> Tuple[MessageEntity, MessageEntity]:
         message_from_user = MessageEntity(
             id=str(uuid4()),
             content={
                 'name': user.first_name,
                 'image': user.image,
                 'prompt': message.payload['prompt'],
-                'imageUser': userImage,
+                'imageUser': generation.user_image,
                 'imageAI': '',
                 'model': message.model,
                 'analysis': {},
@@ -144,33 +109,20 @@ class MessageLocalDataSourceImpl(MessageLocalDataSource):
             date=date
         )
 
-        new_chat = [i for i in existing_chat.messages]
-        new_chat.append(message_from_user.to_json())
-
         message_from_ai = MessageEntity(
-            id=aiMessageID,
+            id=str(uuid4()),
             content={
                 'name': user.first_name,
                 'image': user.image,
                 'prompt': '',
                 'imageUser': '',
-                'imageAI': response,
+                'imageAI': generation.image,
                 'model': message.model,
-                'analysis': analysis,
-                '3D':  {'status': 'success', 'fetch_result': threeD},
-                'chat': chatResponse
+                'analysis': generation.analysis,
+                '3D':  {'status': 'success', 'fetch_result': generation.threeD},
+                'chat': generation.chat
             },
             sender='ai',
             date=date
         )
-        new_chat.append(message_from_ai.to_json())
-
-        existing_chat.messages = new_chat
-
-        self.db.commit()
-        if message.isTeam:
-            url = f"https://sketch-dq5zwrwm5q-ww.a.run.app/api/teams/{chat_id}/chat"
-            requests.post(url, json={"message": message_from_user.to_dict()})
-            requests.post(url, json={"message": message_from_ai.to_dict()})
-
-        return message_from_ai
+        return message_from_user, message_from_ai
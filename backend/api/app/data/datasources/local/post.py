@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
-from app.data.models.post import CloneModel, LikeModel, PostModel
+from app.data.datasources.local.job import queue_image_variants
+from app.data.datasources.local.search import get_post_search
+from app.data.datasources.remote.derivatives import srcset
+from app.data.jobs.notifier import JOB_SUBMITTED, job_notifier
+from app.data.models.post import CloneModel, LikeModel, PostModel, PostTagModel, normalize_tags
 from app.data.models.user import UserModel
 from app.domain.entities.post import Post, PostEntity
+from core.common.cursor import decode_cursor
+from core.config.database_config import insert_ignore
 from core.errors.exceptions import CacheException
-from sqlalchemy import desc, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, desc, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class PostLocalDataSource(ABC):
@@ -17,7 +23,7 @@ class PostLocalDataSource(ABC):
         pass
 
     @abstractmethod
-    async def all_posts(self,  tags: List[str], search_word: str, skip: int, limit: int, user_id: str) -> List[PostEntity]:
+    async def all_posts(self,  tags: List[str], search_word: str, skip: int, limit: int, user_id: str, cursor: Optional[str] = None) -> List[PostEntity]:
         pass
 
     @abstractmethod
@@ -29,7 +35,7 @@ class PostLocalDataSource(ABC):
         pass
 
     @abstractmethod
-    async def view_posts(self, user_id: str) -> List[PostEntity]:
+    async def view_posts(self, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> List[PostEntity]:
         pass
 
     @abstractmethod
@@ -54,12 +60,13 @@ class PostLocalDataSource(ABC):
 
 
 class PostLocalDataSourceImpl(PostLocalDataSource):
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
+        self.search = get_post_search(db)
 
     async def create_post(self, post: Post) -> PostEntity:
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == post.userId).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == post.userId))
         if not existing_user:
             raise CacheException("User does not exist")
 
@@ -69,11 +76,16 @@ class PostLocalDataSourceImpl(PostLocalDataSource):
             content=post.content,
             image=post.image,
             user_id=post.userId,
-            tags=post.tags
+            tags=normalize_tags(post.tags),
+            post_tags=self._tag_rows(post.tags)
         )
 
         self.db.add(_post)
-        self.db.commit()
+        await self.search.index_post(self.db, _post, existing_user)
+        job = queue_image_variants(self.db, 'post', _post.id, post.userId, post.image)
+        await self.db.commit()
+        if job:
+            job_notifier.notify(JOB_SUBMITTED)
 
         return PostEntity(
             id=_post.id,
@@ -89,57 +101,57 @@ class PostLocalDataSourceImpl(PostLocalDataSource):
             isCloned=False,
             like=0,
             clone=0,
-            tags=post.tags
+            tags=_post.tags
         )
 
     async def update_post(self, post: Post, post_id: str) -> PostEntity:
-        _post = self.db.query(PostModel).filter(
-            PostModel.id == post_id).first()
+        _post = await self.db.scalar(select(PostModel).where(
+            PostModel.id == post_id))
         if not _post:
             raise CacheException("Post not found")
 
-        user = self.db.query(UserModel).filter(
-            UserModel.id == post.userId).first()
+        user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == post.userId))
 
+        job = None
+        if _post.image != post.image:
+            _post.image_variants = None
+            job = queue_image_variants(self.db, 'post', post_id, _post.user_id, post.image)
         _post.title = post.title
         _post.content = post.content
         _post.image = post.image
-        _post.tags = post.tags
+        _post.tags = normalize_tags(post.tags)
+        await self.db.execute(delete(PostTagModel).where(
+            PostTagModel.post_id == post_id))
+        for tag_row in self._tag_rows(post.tags):
+            tag_row.post_id = post_id
+            self.db.add(tag_row)
+        await self.search.index_post(self.db, _post, user)
 
-        self.db.commit()
+        await self.db.commit()
+        if job:
+            job_notifier.notify(JOB_SUBMITTED)
 
-        return PostEntity(
-            id=_post.id,
-            userId=_post.user_id,
-            image=_post.image,
-            title=_post.title,
-            content=_post.content,
-            date=_post.date,
-            userImage=user.image,
-            firstName=user.first_name,
-            lastName=user.last_name,
-            isLiked=_post.is_liked(self.db, post.userId),
-            isCloned=_post.is_cloned(self.db, post.userId),
-            like=_post.get_likes_count(self.db),
-            clone=_post.get_clones_count(self.db),
-            tags=_post.tags
-        )
+        return await self._get_post_entity(_post, post.userId)
 
     async def delete_post(self, post_id: str) -> PostEntity:
-        _post = self.db.query(PostModel).filter(
-            PostModel.id == post_id).first()
+        _post = await self.db.scalar(select(PostModel).where(
+            PostModel.id == post_id))
         if not _post:
             raise CacheException("Post not found")
 
-        self.db.query(LikeModel).filter(LikeModel.post_id == post_id).delete()
-        self.db.query(CloneModel).filter(
-            CloneModel.post_id == post_id).delete()
+        await self.db.execute(delete(LikeModel).where(LikeModel.post_id == post_id))
+        await self.db.execute(delete(CloneModel).where(
+            CloneModel.post_id == post_id))
+        await self.db.execute(delete(PostTagModel).where(
+            PostTagModel.post_id == post_id))
+        await self.search.remove_post(self.db, post_id)
 
-        self.db.delete(_post)
-        self.db.commit()
+        await self.db.delete(_post)
+        await self.db.commit()
 
-        user = self.db.query(UserModel).filter(
-            UserModel.id == _post.user_id).first()
+        user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == _post.user_id))
 
         return PostEntity(
             id=_post.id,
@@ -151,174 +163,153 @@ class PostLocalDataSourceImpl(PostLocalDataSource):
             userImage=user.image,
             firstName=user.first_name,
             lastName=user.last_name,
-            isLiked=_post.is_liked(self.db, _post.user_id),
-            isCloned=_post.is_cloned(self.db, _post.user_id),
-            like=_post.get_likes_count(self.db),
-            clone=_post.get_clones_count(self.db),
-            tags=_post.tags
+            isLiked=False,
+            isCloned=False,
+            like=0,
+            clone=0,
+            tags=_post.tags,
+            imageSrcset=srcset(_post.image_variants)
         )
 
-    async def view_posts(self, user_id) -> List[PostEntity]:
-        posts = self.db.query(PostModel).filter(
-            PostModel.user_id == user_id).all()
+    async def view_posts(self, user_id, cursor: Optional[str] = None, limit: Optional[int] = None) -> List[PostEntity]:
+        query = select(PostModel).where(PostModel.user_id == user_id)
+        query = self._after_cursor(query, cursor)
+        query = query.order_by(desc(PostModel.date), desc(PostModel.id))
+        if limit is not None:
+            query = query.limit(limit)
 
-        post_entities = []
-        for post in posts:
-            user = self.db.query(UserModel).filter(
-                UserModel.id == post.user_id).first()
-            post_entities.append(PostEntity(
-                id=post.id,
-                userId=post.user_id,
-                image=post.image,
-                firstName=user.first_name,
-                lastName=user.last_name,
-                title=post.title,
-                content=post.content,
-                userImage=user.image,
-                date=post.date,
-                isLiked=post.is_liked(self.db, post.user_id),
-                isCloned=post.is_cloned(self.db, post.user_id),
-                like=post.get_likes_count(self.db),
-                clone=post.get_clones_count(self.db),
-                tags=post.tags
-            ))
-        return post_entities
+        posts = (await self.db.scalars(query)).all()
+        return await self._get_post_entities(posts, user_id)
 
     async def view_post(self, post_id: str) -> PostEntity:
-        _post = self.db.query(PostModel).filter(
-            PostModel.id == post_id).first()
+        _post = await self.db.scalar(select(PostModel).where(
+            PostModel.id == post_id))
         if not _post:
             raise CacheException("Post not found")
 
-        user = self.db.query(UserModel).filter(
-            UserModel.id == _post.user_id).first()
-        return PostEntity(
-            id=_post.id,
-            userId=_post.user_id,
-            image=_post.image,
-            firstName=user.first_name,
-            lastName=user.last_name,
-            title=_post.title,
-            content=_post.content,
-            userImage=user.image,
-            date=_post.date,
-            isLiked=_post.is_liked(self.db, _post.user_id),
-            isCloned=_post.is_cloned(self.db, _post.user_id),
-            like=_post.get_likes_count(self.db),
-            clone=_post.get_clones_count(self.db),
-            tags=_post.tags
-        )
+        return await self._get_post_entity(_post, _post.user_id)
 
     async def like_post(self, post_id: str, user_id: str) -> PostEntity:
-        post = self.db.query(PostModel).filter(PostModel.id == post_id).first()
-        if not post:
-            raise CacheException("Post not found")
-
-        isLiked = post.is_liked(self.db, user_id)
-        if isLiked:
-            raise CacheException("Post already liked")
-
-        like = LikeModel(id=str(uuid4()), user_id=user_id, post_id=post_id)
-        self.db.add(like)
-        self.db.commit()
-        return self._get_post_entity(post, user_id)
+        return await self._add_reaction(LikeModel, PostModel.like_count, post_id, user_id)
 
     async def unlike_post(self, post_id: str, user_id: str) -> PostEntity:
-        like = self.db.query(LikeModel).filter(
-            LikeModel.post_id == post_id, LikeModel.user_id == user_id).first()
-        if not like:
-            raise CacheException("Like not found")
+        return await self._remove_reaction(LikeModel, PostModel.like_count, post_id, user_id)
 
-        self.db.delete(like)
-        self.db.commit()
+    async def clone_post(self, post_id: str, user_id: str) -> PostEntity:
+        return await self._add_reaction(CloneModel, PostModel.clone_count, post_id, user_id)
 
-        post = self.db.query(PostModel).filter(PostModel.id == post_id).first()
-        return self._get_post_entity(post, user_id)
+    async def unclone_post(self, post_id: str, user_id: str) -> PostEntity:
+        return await self._remove_reaction(CloneModel, PostModel.clone_count, post_id, user_id)
 
-    async def clone_post(self, post_id: str, user_id: str) -> PostEntity:
-        post = self.db.query(PostModel).filter(PostModel.id == post_id).first()
+    async def _add_reaction(self, model, counter, post_id, user_id):
+        post = await self.db.scalar(select(PostModel).where(PostModel.id == post_id))
         if not post:
             raise CacheException("Post not found")
 
-        isCloned = post.is_cloned(self.db, user_id)
-        if isCloned:
-            raise CacheException("Post already cloned")
-
-        clone = CloneModel(id=str(uuid4()), user_id=user_id, post_id=post_id)
-        self.db.add(clone)
-        self.db.commit()
-
-        return self._get_post_entity(post, user_id)
-
-    async def unclone_post(self, post_id: str, user_id: str) -> PostEntity:
-        clone = self.db.query(CloneModel).filter(
-            CloneModel.post_id == post_id, CloneModel.user_id == user_id).first()
-        if not clone:
-            raise CacheException("Clone not found")
+        inserted = (await self.db.execute(
+            insert_ignore(model).values(
+                id=str(uuid4()), user_id=user_id, post_id=post_id)
+        )).rowcount
+        if inserted:
+            await self._add_to_counter(counter, post_id, 1)
+        await self.db.commit()
+        await self.db.refresh(post)
 
-        self.db.delete(clone)
-        self.db.commit()
+        return await self._get_post_entity(post, user_id)
 
-        post = self.db.query(PostModel).filter(PostModel.id == post_id).first()
-        return self._get_post_entity(post, user_id)
+    async def _remove_reaction(self, model, counter, post_id, user_id):
+        post = await self.db.scalar(select(PostModel).where(PostModel.id == post_id))
+        if not post:
+            raise CacheException("Post not found")
 
-    def _get_post_entity(self, post, user_id):
-        user = self.db.query(UserModel).filter(
-            UserModel.id == post.user_id).first()
-        return PostEntity(
-            id=post.id,
-            userId=post.user_id,
-            image=post.image,
-            firstName=user.first_name,
-            lastName=user.last_name,
-            title=post.title,
-            content=post.content,
-            userImage=user.image,
-            date=post.date,
-            isLiked=post.is_liked(self.db, user_id),
-            isCloned=post.is_cloned(self.db, user_id),
-            like=post.get_likes_count(self.db),
-            clone=post.get_clones_count(self.db),
-            tags=post.tags
+        deleted = (await self.db.execute(delete(model).where(
+            model.post_id == post_id, model.user_id == user_id
+        ))).rowcount
+        if deleted:
+            await self._add_to_counter(counter, post_id, -1)
+        await self.db.commit()
+        await self.db.refresh(post)
+
+        return await self._get_post_entity(post, user_id)
+
+    async def _add_to_counter(self, counter, post_id, amount):
+        await self.db.execute(
+            update(PostModel).where(PostModel.id == post_id)
+            .values({counter: counter + amount})
+            .execution_options(synchronize_session=False)
         )
 
-    async def all_posts(self, tags: List[str], search_word: str, skip: int, limit: int, user_id: str) -> List[PostEntity]:
-        query = self.db.query(PostModel)
-        if search_word:
-            query = query.filter(
-                or_(
-                    PostModel.title.ilike(f"%{search_word}%"),
-                    UserModel.first_name.ilike(f"%{search_word}%")
-                )
-            )
-        query = query.order_by(desc(PostModel.date))
-
-        posts = posts = query.offset(skip).limit(limit).all()
+    def _after_cursor(self, query, cursor):
+        if not cursor:
+            return query
+        try:
+            date, post_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise CacheException(str(e))
+        return query.where(or_(
+            PostModel.date < date,
+            and_(PostModel.date == date, PostModel.id < post_id)
+        ))
+
+    def _tag_rows(self, tags):
+        return [PostTagModel(tag=tag) for tag in normalize_tags(tags)]
+
+    async def _get_post_entity(self, post, user_id):
+        return (await self._get_post_entities([post], user_id))[0]
+
+    async def _get_post_entities(self, posts, user_id) -> List[PostEntity]:
+        if not posts:
+            return []
+
+        post_ids = [post.id for post in posts]
+        author_ids = {post.user_id for post in posts}
+
+        users = {
+            user.id: user for user in (await self.db.scalars(select(UserModel).where(
+                UserModel.id.in_(author_ids)))).all()
+        }
+        liked = await self._viewer_post_ids(LikeModel, post_ids, user_id)
+        cloned = await self._viewer_post_ids(CloneModel, post_ids, user_id)
 
         post_entities = []
         for post in posts:
-            number_of_tags = len(tags)
-            for tag in tags:
-                if tag in post.tags:
-                    number_of_tags -= 1
-            if number_of_tags == len(tags) and tags:
-                continue
-            user = self.db.query(UserModel).filter(
-                UserModel.id == post.user_id).first()
+            user = users[post.user_id]
             post_entities.append(PostEntity(
                 id=post.id,
-                userId=user.id,
+                userId=post.user_id,
                 image=post.image,
                 firstName=user.first_name,
                 lastName=user.last_name,
                 title=post.title,
-                userImage=user.image,
                 content=post.content,
+                userImage=user.image,
                 date=post.date,
-                isLiked=post.is_liked(self.db, user_id),
-                isCloned=post.is_cloned(self.db, user_id),
-                like=post.get_likes_count(self.db),
-                clone=post.get_clones_count(self.db),
-                tags=post.tags
+                isLiked=post.id in liked,
+                isCloned=post.id in cloned,
+                like=post.like_count,
+                clone=post.clone_count,
+                tags=post.tags,
+                imageSrcset=srcset(post.image_variants)
             ))
         return post_entities
+
+    async def _viewer_post_ids(self, model, post_ids, user_id):
+        rows = await self.db.scalars(select(model.post_id).where(
+            model.user_id == user_id, model.post_id.in_(post_ids)))
+        return set(rows.all())
+
+    async def all_posts(self, tags: List[str], search_word: str, skip: int, limit: int, user_id: str, cursor: Optional[str] = None) -> List[PostEntity]:
+        query = select(PostModel)
+        if tags:
+            query = query.where(
+                PostModel.post_tags.any(PostTagModel.tag.in_(normalize_tags(tags))))
+        if search_word:
+            query = self.search.apply(query, search_word)
+        query = query.order_by(desc(PostModel.date), desc(PostModel.id))
+        if cursor and not search_word:
+            query = self._after_cursor(query, cursor)
+        else:
+            query = query.offset(skip)
+
+        posts = (await self.db.scalars(query.limit(limit))).all()
+        return await self._get_post_entities(posts, user_id)
@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+
+from app.data.models.post import PostModel
+from app.data.models.user import UserModel
+from sqlalchemy import column, desc, literal_column, or_, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class PostSearch(ABC):
+
+    @abstractmethod
+    def apply(self, query, search_word: str):
+        ...
+
+    def upgrade(self, db: Session):
+        pass
+
+    async def index_post(self, db: AsyncSession, post: PostModel, user: UserModel):
+        pass
+
+    async def index_user(self, db: AsyncSession, user: UserModel):
+        pass
+
+    async def remove_post(self, db: AsyncSession, post_id: str):
+        pass
+
+
+class MySQLFullTextSearch(PostSearch):
+
+    def apply(self, query, search_word: str):
+        post_score = match(PostModel.title, PostModel.content, against=search_word).in_natural_language_mode()
+        user_score = match(UserModel.first_name, UserModel.last_name, against=search_word).in_natural_language_mode()
+        return query.join(
+            UserModel, UserModel.id == PostModel.user_id
+        ).filter(or_(post_score > 0, user_score > 0)).order_by(desc(post_score + user_score))
+
+
+class SQLiteFTS5Search(PostSearch):
+    posts_fts = table('posts_fts', column('post_id'), column('rank'))
+
+    def apply(self, query, search_word: str):
+        terms = ' OR '.join(
+            '"' + term.replace('"', '""') + '"' for term in search_word.split())
+        if not terms:
+            return query
+        return query.join(
+            self.posts_fts, self.posts_fts.c.post_id == PostModel.id
+        ).filter(
+            literal_column('posts_fts').op('MATCH')(terms)
+        ).order_by(self.posts_fts.c.rank)
+
+    def upgrade(self, db: Session):
+        db.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts "
+            "USING fts5(post_id UNINDEXED, title, content, author)"
+        ))
+        db.execute(text(
+            "INSERT INTO posts_fts (post_id, title, content, author) "
+            "SELECT posts.id, posts.title, posts.content, "
+            "users.first_name || ' ' || users.last_name "
+            "FROM posts JOIN users ON users.id = posts.user_id "
+            "WHERE posts.id NOT IN (SELECT post_id FROM posts_fts)"
+        ))
+        db.commit()
+
+    async def index_post(self, db: AsyncSession, post: PostModel, user: UserModel):
+        await self.remove_post(db, post.id)
+        await db.execute(
+            text(
+                "INSERT INTO posts_fts (post_id, title, content, author) "
+                "VALUES (:post_id, :title, :content, :author)"
+            ),
+            {
+                'post_id': post.id,
+                'title': post.title,
+                'content': post.content or '',
+                'author': f'{user.first_name} {user.last_name}'
+            }
+        )
+
+    async def index_user(self, db: AsyncSession, user: UserModel):
+        await db.execute(
+            text(
+                "UPDATE posts_fts SET author = :author WHERE post_id IN "
+                "(SELECT id FROM posts WHERE user_id = :user_id)"
+            ),
+            {'author': f'{user.first_name} {user.last_name}', 'user_id': user.id}
+        )
+
+    async def remove_post(self, db: AsyncSession, post_id: str):
+        await db.execute(text("DELETE FROM posts_fts WHERE post_id = :post_id"),
+                         {'post_id': post_id})
+
+
+class LikeSearch(PostSearch):
+
+    def apply(self, query, search_word: str):
+        return query.join(UserModel, UserModel.id == PostModel.user_id).filter(
+            or_(
+                PostModel.title.ilike(f"%{search_word}%"),
+                UserModel.first_name.ilike(f"%{search_word}%"),
+                UserModel.last_name.ilike(f"%{search_word}%")
+            )
+        )
+
+
+post_search_backends = {
+    'mysql': MySQLFullTextSearch,
+    'sqlite': SQLiteFTS5Search,
+}
+
+
+def get_post_search(db: Session) -> PostSearch:
+    dialect = db.get_bind().dialect.name
+    return post_search_backends.get(dialect, LikeSearch)()
@@ -8,6 +8,8 @@ from core.errors.failure import Failure
 from app.domain.entities.sketch import SketchEntity, Sketch
 from uuid import uuid4
 
+from sqlalchemy import select
+
 class SketchLocalDataSource(ABC):
 
     @abstractmethod
@@ -37,14 +39,14 @@ class SketchLocalDataSourceImpl(SketchLocalDataSource):
         self.db = db
         
     async def create_sketch(self, sketch: Sketch, team_id: str, user_id: str) -> Either[Failure, SketchEntity]:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
         
-        user_team_exists = self.db.query(UserTeamModel).filter(
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id
-        ).first()
+        ))
         
         if not user_team_exists:
             raise CacheException("User is not a member of the team")
@@ -55,7 +57,7 @@ class SketchLocalDataSourceImpl(SketchLocalDataSource):
             name=sketch.title
         )
         self.db.add(_sketch)
-        self.db.commit()
+        await self.db.commit()
         
         return SketchEntity(
             id=_sketch.id,
@@ -63,42 +65,42 @@ class SketchLocalDataSourceImpl(SketchLocalDataSource):
         )
         
     async def update_sketch(self, sketch: Sketch, sketch_id: str, team_id: str, user_id: str) -> Either[Failure, SketchEntity]:
-        existing_team = self.db.query(TeamModel).filter(TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
         
-        user_team_exists = self.db.query(UserTeamModel).filter(
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id
-        ).first()
+        ))
         
         if not user_team_exists:
             raise CacheException("User is not a member of the team")
 
-        existing_sketch = self.db.query(SketchModel).filter(SketchModel.id == sketch_id).first()
+        existing_sketch = await self.db.scalar(select(SketchModel).where(SketchModel.id == sketch_id))
         if not existing_sketch:
             raise CacheException("Sketch does not exist")
 
         existing_sketch.name = sketch.title
-        self.db.commit()
+        await self.db.commit()
         return SketchEntity(
             id=existing_sketch.id,
             title=existing_sketch.name
         )
         
     async def delete_sketch(self, sketch_id: str, user_id: str) -> Either[Failure, SketchEntity]:
-        existing_sketch = self.db.query(SketchModel).filter(SketchModel.id == sketch_id).first()
+        existing_sketch = await self.db.scalar(select(SketchModel).where(SketchModel.id == sketch_id))
         if not existing_sketch:
             raise CacheException("Sketch does not exist")
         
-        user_team_exists = self.db.query(UserTeamModel).filter(
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id, UserTeamModel.team_id == existing_sketch.team_id
-        ).first()
+        ))
         
         if not user_team_exists:
             raise CacheException("User is not a member of the team")
         
-        self.db.delete(existing_sketch)
-        self.db.commit()
+        await self.db.delete(existing_sketch)
+        await self.db.commit()
 
         return SketchEntity(
             id=existing_sketch.id,
@@ -106,28 +108,28 @@ class SketchLocalDataSourceImpl(SketchLocalDataSource):
         )
 
     async def views_sketch(self, team_id: str, user_id: str) -> Either[Failure, List[SketchEntity]]:
-        existing_team = self.db.query(TeamModel).filter(TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
         
-        user_team_exists = self.db.query(UserTeamModel).filter(
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id
-        ).first()
+        ))
         
         if not user_team_exists:
             raise CacheException("User is not a member of the team")
 
-        sketches = self.db.query(SketchModel).filter(SketchModel.team_id == team_id).all()
+        sketches = (await self.db.scalars(select(SketchModel).where(SketchModel.team_id == team_id))).all()
 
         return [SketchEntity(id=sketch.id, title=sketch.name) for sketch in sketches]
 
     async def view_sketch(self, sketch_id: str, user_id: str) -> Either[Failure, SketchEntity]:
-        existing_sketch = self.db.query(SketchModel).filter(SketchModel.id == sketch_id).first()
+        existing_sketch = await self.db.scalar(select(SketchModel).where(SketchModel.id == sketch_id))
         if not existing_sketch:
             raise  CacheException("Sketch does not exist")
 
         team_id_of_sketch = existing_sketch.team_id
-        user_team_exists = self.db.query(UserTeamModel).filter(UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id_of_sketch).first()
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id_of_sketch))
         if not user_team_exists:
             raise CacheException("User is not a member of the team for this sketch")
 
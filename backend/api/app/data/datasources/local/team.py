@@ -5,19 +5,24 @@ from datetime import datetime
 from typing import List
 from uuid import uuid4
 
-import requests
+from app.data.datasources.local.job import queue_image_variants
 from app.data.datasources.remote.ai import AiGeneration
+from app.data.datasources.remote.derivatives import srcset
+from app.data.datasources.remote.storage import is_url
+from app.data.jobs.notifier import JOB_SUBMITTED, job_notifier
 from app.data.models.chat import ChatModel
 from app.data.models.team import SketchModel, TeamModel, UserTeamModel
 from app.data.models.user import UserModel
 from app.domain.entities.message import Message, MessageEntity
 from app.domain.entities.team import Team, TeamEntity
 from app.domain.entities.user import UserEntity
-from cloudinary.uploader import upload
+from core.config.database_config import insert_ignore
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 baseUrl = os.getenv("BASE_URL")
+TEAM_MEMBER_BATCH_SIZE = int(os.getenv("TEAM_MEMBER_BATCH_SIZE", 500))
 
 
 class TeamLocalDataSource(ABC):
@@ -58,23 +63,29 @@ class TeamLocalDataSource(ABC):
     async def add_team_member(self, team_id: str, creator_id: str, user_ids: List[str]) -> TeamEntity:
         ...
 
+    @abstractmethod
+    async def is_team_member(self, team_id: str, user_id: str) -> bool:
+        ...
+
 
 class TeamLocalDataSourceImpl(TeamLocalDataSource):
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.ai_generation = AiGeneration(request=requests, upload=upload)
+        self.ai_generation = AiGeneration()
 
     async def create_team(self, team: Team, user_id: str, user_ids: List[str]) -> TeamEntity:
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == user_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == user_id))
         if not existing_user:
             raise CacheException("User does not exist")
 
+        user_ids = await self._existing_user_ids(user_ids)
+
         creator_first_name = existing_user.first_name
         creator_last_name = existing_user.last_name
         image = ''
-        if team.image is not None and team.image != '' and len(team.image) > 1000:
+        if is_url(team.image) or (team.image is not None and len(team.image) > 1000):
             image = await self.ai_generation.upload_image(team.image)
 
         _id = str(uuid4())
@@ -95,17 +106,19 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
         chat = ChatModel(
             id=_id,
             user_id=user_id,
-            messages=[],
             title=f'{creator_first_name} {creator_last_name} Team Chat',
         )
 
         self.db.add(chat)
         self.db.add(_teamUser)
         self.db.add(_team)
-        self.db.commit()
-        self.db.refresh(_team)
-
-        self.add_team_member(_team.id, user_id, user_ids)
+        await self.db.flush()
+        await self._insert_members(_id, user_ids)
+        job = queue_image_variants(self.db, 'team', _id, user_id, image)
+        await self.db.commit()
+        if job:
+            job_notifier.notify(JOB_SUBMITTED)
+        await self.db.refresh(_team)
 
         created_team = TeamEntity(
             id=_team.id,
@@ -114,6 +127,7 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=_team.creator_id,
             creator_image=existing_user.image,
             image=_team.image,
+            image_srcset=srcset(_team.image_variants),
             first_name=creator_first_name,
             last_name=creator_last_name,
             create_at=_team.date
@@ -123,8 +137,8 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
         return created_team
 
     async def update_team(self, team: Team, team_id: str, user_id: str) -> TeamEntity:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
         if existing_team.creator_id != user_id:
@@ -132,13 +146,20 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
 
         existing_team.title = team.title
         existing_team.description = team.description
-        if team.image is not None and team.image != '' and len(team.image) > 1000:
-            existing_team.image = await self.ai_generation.upload_image(team.image)
+        job = None
+        if is_url(team.image) or (team.image is not None and len(team.image) > 1000):
+            image = await self.ai_generation.upload_image(team.image)
+            if image != existing_team.image:
+                existing_team.image = image
+                existing_team.image_variants = None
+                job = queue_image_variants(self.db, 'team', team_id, user_id, image)
 
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == existing_team.creator_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == existing_team.creator_id))
 
-        self.db.commit()
+        await self.db.commit()
+        if job:
+            job_notifier.notify(JOB_SUBMITTED)
 
         updated_team = TeamEntity(
             id=existing_team.id,
@@ -147,6 +168,7 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image=existing_user.image,
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name=existing_user.first_name,
             last_name=existing_user.last_name
@@ -155,23 +177,13 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
         return updated_team
 
     async def delete_team(self, team_id: str) -> TeamEntity:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        existingTeamSketchs = self.db.query(SketchModel).filter(
-            SketchModel.team_id == team_id).all()
-        for sketch in existingTeamSketchs:
-            self.db.delete(sketch)
-
-        exisitingUserTeam = self.db.query(UserTeamModel).filter(
-            UserTeamModel.team_id == team_id).all()
-        for userTeam in exisitingUserTeam:
-            self.db.delete(userTeam)
-
-        self.db.delete(existing_team)
-        self.db.commit()
+        await self._delete_team_rows(team_id)
+        await self.db.commit()
 
         deleted_team = TeamEntity(
             id=existing_team.id,
@@ -180,6 +192,7 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image="",
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name="",
             last_name=""
@@ -188,17 +201,19 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
         return deleted_team
 
     async def view_teams(self, user_id: str) -> List[TeamEntity]:
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == user_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == user_id))
         if not existing_user:
             raise CacheException("User does not exist")
 
-        team_entities = []
-        for user_team in existing_user.teams:
-            team = user_team.team
+        teams = (await self.db.scalars(select(TeamModel).join(
+            UserTeamModel, UserTeamModel.team_id == TeamModel.id
+        ).where(UserTeamModel.user_id == user_id))).all()
 
-            creator = self.db.query(UserModel).filter(
-                UserModel.id == team.creator_id).first()
+        team_entities = []
+        for team in teams:
+            creator = await self.db.scalar(select(UserModel).where(
+                UserModel.id == team.creator_id))
 
             if team:
                 team_entities.append(TeamEntity(
@@ -208,6 +223,7 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
                     creator_id=team.creator_id,
                     creator_image=creator.image,
                     image=team.image,
+                    image_srcset=srcset(team.image_variants),
                     create_at=team.date,
                     first_name=creator.first_name,
                     last_name=creator.last_name
@@ -216,14 +232,14 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
         return team_entities
 
     async def view_team(self, team_id: str) -> TeamEntity:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
 
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == existing_team.creator_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == existing_team.creator_id))
 
         return TeamEntity(
             id=existing_team.id,
@@ -232,25 +248,26 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image=existing_user.image,
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name=existing_user.first_name,
             last_name=existing_user.last_name
         )
 
     async def join_team(self, team_id: str, user_id: str) -> TeamEntity:
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == user_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == user_id))
         if not existing_user:
             raise CacheException("User does not exist")
 
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        user_team_exists = self.db.query(UserTeamModel).filter(
+        user_team_exists = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id
-        ).first()
+        ))
 
         if user_team_exists:
             raise CacheException("User is already a member of this team")
@@ -261,10 +278,10 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             team_id=team_id
         )
         self.db.add(user_team)
-        self.db.commit()
+        await self.db.commit()
 
-        creator = self.db.query(UserModel).filter(
-            UserModel.id == existing_team.creator_id).first()
+        creator = await self.db.scalar(select(UserModel).where(
+            UserModel.id == existing_team.creator_id))
 
         return TeamEntity(
             id=existing_team.id,
@@ -273,40 +290,39 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image=creator.image,
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name=creator.first_name,
             last_name=creator.last_name
         )
 
     async def leave_team(self, team_id: str, user_id: str) -> TeamEntity:
-        existing_user = self.db.query(UserModel).filter(
-            UserModel.id == user_id).first()
+        existing_user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == user_id))
         if not existing_user:
             raise CacheException("User does not exist")
 
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        user_team = self.db.query(UserTeamModel).filter(
+        user_team = await self.db.scalar(select(UserTeamModel).where(
             UserTeamModel.user_id == user_id,
             UserTeamModel.team_id == team_id
-        ).first()
+        ))
 
         if not user_team:
             raise CacheException("User isn't memeber of a time")
 
-        if user_team:
-            self.db.delete(user_team)
-            self.db.commit()
-
         if existing_team.creator_id == user_id:
-            self.db.delete(existing_team)
-            self.db.commit()
+            await self._delete_team_rows(team_id)
+        else:
+            await self.db.delete(user_team)
+        await self.db.commit()
 
-        creator = self.db.query(UserModel).filter(
-            UserModel.id == existing_team.creator_id).first()
+        creator = await self.db.scalar(select(UserModel).where(
+            UserModel.id == existing_team.creator_id))
 
         return TeamEntity(
             id=existing_team.id,
@@ -315,69 +331,52 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image=creator.image,
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name=creator.first_name,
             last_name=creator.last_name
         )
 
     async def team_members(self, team_id: str) -> List[UserEntity]:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        user_teams = existing_team.members
+        members = (await self.db.scalars(select(UserModel).join(
+            UserTeamModel, UserTeamModel.user_id == UserModel.id
+        ).where(UserTeamModel.team_id == team_id))).all()
 
         return [
             UserEntity(
-                id=user.user.id,
-                firstName=user.user.first_name,
-                lastName=user.user.last_name,
-                bio=user.user.bio,
-                email=user.user.email,
-                image=user.user.image,
-                password=user.user.password,
-                country=user.user.country,
-                followers=user.user.get_followers_count(self.db),
-                following=user.user.get_following_count(self.db)
-            ) for user in user_teams
+                id=user.id,
+                firstName=user.first_name,
+                lastName=user.last_name,
+                bio=user.bio,
+                email=user.email,
+                image=user.image,
+                password=user.password,
+                country=user.country,
+                followers=user.followers_count,
+                following=user.following_count
+            ) for user in members
         ]
 
     async def add_team_member(self, team_id: str, creator_id: str, user_ids: List[str]) -> TeamEntity:
-        existing_team = self.db.query(TeamModel).filter(
-            TeamModel.id == team_id).first()
+        existing_team = await self.db.scalar(select(TeamModel).where(
+            TeamModel.id == team_id))
 
         if not existing_team:
             raise CacheException("Team does not exist")
 
-        creator = self.db.query(UserModel).filter(
-            UserModel.id == existing_team.creator_id).first()
+        creator = await self.db.scalar(select(UserModel).where(
+            UserModel.id == existing_team.creator_id))
         if creator_id != existing_team.creator_id:
             raise CacheException("User is not the creator of the team")
 
-        for user_id in user_ids:
-            existing_user = self.db.query(UserModel).filter(
-                UserModel.id == user_id).first()
-
-            if not existing_user:
-                raise CacheException(f"User {user_id} does not exist")
-
-            user_team_exists = self.db.query(UserTeamModel).filter(
-                UserTeamModel.user_id == user_id, UserTeamModel.team_id == team_id
-            ).first()
-
-            if user_team_exists:
-                continue
-
-            user_team = UserTeamModel(
-                id=str(uuid4()),
-                user_id=user_id,
-                team_id=team_id
-            )
-
-            self.db.add(user_team)
-
-        self.db.commit()
+        user_ids = await self._existing_user_ids(user_ids)
+        await self._insert_members(team_id, user_ids)
+        await self.db.commit()
 
         return TeamEntity(
             id=existing_team.id,
@@ -386,7 +385,36 @@ class TeamLocalDataSourceImpl(TeamLocalDataSource):
             creator_id=existing_team.creator_id,
             creator_image=creator.image,
             image=existing_team.image,
+            image_srcset=srcset(existing_team.image_variants),
             create_at=existing_team.date,
             first_name=creator.first_name,
             last_name=creator.last_name
         )
+
+    async def is_team_member(self, team_id: str, user_id: str) -> bool:
+        member = await self.db.scalar(select(UserTeamModel.id).where(
+            UserTeamModel.team_id == team_id, UserTeamModel.user_id == user_id).limit(1))
+        return member is not None
+
+    async def _existing_user_ids(self, user_ids: List[str]) -> List[str]:
+        user_ids = list(dict.fromkeys(user_ids or []))
+        existing_user_ids = set()
+        for start in range(0, len(user_ids), TEAM_MEMBER_BATCH_SIZE):
+            existing_user_ids.update((await self.db.scalars(select(UserModel.id).where(
+                UserModel.id.in_(user_ids[start:start + TEAM_MEMBER_BATCH_SIZE])))).all())
+        for user_id in user_ids:
+            if user_id not in existing_user_ids:
+                raise CacheException(f"User {user_id} does not exist")
+        return user_ids
+
+    async def _insert_members(self, team_id: str, user_ids: List[str]):
+        for start in range(0, len(user_ids), TEAM_MEMBER_BATCH_SIZE):
+            await self.db.execute(insert_ignore(UserTeamModel).values([
+                {'id': str(uuid4()), 'user_id': user_id, 'team_id': team_id}
+                for user_id in user_ids[start:start + TEAM_MEMBER_BATCH_SIZE]
+            ]))
+
+    async def _delete_team_rows(self, team_id: str):
+        await self.db.execute(delete(SketchModel).where(SketchModel.team_id == team_id))
+        await self.db.execute(delete(UserTeamModel).where(UserTeamModel.team_id == team_id))
+        await self.db.execute(delete(TeamModel).where(TeamModel.id == team_id))
@@ -1,15 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
-import requests
+from app.data.datasources.local.search import get_post_search
 from app.data.datasources.remote.ai import AiGeneration
-from app.data.models.user import UserModel
+from app.data.models.user import UserModel, user_following
 from app.domain.entities.user import UpdatUserRequest, User, UserEntity
-from cloudinary.uploader import upload
+from core.common.current_user import principal_cache
 from core.common.password import get_password_hash
+from core.config.database_config import insert_ignore
 from core.errors.exceptions import CacheException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class UserLocalDataSource(ABC):
@@ -27,7 +29,7 @@ class UserLocalDataSource(ABC):
         ...
 
     @abstractmethod
-    async def view_users(self) -> List[UserEntity]:
+    async def view_users(self, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
         ...
 
     @abstractmethod
@@ -35,11 +37,11 @@ class UserLocalDataSource(ABC):
         ...
 
     @abstractmethod
-    async def followers(self, user_id: str) -> List[UserEntity]:
+    async def followers(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
         ...
 
     @abstractmethod
-    async def following(self, user_id: str) -> List[UserEntity]:
+    async def following(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
         ...
 
     @abstractmethod
@@ -53,13 +55,14 @@ class UserLocalDataSource(ABC):
 
 class UserLocalDataSourceImpl(UserLocalDataSource):
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.ai_generation = AiGeneration(request=requests, upload=upload)
+        self.ai_generation = AiGeneration()
+        self.search = get_post_search(db)
 
     async def create_user(self, user: User) -> UserEntity:
-        _user = self.db.query(UserModel).filter(
-            UserModel.email == user.email).first()
+        _user = await self.db.scalar(select(UserModel).where(
+            UserModel.email == user.email))
         if _user is not None:
             raise CacheException("User already exists")
         if len(user.password) < 8:
@@ -72,12 +75,12 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             bio=user.bio,
             image='http://res.cloudinary.com/dtghsmx0s/image/upload/v1698642634/u640aw5vgzzuzowsbgp7.jpg',
             email=user.email,
-            password=get_password_hash(user.password),
+            password=await get_password_hash(user.password),
             country=user.country
         )
 
         self.db.add(_user)
-        self.db.commit()
+        await self.db.commit()
         return UserEntity(
             id=_user.id,
             firstName=_user.first_name,
@@ -87,14 +90,14 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             image=_user.image,
             password=_user.password,
             country=_user.country,
-            followers=_user.get_followers_count(self.db),
-            following=_user.get_following_count(self.db)
+            followers=_user.followers_count,
+            following=_user.following_count
         )
 
     async def update_user(self, user: UpdatUserRequest, user_id: str) -> UserEntity:
 
-        _user = self.db.query(UserModel).filter(
-            UserModel.id == user_id).first()
+        _user = await self.db.scalar(select(UserModel).where(
+            UserModel.id == user_id))
         if _user is None:
             raise CacheException("User not found")
 
@@ -110,7 +113,9 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
         if user.image is not None and user.image != '':
             _user.image = await self.ai_generation.upload_image(user.image)
 
-        self.db.commit()
+        await self.search.index_user(self.db, _user)
+        await self.db.commit()
+        principal_cache.invalidate(_user.id)
         return UserEntity(
             id=_user.id,
             firstName=_user.first_name,
@@ -120,16 +125,18 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             email=_user.email,
             password=_user.password,
             country=_user.country,
-            followers=_user.get_followers_count(self.db),
-            following=_user.get_following_count(self.db)
+            followers=_user.followers_count,
+            following=_user.following_count
         )
 
     async def delete_user(self, user_id: str) -> UserEntity:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
         if user is None:
             raise CacheException("User not found")
-        self.db.delete(user)
-        self.db.commit()
+        await self._remove_follows(user.id)
+        await self.db.delete(user)
+        await self.db.commit()
+        principal_cache.invalidate(user.id)
         return UserEntity(
             id=user.id,
             firstName=user.first_name,
@@ -139,29 +146,16 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             email=user.email,
             password=user.password,
             country=user.country,
-            followers=user.get_followers_count(self.db),
-            following=user.get_following_count(self.db)
+            followers=user.followers_count,
+            following=user.following_count
         )
 
-    async def view_users(self) -> List[UserEntity]:
-        users = self.db.query(UserModel).all()
-        return [
-            UserEntity(
-                id=user.id,
-                firstName=user.first_name,
-                lastName=user.last_name,
-                bio=user.bio,
-                email=user.email,
-                image=user.image,
-                password=user.password,
-                country=user.country,
-                followers=user.get_followers_count(self.db),
-                following=user.get_following_count(self.db)
-            ) for user in users
-        ]
+    async def view_users(self, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
+        query = select(UserModel).order_by(UserModel.id)
+        return await self._user_entities(self._page(query, skip, limit))
 
     async def view_user(self, user_id: str) -> UserEntity:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
         if user is None:
             raise CacheException("User not found")
         return UserEntity(
@@ -173,58 +167,36 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             image=user.image,
             password=user.password,
             country=user.country,
-            followers=user.get_followers_count(self.db),
-            following=user.get_following_count(self.db)
+            followers=user.followers_count,
+            following=user.following_count
         )
 
-    async def followers(self, user_id: str) -> List[UserEntity]:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
-        if user is None:
-            raise CacheException("User not found")
-        return [
-            UserEntity(
-                id=follower.id,
-                firstName=follower.first_name,
-                lastName=follower.last_name,
-                bio=follower.bio,
-                email=follower.email,
-                image=follower.image,
-                password=follower.password,
-                country=follower.country,
-                followers=follower.get_followers_count(self.db),
-                following=follower.get_following_count(self.db)
-            ) for follower in user.followers
-        ]
+    async def followers(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
+        await self._ensure_user(user_id)
+        query = select(UserModel).join(
+            user_following, user_following.c.follower_id == UserModel.id
+        ).where(user_following.c.following_id == user_id).order_by(user_following.c.follower_id)
+        return await self._user_entities(self._page(query, skip, limit))
 
-    async def following(self, user_id: str) -> List[UserEntity]:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
-        if user is None:
-            raise CacheException("User not found")
-        return [
-            UserEntity(
-                id=following.id,
-                firstName=following.first_name,
-                lastName=following.last_name,
-                bio=following.bio,
-                email=following.email,
-                image=following.image,
-                password=following.password,
-                country=following.country,
-                followers=following.get_followers_count(self.db),
-                following=following.get_following_count(self.db)
-            ) for following in user.following
-        ]
+    async def following(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> List[UserEntity]:
+        await self._ensure_user(user_id)
+        query = select(UserModel).join(
+            user_following, user_following.c.following_id == UserModel.id
+        ).where(user_following.c.follower_id == user_id).order_by(user_following.c.following_id)
+        return await self._user_entities(self._page(query, skip, limit))
 
     async def follow(self, user_id: str, follower_id: str) -> UserEntity:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
-        follower = self.db.query(UserModel).filter(
-            UserModel.id == follower_id).first()
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
+        follower = await self.db.scalar(select(UserModel).where(
+            UserModel.id == follower_id))
         if user is None or follower is None:
             raise CacheException("User not found")
-        if user in follower.followers:
-            raise CacheException("User already followed")
-        follower.followers.append(user)
-        self.db.commit()
+        inserted = (await self.db.execute(insert_ignore(user_following).values(
+            follower_id=user.id, following_id=follower.id))).rowcount
+        if inserted:
+            await self._add_to_counters(user.id, follower.id, 1)
+        await self.db.commit()
+        await self.db.refresh(user)
         return UserEntity(
             id=user.id,
             firstName=user.first_name,
@@ -234,21 +206,24 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             image=user.image,
             password=user.password,
             country=user.country,
-            followers=user.get_followers_count(self.db),
-            following=user.get_following_count(self.db)
+            followers=user.followers_count,
+            following=user.following_count
         )
 
     async def unfollow(self, user_id: str, follower_id: str) -> UserEntity:
-        user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
-        follower = self.db.query(UserModel).filter(
-            UserModel.id == follower_id).first()
+        user = await self.db.scalar(select(UserModel).where(UserModel.id == user_id))
+        follower = await self.db.scalar(select(UserModel).where(
+            UserModel.id == follower_id))
         if user is None or follower is None:
             raise CacheException("User not found")
-        if user not in follower.followers:
-            raise CacheException("User not found")
-
-        follower.followers.remove(user)
-        self.db.commit()
+        deleted = (await self.db.execute(delete(user_following).where(
+            user_following.c.follower_id == user.id,
+            user_following.c.following_id == follower.id
+        ))).rowcount
+        if deleted:
+            await self._add_to_counters(user.id, follower.id, -1)
+        await self.db.commit()
+        await self.db.refresh(user)
         return UserEntity(
             id=user.id,
             firstName=user.first_name,
@@ -258,6 +233,66 @@ class UserLocalDataSourceImpl(UserLocalDataSource):
             image=user.image,
             password=user.password,
             country=user.country,
-            followers=user.get_followers_count(self.db),
-            following=user.get_following_count(self.db)
+            followers=user.followers_count,
+            following=user.following_count
+        )
+
+    async def _add_to_counters(self, follower_id: str, following_id: str, amount: int):
+        await self.db.execute(
+            update(UserModel).where(UserModel.id == follower_id)
+            .values(following_count=UserModel.following_count + amount)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(UserModel).where(UserModel.id == following_id)
+            .values(followers_count=UserModel.followers_count + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _remove_follows(self, user_id: str):
+        await self.db.execute(
+            update(UserModel).where(UserModel.id.in_(
+                select(user_following.c.following_id).where(user_following.c.follower_id == user_id)
+            ))
+            .values(followers_count=UserModel.followers_count - 1)
+            .execution_options(synchronize_session=False)
         )
+        await self.db.execute(
+            update(UserModel).where(UserModel.id.in_(
+                select(user_following.c.follower_id).where(user_following.c.following_id == user_id)
+            ))
+            .values(following_count=UserModel.following_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(delete(user_following).where(or_(
+            user_following.c.follower_id == user_id,
+            user_following.c.following_id == user_id
+        )))
+
+    async def _ensure_user(self, user_id: str):
+        if await self.db.scalar(select(UserModel.id).where(UserModel.id == user_id)) is None:
+            raise CacheException("User not found")
+
+    def _page(self, query, skip: int, limit: Optional[int]):
+        if skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    async def _user_entities(self, query) -> List[UserEntity]:
+        users = (await self.db.scalars(query)).all()
+        return [
+            UserEntity(
+                id=user.id,
+                firstName=user.first_name,
+                lastName=user.last_name,
+                bio=user.bio,
+                email=user.email,
+                image=user.image,
+                password=user.password,
+                country=user.country,
+                followers=user.followers_count,
+                following=user.following_count
+            ) for user in users
+        ]
@@ -1,150 +1,287 @@
+import asyncio
 import base64
 import io
-import json
 import os
+from contextlib import asynccontextmanager
+from typing import List
+from uuid import uuid4
 
-import cloudinary
-import openai
+import httpx
 import replicate
-import requests
-from cloudinary.uploader import upload
-from core.errors.exceptions import ServerException
-from openai import OpenAI
-from PIL import Image
-
-client = OpenAI()
-CAPI_KEY = os.getenv("CLD_API_KEY")
-CAPI_SECRET = os.getenv("CLD_API_SECRET")
+from app.data.datasources.remote.ai_cache import ResultCache, cache_key, get_result_cache
+from app.data.datasources.remote.image_index import (NEAR_DUPLICATE_DISTANCE, ImageIndex, IndexedImage,
+                                                     content_hash, get_image_index)
+from app.data.datasources.remote.images import OPAQUE, PROVIDER_IMAGE_SIZE, TRANSPARENT, ImagePool, get_image_pool
+from app.data.datasources.remote.storage import MEDIA_HOSTS, Storage, get_storage, is_media_url, is_url
+from app.data.datasources.remote.upload import UPLOAD_MAX_BYTES
+from core.errors.exceptions import CacheException, ServerException
+from openai import AsyncOpenAI
+
 CGET_IMAGE_KEY = os.getenv("GET_IMAGE_KEY")
-openai.api_key = os.getenv("OPENAI_API_KEY")
 asticaAPI_key = os.getenv("ASTICA_API_KEY")
 CGET_3D_KEY = os.getenv("GET_3D_KEY")
-cloudinary.config(
-    cloud_name="dtghsmx0s", api_key=CAPI_KEY, api_secret=CAPI_SECRET)
 
+ASTICA_URL = os.getenv("ASTICA_URL", "https://vision.astica.ai/describe")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+REPLICATE_BASE_URL = os.getenv("REPLICATE_BASE_URL")
+SHAP_E_MODEL = "cjwbw/shap-e:5957069d5c509126a73c7cb68abcddbb985aeefa4d318e7c63ec1352ce6da68c"
+CHATBOT_SYSTEM_PROMPT = "You're a kind helpful assistant, only respond with knowledge you know for sure, don't hallucinate information."
+
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", 100))
+AI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AI_MAX_KEEPALIVE_CONNECTIONS", 20))
+AI_CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", 10))
+
+
+class AiProvider:
+
+    def __init__(self, name: str, timeout: float, concurrency: int) -> None:
+        prefix = f"AI_{name.upper()}"
+        self.name = name
+        self.timeout = float(os.getenv(f"{prefix}_TIMEOUT", timeout))
+        self.concurrency = int(os.getenv(f"{prefix}_CONCURRENCY", concurrency))
+
+
+providers = {
+    provider.name: provider for provider in (
+        AiProvider('image', timeout=120, concurrency=8),
+        AiProvider('openai', timeout=120, concurrency=16),
+        AiProvider('astica', timeout=60, concurrency=8),
+        AiProvider('replicate', timeout=600, concurrency=4),
+        AiProvider('download', timeout=60, concurrency=32),
+        AiProvider('upload', timeout=60, concurrency=8),
+    )
+}
+
+
+class AiClients:
+
+    def __init__(self, openai_base_url=OPENAI_BASE_URL, replicate_base_url=REPLICATE_BASE_URL,
+                 astica_url=ASTICA_URL, media_hosts=MEDIA_HOSTS) -> None:
+        self.openai_base_url = openai_base_url
+        self.astica_url = astica_url
+        self.media_hosts = media_hosts
+        self._openai = None
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(None, connect=AI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        self.replicate = replicate.Client(
+            base_url=replicate_base_url,
+            timeout=httpx.Timeout(providers['replicate'].timeout, connect=AI_CONNECT_TIMEOUT)
+        )
+        self.semaphores = {
+            name: asyncio.Semaphore(provider.concurrency) for name, provider in providers.items()
+        }
+
+    @property
+    def openai(self) -> AsyncOpenAI:
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                base_url=self.openai_base_url, http_client=self.http, max_retries=0)
+        return self._openai
+
+    @asynccontextmanager
+    async def call(self, provider: str):
+        async with self.semaphores[provider]:
+            async with asyncio.timeout(providers[provider].timeout):
+                yield
+
+    async def download(self, url: str, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+        async with self.call('download'):
+            async with self.http.stream('GET', url) as response:
+                if response.status_code != 200:
+                    raise ServerException('Error downloading image')
+                length = response.headers.get('content-length')
+                if length is not None and length.isdigit() and int(length) > max_bytes:
+                    raise ServerException('Image is too large')
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    if len(content) > max_bytes:
+                        raise ServerException('Image is too large')
+        return bytes(content)
+
+    async def download_media(self, url: str, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+        if not is_media_url(url, self.media_hosts):
+            raise ServerException('Image host is not allowed')
+        return await self.download(url, max_bytes)
+
+    async def close(self):
+        await self.http.aclose()
+
+
+_clients = None
+
+
+def get_ai_clients() -> AiClients:
+    global _clients
+    if _clients is None:
+        _clients = AiClients()
+    return _clients
+
+
+async def close_ai_clients():
+    global _clients
+    if _clients is not None:
+        await _clients.close()
+        _clients = None
 
 
 class AiGeneration:
 
-    def __init__(self, request, upload) -> None:
-        self.request = request
-        self.upload = upload
+    def __init__(self, storage: Storage = None, clients: AiClients = None,
+                 cache: ResultCache = None, images: ImagePool = None, index: ImageIndex = None) -> None:
+        self.storage = storage or get_storage()
+        self.clients = clients or get_ai_clients()
+        self.cache = cache if cache is not None else get_result_cache()
+        self.images = images or get_image_pool()
+        self.index = index if index is not None else get_image_index()
 
     async def get_image(self, url, headers, data):
-        headers['Authorization'] = 'Bearer ' + CGET_IMAGE_KEY
-        response = requests.post(url, headers=headers, json=data)
-        print(response.status_code, "THIS IS THE RESPONSE")
+        if is_url(data.get('image')):
+            image = await self.clients.download_media(data['image'])
+            data = {**data, 'image': base64.b64encode(image).decode()}
+        headers['Authorization'] = f'Bearer {CGET_IMAGE_KEY}'
+        async with self.clients.call('image'):
+            response = await self.clients.http.post(url, headers=headers, json=data)
         if response.status_code != 200:
-            print(response.json())
             raise ServerException('Error getting image 1')
         imageText = response.json()['image']
 
         if imageText is None or imageText == '' or imageText == 'null':
             raise ServerException('Error getting image 2')
 
-        image = base64.b64decode(imageText)
-        upload_result = upload(image)
-        if not upload_result:
-            raise ServerException('Error uploading image 3')
-        return upload_result['url']
+        return await self._upload(base64.b64decode(imageText))
 
     async def create_from_text(self, data):
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=data['prompt'],
-            size="1024x1024",
-            quality="standard",
-            n=1,
-        )
-        image_url = response.data[0].url
-        image_data = requests.get(image_url).content
-        upload_result = upload(image_data)
-        if upload_result is None:
-            raise ServerException('Error uploading image')
-        return upload_result["url"]
+        return await self._cached(
+            'dall-e-3', {'prompt': data['prompt'], 'size': '1024x1024', 'quality': 'standard'},
+            data, self._create_from_text)
+
+    async def _create_from_text(self, data):
+        async with self.clients.call('openai'):
+            response = await self.clients.openai.images.generate(
+                model="dall-e-3",
+                prompt=data['prompt'],
+                size="1024x1024",
+                quality="standard",
+                n=1,
+            )
+        return await self._upload(await self._download(response.data[0].url))
 
     async def create_from_image(self, data):
-        decoded_image_data = base64.b64decode(data['image'])
-        image = Image.open(io.BytesIO(decoded_image_data))
-        resized_image = image.resize((512, 512))
-        with io.BytesIO() as output_image:
-            resized_image.save(output_image, format="PNG")
-            output_image.seek(0)
-            resized_image_data = output_image.read()
-            
-        mask_image_data = base64.b64decode(data['mask'])
-        mask_image = Image.open(io.BytesIO(mask_image_data))
-        resized_mask_image = mask_image.resize((512, 512))
-        with io.BytesIO() as output_mask_image:
-            resized_mask_image.save(output_mask_image, format="PNG")
-            output_mask_image.seek(0)
-            resized_mask_image_data = output_mask_image.read()
-            
-            
-        response = client.images.edit(
-        model="dall-e-2",
-        image=io.BytesIO(resized_image_data).read(),
-        mask=io.BytesIO(resized_mask_image_data).read(),
-        prompt=data['prompt'],
-        n=1,
-        size="512x512"
-        )
+        resized_image_data, resized_mask_image_data = await asyncio.gather(
+            self._prepare_image(data['image']), self._prepare_image(data['mask'], OPAQUE))
 
-        image_url = response.data[0].url
-        image_data = requests.get(image_url).content
-        upload_result = upload(image_data)
-        if upload_result is None:
-            raise ServerException('Error uploading image')
-        return upload_result["url"]
+        async with self.clients.call('openai'):
+            response = await self.clients.openai.images.edit(
+                model="dall-e-2",
+                image=resized_image_data,
+                mask=resized_mask_image_data,
+                prompt=data['prompt'],
+                n=1,
+                size="512x512"
+            )
+        return await self._upload(await self._download(response.data[0].url))
 
     async def image_variant(self, data):
-        decoded_image_data = base64.b64decode(data['image'])
-        image = Image.open(io.BytesIO(decoded_image_data))
-        resized_image = image.resize((512, 512))
-        with io.BytesIO() as output_image:
-            resized_image.save(output_image, format="PNG")
-            output_image.seek(0)
-            resized_image_data = output_image.read()
-            
-        response = client.images.create_variation(
-            image=io.BytesIO(resized_image_data).read(),
-            n=1,
-            size="512x512"
-            )
+        resized_image_data = await self._prepare_image(data['image'])
 
-        image_url = response.data[0].url
-        image_data = requests.get(image_url).content
-        upload_result = upload(image_data)
-        if upload_result is None:
-            raise ServerException('Error uploading image')
-        return upload_result["url"]
+        async with self.clients.call('openai'):
+            response = await self.clients.openai.images.create_variation(
+                image=resized_image_data,
+                n=1,
+                size="512x512"
+            )
+        return await self._upload(await self._download(response.data[0].url))
 
     async def upload_image(self, stringImage):
+        if is_media_url(stringImage, self.clients.media_hosts):
+            return stringImage
+        if is_url(stringImage):
+            raise CacheException("Image host is not allowed")
         image_data = base64.b64decode(stringImage)
-        image = io.BytesIO(image_data).read()
-        upload_result = upload(image)
-        if upload_result is None:
-            raise ServerException('Error uploading image')
-        return upload_result["url"]
-    
+        if self.index is not None and image_data:
+            url = await self.index.find(content_hash(image_data))
+            if url:
+                return url
+        return await self._upload(image_data)
+
+    async def similar_images(self, image, max_distance: int = NEAR_DUPLICATE_DISTANCE) -> List[IndexedImage]:
+        if self.index is None:
+            return []
+        image_data = await self.clients.download_media(image) if is_url(image) else base64.b64decode(image)
+        return await self.index.near_duplicates(await self.images.dhash(image_data), max_distance)
 
     async def chatbot(self, data):
-        messages = [
-            {"role": "system", "content": "You're a kind helpful assistant, only respond with knowledge you know for sure, don't hallucinate information."},
+        return await self._cached('gpt-3.5-turbo', self._chatbot_key(data), data, self._chatbot)
+
+    async def chatbot_stream(self, data):
+        key = cache_key('gpt-3.5-turbo', self._chatbot_key(data))
+        if self.cache is not None:
+            cached = await self.cache.lookup(key, fresh=bool(data.get('fresh')))
+            if cached is not None:
+                yield cached
+                return
+
+        tokens = []
+        queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_chatbot_stream(data, queue))
+        try:
+            while (token := await queue.get()) is not None:
+                if isinstance(token, Exception):
+                    raise ServerException('Error getting chatbot response') from token
+                tokens.append(token)
+                yield token
+        finally:
+            reader.cancel()
+
+        if self.cache is not None and tokens:
+            await self.cache.set(key, ''.join(tokens))
+
+    async def _read_chatbot_stream(self, data, queue: asyncio.Queue):
+        try:
+            async with self.clients.call('openai'):
+                stream = await self.clients.openai.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=self._chatbot_messages(data),
+                    stream=True
+                )
+                async with stream:
+                    async for chunk in stream:
+                        token = chunk.choices[0].delta.content if chunk.choices else None
+                        if token:
+                            queue.put_nowait(token)
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(None)
+
+    def _chatbot_key(self, data):
+        return {'system': CHATBOT_SYSTEM_PROMPT, 'prompt': data['prompt']}
+
+    def _chatbot_messages(self, data):
+        return [
+            {"role": "system", "content": CHATBOT_SYSTEM_PROMPT},
             {"role": "user", "content": data['prompt']},
         ]
+
+    async def _chatbot(self, data):
         try:
-            completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages
-            )
+            async with self.clients.call('openai'):
+                completion = await self.clients.openai.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=self._chatbot_messages(data)
+                )
             return completion.choices[0].message.content
         except Exception as pr:
             print(pr)
             raise ServerException('Error getting chatbot response')
 
     async def analysis(self, data):
-        print(data)
         asticaAPI_payload = {
             'tkn': asticaAPI_key,
             'modelVersion': '2.1_full',
@@ -153,60 +290,73 @@ class AiGeneration:
             "gpt_length": '100',
             'input': data['image']
         }
-        print(asticaAPI_payload)
-        response = requests.post(
-            'https://vision.astica.ai/describe',
-            data=json.dumps(asticaAPI_payload),
-            headers={'Content-Type': 'application/json', },
-            timeout=60)
-        print(response.status_code, response.json())
+        async with self.clients.call('astica'):
+            response = await self.clients.http.post(
+                self.clients.astica_url, json=asticaAPI_payload)
         response = response.json()
-        if 'status' in response:
-            if response['status'] == 'error':
-                return ServerException('Error getting analysis')
-            elif response['status'] == 'success':
-                if "caption_GPTS" in response and 'caption' in response:
-                    return {
-                        'detail': response['caption_GPTS'],
-                        'title': response['caption']['text']
-                    }
+        if response.get('status') == 'success':
+            if "caption_GPTS" in response and 'caption' in response:
+                return {
+                    'detail': response['caption_GPTS'],
+                    'title': response['caption']['text']
+                }
         raise ServerException('Error getting analysis')
 
     async def image_to_threeD(self, data):
-        output = replicate.run(
-            "cjwbw/shap-e:5957069d5c509126a73c7cb68abcddbb985aeefa4d318e7c63ec1352ce6da68c",
-            input={
-                "prompt": data['prompt'],
-                "batch_size": 1,
-                "render_mode": "nerf",
-                "render_size": 256,
-                "guidance_scale": 15,
-                "image": data['image']
-            }
-        )
-        if output:
-            image_data = requests.get(output[0]).content
-            upload_result = upload(image_data)
-            if upload_result is None:
-                raise ServerException('Error uploading image')
-            return upload_result["url"]
-        raise ServerException('Error uploading image')
+        return await self._threeD({
+            "prompt": data['prompt'],
+            "batch_size": 1,
+            "render_mode": "nerf",
+            "render_size": 256,
+            "guidance_scale": 15,
+            "image": data['image']
+        })
 
     async def text_to_threeD(self, data):
-        output = replicate.run(
-            "cjwbw/shap-e:5957069d5c509126a73c7cb68abcddbb985aeefa4d318e7c63ec1352ce6da68c",
-            input={
-                "prompt": data['prompt'],
-                "batch_size": 1,
-                "render_mode": "nerf",
-                "render_size": 256,
-                "guidance_scale": 15
-            }
-        )
+        input = {
+            "prompt": data['prompt'],
+            "batch_size": 1,
+            "render_mode": "nerf",
+            "render_size": 256,
+            "guidance_scale": 15
+        }
+        return await self._cached(SHAP_E_MODEL, input, data, lambda data: self._threeD(input))
+
+    async def _cached(self, model, key_payload, data, create):
+        if self.cache is None:
+            return await create(data)
+        return await self.cache.get_or_create(
+            cache_key(model, key_payload), lambda: create(data), fresh=bool(data.get('fresh')))
+
+    async def _threeD(self, input):
+        async with self.clients.call('replicate'):
+            output = await self.clients.replicate.async_run(
+                SHAP_E_MODEL, input=input, use_file_output=False)
         if output:
-            image_data = requests.get(output[0]).content
-            upload_result = upload(image_data)
-            if upload_result is None:
-                raise ServerException('Error uploading image')
-            return upload_result["url"]
+            return await self._upload(await self._download(output[0]))
         raise ServerException('Error uploading image')
+
+    async def _download(self, url):
+        return await self.clients.download(url)
+
+    async def _prepare_image(self, image, fill=TRANSPARENT):
+        if is_url(image):
+            image = await self.clients.download_media(image)
+        return await self.images.prepare_png(image, PROVIDER_IMAGE_SIZE, fill)
+
+    async def _upload(self, image_data):
+        if not image_data:
+            raise ServerException('Error uploading image')
+        if self.index is None:
+            return await self._save(image_data)
+        url, phash = await asyncio.gather(
+            self._save(image_data), self.images.dhash(image_data), return_exceptions=True)
+        if isinstance(url, BaseException):
+            raise url
+        if not isinstance(phash, BaseException):
+            await self.index.add(content_hash(image_data), phash, url)
+        return url
+
+    async def _save(self, image_data):
+        async with self.clients.call('upload'):
+            return await self.storage.save(io.BytesIO(image_data), f'{uuid4().hex}.png')
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+AI_CACHE_BACKEND = os.getenv("AI_CACHE_BACKEND", "memory")
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", 24 * 60 * 60))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", 1024))
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", "ai_cache.sqlite3")
+
+CACHE_CONTROL_KEYS = ('fresh',)
+
+
+def normalize(value):
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items() if key not in CACHE_CONTROL_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    return value
+
+
+def cache_key(model: str, payload: dict) -> str:
+    raw = json.dumps([model, normalize(payload)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResultCache(ABC):
+
+    def __init__(self, name: str, ttl: float, max_entries: int) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._pending = {}
+
+    @abstractmethod
+    async def get(self, key: str):
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value):
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+    async def lookup(self, key: str, fresh: bool = False):
+        if fresh:
+            self.bypasses += 1
+            return None
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    async def get_or_create(self, key: str, create, fresh: bool = False):
+        while not fresh:
+            value = await self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            pending = self._pending.get(key)
+            if pending is None:
+                self.misses += 1
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        else:
+            self.bypasses += 1
+
+        future = asyncio.get_running_loop().create_future()
+        if not fresh:
+            self._pending[key] = future
+        try:
+            value = await create()
+            if value is not None:
+                await self.set(key, value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'backend': self.name,
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'bypasses': self.bypasses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+
+class MemoryResultCache(ResultCache):
+
+    def __init__(self, ttl: float = AI_CACHE_TTL, max_entries: int = AI_CACHE_MAX_ENTRIES) -> None:
+        super().__init__('memory', ttl, max_entries)
+        self.entries = OrderedDict()
+
+    async def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class SqliteResultCache(ResultCache):
+
+    def __init__(self, path: str = AI_CACHE_PATH, ttl: float = AI_CACHE_TTL,
+                 max_entries: int = AI_CACHE_MAX_ENTRIES) -> None:
+        super().__init__('sqlite', ttl, max_entries)
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS ai_results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ai_results_accessed_at ON ai_results (accessed_at)")
+        self.entries = self._count()
+
+    async def get(self, key: str):
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value):
+        await asyncio.to_thread(self._set, key, json.dumps(value))
+
+    def size(self) -> int:
+        return self.entries
+
+    def close(self):
+        self.connection.close()
+
+    def _count(self) -> int:
+        return self.connection.execute("SELECT count(*) FROM ai_results").fetchone()[0]
+
+    def _get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, expires_at FROM ai_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self.connection.execute("DELETE FROM ai_results WHERE key = ?", (key,))
+                self.entries -= 1
+                self.expirations += 1
+                return None
+            self.connection.execute(
+                "UPDATE ai_results SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        with self.lock:
+            exists = self.connection.execute(
+                "SELECT 1 FROM ai_results WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT INTO ai_results (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, value, now + self.ttl, now))
+            if not exists:
+                self.entries += 1
+            if self.entries > self.max_entries:
+                self.entries = self._count()
+                excess = self.entries - self.max_entries
+                if excess > 0:
+                    self.connection.execute(
+                        "DELETE FROM ai_results WHERE key IN ("
+                        "SELECT key FROM ai_results ORDER BY accessed_at LIMIT ?)", (excess,))
+                    self.entries -= excess
+                    self.evictions += excess
+
+
+result_cache_backends = {
+    'memory': MemoryResultCache,
+    'sqlite': SqliteResultCache,
+}
+
+_result_cache = None
+
+
+def get_result_cache():
+    global _result_cache
+    if AI_CACHE_BACKEND == 'none':
+        return None
+    if _result_cache is None:
+        if AI_CACHE_BACKEND not in result_cache_backends:
+            raise ValueError(f"Unknown AI cache backend {AI_CACHE_BACKEND}")
+        _result_cache = result_cache_backends[AI_CACHE_BACKEND]()
+    return _result_cache
+
+
+def close_result_cache():
+    global _result_cache
+    if isinstance(_result_cache, SqliteResultCache):
+        _result_cache.close()
+    _result_cache = None
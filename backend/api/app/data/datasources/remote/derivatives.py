@@ -0,0 +1,58 @@
+import asyncio
+import base64
+import os
+from typing import Dict, Optional, Tuple, Union
+from uuid import uuid4
+
+from app.data.datasources.remote.ai import AiClients, get_ai_clients
+from app.data.datasources.remote.images import ImagePool, get_image_pool
+from app.data.datasources.remote.storage import Storage, get_storage, is_url
+from app.data.datasources.remote.upload import UPLOAD_MAX_BYTES
+
+THUMBNAIL_WIDTHS = tuple(int(width) for width in os.getenv("THUMBNAIL_WIDTHS", "320,640,1024").split(","))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "WEBP").upper()
+
+thumbnail_extensions = {
+    "WEBP": "webp",
+    "AVIF": "avif",
+}
+
+
+def srcset(variants: Optional[Dict[str, str]]) -> Optional[str]:
+    if not variants:
+        return None
+    return ", ".join(
+        f"{url} {width}w" for width, url in sorted(variants.items(), key=lambda item: int(item[0])))
+
+
+class ImageDerivatives:
+
+    def __init__(self, storage: Storage = None, clients: AiClients = None, images: ImagePool = None,
+                 widths: Tuple[int, ...] = THUMBNAIL_WIDTHS, format: str = THUMBNAIL_FORMAT,
+                 max_bytes: int = UPLOAD_MAX_BYTES) -> None:
+        if format not in thumbnail_extensions:
+            raise ValueError(f"Unknown thumbnail format {format}")
+        self.storage = storage or get_storage()
+        self.clients = clients or get_ai_clients()
+        self.images = images or get_image_pool()
+        self.widths = widths
+        self.format = format
+        self.max_bytes = max_bytes
+
+    async def create(self, image: Union[str, bytes]) -> Dict[str, str]:
+        if is_url(image):
+            image = await self.clients.download_media(image, self.max_bytes)
+        elif isinstance(image, str):
+            image = base64.b64decode(image)
+
+        variants = await self.images.make_variants(image, self.widths, self.format)
+        name = uuid4().hex
+        urls = await asyncio.gather(*(
+            self._save(variant, f"{name}-{width}w.{thumbnail_extensions[self.format]}")
+            for width, variant in variants
+        ))
+        return {str(width): url for (width, _), url in zip(variants, urls)}
+
+    async def _save(self, variant, name):
+        async with self.clients.call('upload'):
+            return await self.storage.save(variant, name)
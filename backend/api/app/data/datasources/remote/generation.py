@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.data.datasources.remote.ai import AiGeneration
+from core.errors.exceptions import CacheException
+
+baseUrl = os.getenv("BASE_URL")
+
+
+class ModelHandler:
+
+    def __init__(self, name: str, call: str, output: str, error: str, endpoint: Optional[str] = None,
+                 inputs: Tuple[str, ...] = ('prompt',), upload_user_image: bool = False) -> None:
+        self.name = name
+        self.call = call
+        self.output = output
+        self.error = error
+        self.endpoint = endpoint
+        self.inputs = inputs
+        self.upload_user_image = upload_user_image
+
+    async def generate(self, ai_generation: AiGeneration, payload: dict, base_url: Optional[str] = None):
+        method = getattr(ai_generation, self.call)
+        if self.endpoint is None:
+            return await method(payload)
+        headers = {
+            "accept": "application/json",
+            "content-type": "application/json"
+        }
+        return await method(f"{base_url or baseUrl}{self.endpoint}", headers, payload)
+
+
+model_handlers = {
+    handler.name: handler for handler in (
+        ModelHandler('text_to_image', 'get_image', 'image', "Error getting image",
+                     endpoint='/text-to-image'),
+        ModelHandler('image_to_image', 'get_image', 'image', "Error getting image",
+                     endpoint='/image-to-image', inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('controlNet', 'get_image', 'image', "Error getting image",
+                     endpoint='/controlnet', inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('painting', 'get_image', 'image', "Error getting image",
+                     endpoint='/inpaint', inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('instruction', 'get_image', 'image', "Error getting image",
+                     endpoint='/instruct', inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('image_variant', 'image_variant', 'image', "Error getting image variant",
+                     inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('image_from_text', 'create_from_text', 'image', "Error getting image from text"),
+        ModelHandler('edit_image', 'create_from_image', 'image', "Error getting image edit",
+                     inputs=('prompt', 'image', 'mask'), upload_user_image=True),
+        ModelHandler('chatbot', 'chatbot', 'chat', "Chatbot error"),
+        ModelHandler('analysis', 'analysis', 'analysis', "Analysis error",
+                     inputs=('prompt', 'image'), upload_user_image=True),
+        ModelHandler('text_to_3D', 'text_to_threeD', 'threeD', "3D error from text"),
+        ModelHandler('image_to_3D', 'image_to_threeD', 'threeD', "3D error",
+                     inputs=('prompt', 'image'), upload_user_image=True),
+    )
+}
+
+
+@dataclass
+class Generation:
+    image: str = ''
+    user_image: str = ''
+    analysis: dict = field(default_factory=lambda: {'title': '', 'detail': ''})
+    threeD: str = ''
+    chat: str = ''
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class PhaseTimings:
+
+    phases = ('generation', 'upload', 'total')
+
+    def __init__(self) -> None:
+        self.models = {}
+
+    def record(self, model: str, timings: Dict[str, float]):
+        totals = self.models.setdefault(model, dict.fromkeys(self.phases + ('count', 'saved'), 0.0))
+        totals['count'] += 1
+        for phase in self.phases:
+            totals[phase] += timings.get(phase, 0.0)
+        totals['saved'] += timings.get('generation', 0.0) + timings.get('upload', 0.0) - timings['total']
+
+    def stats(self) -> List[dict]:
+        return [
+            dict({'model': model, 'count': int(totals['count'])}, **{
+                f'{phase}_ms': totals[phase] / totals['count'] * 1000
+                for phase in self.phases + ('saved',)
+            }) for model, totals in self.models.items()
+        ]
+
+    def clear(self):
+        self.models.clear()
+
+
+generation_timings = PhaseTimings()
+
+
+def get_model_handler(model: str) -> ModelHandler:
+    handler = model_handlers.get(model)
+    if handler is None:
+        raise CacheException("Model not found")
+    return handler
+
+
+async def generate(ai_generation: AiGeneration, model: str, payload: dict,
+                   base_url: Optional[str] = None) -> Generation:
+    handler = get_model_handler(model)
+    for name in handler.inputs:
+        if name not in payload:
+            raise CacheException(f"No {name} found")
+
+    start = time.perf_counter()
+    calls = {'generation': handler.generate(ai_generation, payload, base_url)}
+    if handler.upload_user_image:
+        calls['upload'] = ai_generation.upload_image(payload['image'])
+    tasks = {phase: asyncio.ensure_future(_timed(call)) for phase, call in calls.items()}
+    try:
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    except Exception:
+        raise CacheException(handler.error)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    timings = {phase: elapsed for phase, (_, elapsed) in results.items()}
+    timings['total'] = time.perf_counter() - start
+    generation_timings.record(model, timings)
+
+    generation = Generation(timings=timings)
+    setattr(generation, handler.output, results['generation'][0])
+    if 'upload' in results:
+        generation.user_image = results['upload'][0]
+    return generation
+
+
+async def _timed(call):
+    start = time.perf_counter()
+    result = await call
+    return result, time.perf_counter() - start
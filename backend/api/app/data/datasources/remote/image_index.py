@@ -0,0 +1,138 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+from app.data.models.image import ImageModel
+from core.config.database_config import SessionLocal, insert_ignore
+from sqlalchemy import or_, select
+
+IMAGE_INDEX_BACKEND = os.getenv("IMAGE_INDEX_BACKEND", "database")
+IMAGE_INDEX_MAX_ENTRIES = int(os.getenv("IMAGE_INDEX_MAX_ENTRIES", 10000))
+PHASH_BANDS = 4
+NEAR_DUPLICATE_DISTANCE = min(max(int(os.getenv("NEAR_DUPLICATE_DISTANCE", PHASH_BANDS - 1)), 0), PHASH_BANDS - 1)
+
+
+def content_hash(image: bytes) -> str:
+    return hashlib.sha256(image).hexdigest()
+
+
+def file_content_hash(file: BinaryIO) -> str:
+    file.seek(0)
+    try:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
+    finally:
+        file.seek(0)
+
+
+def phash_bands(phash: str) -> List[str]:
+    width = len(phash) // PHASH_BANDS
+    return [phash[band * width:(band + 1) * width] for band in range(PHASH_BANDS)]
+
+
+def hamming_distance(first: str, second: str) -> int:
+    return (int(first, 16) ^ int(second, 16)).bit_count()
+
+
+@dataclass
+class IndexedImage:
+    sha256: str
+    phash: str
+    url: str
+    distance: int = 0
+
+
+class ImageIndex(ABC):
+
+    @abstractmethod
+    async def find(self, sha256: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def add(self, sha256: str, phash: str, url: str):
+        ...
+
+    @abstractmethod
+    async def candidates(self, phash: str) -> List[Tuple[str, str, str]]:
+        ...
+
+    async def near_duplicates(self, phash: str,
+                              max_distance: int = NEAR_DUPLICATE_DISTANCE) -> List[IndexedImage]:
+        if not 0 <= max_distance < PHASH_BANDS:
+            raise ValueError(f"max_distance must be between 0 and {PHASH_BANDS - 1}")
+        matches = []
+        for sha256, candidate, url in await self.candidates(phash):
+            distance = hamming_distance(phash, candidate)
+            if distance <= max_distance:
+                matches.append(IndexedImage(sha256, candidate, url, distance))
+        return sorted(matches, key=lambda match: match.distance)
+
+
+class MemoryImageIndex(ImageIndex):
+
+    def __init__(self, max_entries: int = IMAGE_INDEX_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    async def find(self, sha256: str) -> Optional[str]:
+        entry = self.entries.get(sha256)
+        if entry is None:
+            return None
+        self.entries.move_to_end(sha256)
+        return entry[1]
+
+    async def add(self, sha256: str, phash: str, url: str):
+        self.entries.setdefault(sha256, (phash, url))
+        self.entries.move_to_end(sha256)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def candidates(self, phash: str) -> List[Tuple[str, str, str]]:
+        return [(sha256, candidate, url) for sha256, (candidate, url) in self.entries.items()]
+
+
+class DatabaseImageIndex(ImageIndex):
+
+    def __init__(self, session_factory=SessionLocal) -> None:
+        self.session_factory = session_factory
+
+    async def find(self, sha256: str) -> Optional[str]:
+        async with self.session_factory() as db:
+            return await db.scalar(select(ImageModel.url).where(ImageModel.sha256 == sha256))
+
+    async def add(self, sha256: str, phash: str, url: str):
+        bands = {f'phash_{band}': value for band, value in enumerate(phash_bands(phash))}
+        async with self.session_factory() as db:
+            await db.execute(insert_ignore(ImageModel).values(sha256=sha256, phash=phash, url=url, **bands))
+            await db.commit()
+
+    async def candidates(self, phash: str) -> List[Tuple[str, str, str]]:
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(ImageModel.sha256, ImageModel.phash, ImageModel.url).where(or_(*(
+                    getattr(ImageModel, f'phash_{band}') == value
+                    for band, value in enumerate(phash_bands(phash))
+                )))
+            )
+            return [tuple(row) for row in rows.all()]
+
+
+image_index_backends = {
+    'database': DatabaseImageIndex,
+    'memory': MemoryImageIndex,
+}
+
+_image_index = None
+
+
+def get_image_index():
+    global _image_index
+    if IMAGE_INDEX_BACKEND == 'none':
+        return None
+    if _image_index is None:
+        if IMAGE_INDEX_BACKEND not in image_index_backends:
+            raise ValueError(f"Unknown image index backend {IMAGE_INDEX_BACKEND}")
+        _image_index = image_index_backends[IMAGE_INDEX_BACKEND]()
+    return _image_index
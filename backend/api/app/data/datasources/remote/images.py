@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, Tuple, Union
+
+from PIL import Image
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", min(2, os.cpu_count() or 1)))
+PROVIDER_IMAGE_SIZE = (512, 512)
+TRANSPARENT = (0, 0, 0, 0)
+OPAQUE = (0, 0, 0, 255)
+
+
+def fit_size(size: Tuple[int, int], bounds: Tuple[int, int]) -> Tuple[int, int]:
+    scale = min(bounds[0] / size[0], bounds[1] / size[1])
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def downscale(image: Image.Image, target: Tuple[int, int]) -> Image.Image:
+    image.draft('RGB', target)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    factor = min(image.width // target[0], image.height // target[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != target:
+        image = image.resize(target, Image.LANCZOS)
+    return image
+
+
+def prepare_png(image: Union[str, bytes], size: Tuple[int, int] = PROVIDER_IMAGE_SIZE,
+                fill: Tuple[int, int, int, int] = TRANSPARENT) -> io.BytesIO:
+    if isinstance(image, str):
+        image = base64.b64decode(image)
+    with Image.open(io.BytesIO(image)) as source:
+        target = fit_size(source.size, size)
+        resized = downscale(source, target).convert('RGBA')
+    canvas = Image.new('RGBA', size, fill)
+    canvas.paste(resized, ((size[0] - target[0]) // 2, (size[1] - target[1]) // 2))
+    output = io.BytesIO()
+    canvas.save(output, format='PNG', compress_level=1)
+    output.seek(0)
+    return output
+
+
+def make_variants(image: bytes, widths: Tuple[int, ...], format: str = 'WEBP',
+                  quality: int = 80) -> List[Tuple[int, io.BytesIO]]:
+    variants = []
+    with Image.open(io.BytesIO(image)) as source:
+        widths = sorted((width for width in widths if width < source.width), reverse=True)
+        if not widths:
+            return variants
+        current = source
+        for width in widths:
+            current = downscale(current, (width, max(1, round(current.height * width / current.width))))
+            output = io.BytesIO()
+            current.save(output, format=format, quality=quality)
+            output.seek(0)
+            variants.append((width, output))
+    return variants[::-1]
+
+
+def dhash(image: Union[bytes, BinaryIO]) -> str:
+    with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as source:
+        source.draft('L', (64, 64))
+        pixels = source.convert('L').resize((9, 8), Image.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            bits = bits << 1 | (left < pixels[row * 9 + column + 1])
+    return f'{bits:016x}'
+
+
+class ImagePool:
+
+    def __init__(self, workers: int = IMAGE_WORKERS) -> None:
+        self.workers = workers
+        self.executor = None
+
+    async def prepare_png(self, image: Union[str, bytes], size: Tuple[int, int] = PROVIDER_IMAGE_SIZE,
+                          fill: Tuple[int, int, int, int] = TRANSPARENT) -> io.BytesIO:
+        return await self._run(prepare_png, image, size, fill)
+
+    async def make_variants(self, image: bytes, widths: Tuple[int, ...],
+                            format: str = 'WEBP') -> List[Tuple[int, io.BytesIO]]:
+        return await self._run(make_variants, image, widths, format)
+
+    async def dhash(self, image: bytes) -> str:
+        return await self._run(dhash, image)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _run(self, function, *args):
+        if self.workers <= 0:
+            return function(*args)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+
+image_pool = ImagePool()
+
+
+def get_image_pool() -> ImagePool:
+    return image_pool
+
+
+def close_image_pool():
+    image_pool.close()
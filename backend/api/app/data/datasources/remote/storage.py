@@ -0,0 +1,100 @@
+import asyncio
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+from urllib.parse import urlparse
+
+import cloudinary
+import cloudinary.uploader
+from core.errors.exceptions import ServerException
+
+CAPI_KEY = os.getenv("CLD_API_KEY")
+CAPI_SECRET = os.getenv("CLD_API_SECRET")
+cloudinary.config(
+    cloud_name="dtghsmx0s", api_key=CAPI_KEY, api_secret=CAPI_SECRET)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary")
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+MEDIA_URL = os.getenv("MEDIA_URL", "http://localhost:8000/media").rstrip("/")
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 1024 * 1024))
+CLOUDINARY_CHUNK_SIZE = int(os.getenv("CLOUDINARY_CHUNK_SIZE", 20_000_000))
+MEDIA_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.getenv("MEDIA_HOSTS", f"{urlparse(MEDIA_URL).hostname},res.cloudinary.com").split(",")
+    if host.strip()
+)
+
+
+def is_url(value) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def is_media_url(value, hosts=MEDIA_HOSTS) -> bool:
+    return is_url(value) and (urlparse(value).hostname or "") in hosts
+
+
+class Storage(ABC):
+
+    @abstractmethod
+    async def save(self, file: BinaryIO, name: str) -> str:
+        ...
+
+
+class CloudinaryStorage(Storage):
+
+    def __init__(self, chunk_size: int = CLOUDINARY_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+
+    async def save(self, file: BinaryIO, name: str) -> str:
+        try:
+            result = await asyncio.to_thread(
+                cloudinary.uploader.upload_large,
+                file,
+                resource_type="image",
+                filename=name,
+                chunk_size=self.chunk_size
+            )
+        except Exception:
+            raise ServerException("Error uploading image")
+        if not result or "url" not in result:
+            raise ServerException("Error uploading image")
+        return result["url"]
+
+
+class LocalStorage(Storage):
+
+    def __init__(self, root: str = MEDIA_ROOT, base_url: str = MEDIA_URL,
+                 chunk_size: int = STORAGE_CHUNK_SIZE) -> None:
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+
+    async def save(self, file: BinaryIO, name: str) -> str:
+        try:
+            await asyncio.to_thread(self._write, file, os.path.join(self.root, name))
+        except OSError:
+            raise ServerException("Error uploading image")
+        return f"{self.base_url}/{name}"
+
+    def _write(self, file: BinaryIO, path: str):
+        os.makedirs(self.root, exist_ok=True)
+        with open(path, "wb") as output:
+            shutil.copyfileobj(file, output, self.chunk_size)
+
+
+storage_backends = {
+    "cloudinary": CloudinaryStorage,
+    "local": LocalStorage,
+}
+
+_storage = None
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND not in storage_backends:
+            raise ValueError(f"Unknown storage backend {STORAGE_BACKEND}")
+        _storage = storage_backends[STORAGE_BACKEND]()
+    return _storage
@@ -0,0 +1,94 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+from uuid import uuid4
+
+from app.data.datasources.remote.image_index import ImageIndex, file_content_hash, get_image_index
+from app.data.datasources.remote.images import dhash
+from app.data.datasources.remote.storage import Storage, get_storage
+from app.domain.entities.upload import UploadEntity
+from core.errors.exceptions import ServerException
+from PIL import Image, UnidentifiedImageError
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 20 * 1024 * 1024))
+
+image_formats = {
+    'PNG': ('png', 'image/png'),
+    'JPEG': ('jpg', 'image/jpeg'),
+    'WEBP': ('webp', 'image/webp'),
+    'GIF': ('gif', 'image/gif'),
+}
+
+
+def image_format(file: BinaryIO):
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            return image.format
+    except (UnidentifiedImageError, OSError):
+        return None
+    finally:
+        file.seek(0)
+
+
+def image_dhash(file: BinaryIO) -> str:
+    file.seek(0)
+    try:
+        return dhash(file)
+    finally:
+        file.seek(0)
+
+
+class UploadRemoteDataSource(ABC):
+
+    @abstractmethod
+    async def create_upload(self, file: BinaryIO) -> UploadEntity:
+        ...
+
+
+class UploadRemoteDataSourceImpl(UploadRemoteDataSource):
+
+    def __init__(self, storage: Storage = None, max_bytes: int = UPLOAD_MAX_BYTES, index: ImageIndex = None):
+        self.storage = storage or get_storage()
+        self.max_bytes = max_bytes
+        self.index = index if index is not None else get_image_index()
+
+    async def create_upload(self, file: BinaryIO) -> UploadEntity:
+        size = file.seek(0, os.SEEK_END)
+        if size == 0:
+            raise ServerException("Empty upload")
+        if size > self.max_bytes:
+            raise ServerException("Upload is too large")
+
+        format = await asyncio.to_thread(image_format, file)
+        if format not in image_formats:
+            raise ServerException("Unsupported image format")
+        extension, content_type = image_formats[format]
+
+        if self.index is not None:
+            sha256 = await asyncio.to_thread(file_content_hash, file)
+            url = await self.index.find(sha256)
+            if url:
+                return UploadEntity(
+                    id=url.rsplit("/", 1)[-1].split(".", 1)[0],
+                    url=url,
+                    content_type=content_type,
+                    size=size
+                )
+
+        _id = uuid4().hex
+        url = await self.storage.save(file, f"{_id}.{extension}")
+        if self.index is not None:
+            try:
+                phash = await asyncio.to_thread(image_dhash, file)
+            except OSError:
+                phash = None
+            if phash is not None:
+                await self.index.add(sha256, phash, url)
+        return UploadEntity(
+            id=_id,
+            url=url,
+            content_type=content_type,
+            size=size
+        )
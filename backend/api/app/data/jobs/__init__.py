@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+from app.data.datasources.local.chat import ChatLocalDataSourceImpl
+from app.data.datasources.local.message import MessageLocalDataSourceImpl
+from app.data.datasources.remote.derivatives import ImageDerivatives
+from app.data.jobs.notifier import JOB_SUBMITTED, job_notifier
+from app.data.models.job import (JOB_DEAD, JOB_QUEUED, JOB_RUNNING,
+                                 JOB_SUCCEEDED, JobModel)
+from app.data.models.post import PostModel
+from app.data.models.team import TeamModel
+from app.domain.entities.message import Message
+from core.config.database_config import SessionLocal
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 5))
+JOB_LEASE = float(os.getenv("JOB_LEASE", 60))
+
+logger = logging.getLogger(__name__)
+
+image_variant_models = {
+    'post': PostModel,
+    'team': TeamModel,
+}
+
+
+async def run_chat_job(db: AsyncSession, job: JobModel) -> dict:
+    chat = await ChatLocalDataSourceImpl(db).create_chat(Message(**job.payload))
+    job.chat_id = chat.id
+    return {'chat_id': chat.id, 'messages': chat.messages}
+
+
+async def run_message_job(db: AsyncSession, job: JobModel) -> dict:
+    message = await MessageLocalDataSourceImpl(db).create_chat(
+        Message(**job.payload), job.chat_id, job.user_id)
+    return message.to_dict()
+
+
+async def run_image_variants_job(db: AsyncSession, job: JobModel,
+                                 derivatives: ImageDerivatives = None) -> dict:
+    model = image_variant_models[job.payload['target']]
+    variants = await (derivatives or ImageDerivatives()).create(job.payload['image'])
+    await db.execute(
+        update(model)
+        .where(model.id == job.payload['id'], model.image == job.payload['image'])
+        .values(image_variants=variants)
+    )
+    return variants
+
+
+job_handlers = {
+    'chat': run_chat_job,
+    'message': run_message_job,
+    'image_variants': run_image_variants_job,
+}
+
+
+class JobWorker:
+
+    def __init__(self, session_factory=SessionLocal, handlers=job_handlers, workers=JOB_WORKERS,
+                 poll_interval=JOB_POLL_INTERVAL, retry_delay=JOB_RETRY_DELAY, lease=JOB_LEASE) -> None:
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self.tasks = []
+
+    async def start(self):
+        await self.recover()
+        self.tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def recover(self) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(JobModel).where(self._lease_expired(datetime.utcnow()))
+                .values(status=JOB_QUEUED, locked_until=None)
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def run_once(self) -> bool:
+        job_id = await self._claim()
+        if job_id is None:
+            return False
+        await self._execute(job_id)
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                ran = await self.run_once()
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if not ran:
+                await job_notifier.wait(JOB_SUBMITTED, self.poll_interval)
+
+    def _lease_expired(self, now: datetime):
+        return and_(JobModel.status == JOB_RUNNING,
+                    or_(JobModel.locked_until.is_(None), JobModel.locked_until <= now))
+
+    def _claimable(self, now: datetime):
+        return or_(and_(JobModel.status == JOB_QUEUED, JobModel.run_at <= now), self._lease_expired(now))
+
+    async def _claim(self):
+        async with self.session_factory() as db:
+            while True:
+                now = datetime.utcnow()
+                job_id = await db.scalar(
+                    select(JobModel.id)
+                    .where(self._claimable(now))
+                    .order_by(JobModel.run_at)
+                    .limit(1)
+                )
+                if job_id is None:
+                    return None
+                claimed = await db.execute(
+                    update(JobModel)
+                    .where(JobModel.id == job_id, self._claimable(now))
+                    .values(status=JOB_RUNNING, attempts=JobModel.attempts + 1,
+                            locked_until=now + timedelta(seconds=self.lease), updated_at=now)
+                )
+                await db.commit()
+                if claimed.rowcount:
+                    return job_id
+
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(JobModel)
+                        .where(JobModel.id == job_id, JobModel.status == JOB_RUNNING)
+                        .values(locked_until=datetime.utcnow() + timedelta(seconds=self.lease))
+                    )
+                    await db.commit()
+            except Exception:
+                logger.exception("Failed to renew lease for job %s", job_id)
+
+    async def _execute(self, job_id: str):
+        async with self.session_factory() as db:
+            job = await db.get(JobModel, job_id)
+            if job is None:
+                return
+            heartbeat = asyncio.create_task(self._renew_lease(job_id))
+            try:
+                job.result = await self.handlers[job.kind](db, job)
+                job.status = JOB_SUCCEEDED
+                job.error = None
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(job)
+                job.error = str(e)[:1024] or type(e).__name__
+                if job.attempts >= job.max_attempts:
+                    job.status = JOB_DEAD
+                else:
+                    job.status = JOB_QUEUED
+                    job.run_at = datetime.utcnow() + timedelta(
+                        seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            finally:
+                heartbeat.cancel()
+            job.locked_until = None
+            await db.commit()
+        job_notifier.notify(job_id)
@@ -0,0 +1,15 @@
+import asyncio
+
+from app.data.jobs import JobWorker
+
+
+async def main():
+    worker = JobWorker()
+    await worker.start()
+    try:
+        await asyncio.gather(*worker.tasks)
+    finally:
+        await worker.stop()
+
+
+asyncio.run(main())
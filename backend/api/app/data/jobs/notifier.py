@@ -0,0 +1,32 @@
+import asyncio
+
+JOB_SUBMITTED = 'submitted'
+
+
+class JobNotifier:
+
+    def __init__(self) -> None:
+        self.waiters = {}
+
+    async def wait(self, key: str, timeout: float) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(key, set()).add(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            waiters = self.waiters.get(key)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    del self.waiters[key]
+
+    def notify(self, key: str) -> None:
+        for future in self.waiters.pop(key, ()):
+            if not future.done():
+                future.set_result(None)
+
+
+job_notifier = JobNotifier()
@@ -0,0 +1,64 @@
+import os
+
+from app.data.migrations import (chat_messages, chat_summaries,
+                                 follow_counters, follow_indexes,
+                                 image_variants, job_leases, post_counters,
+                                 post_indexes, post_tags, search,
+                                 unique_reactions, unique_team_members)
+from app.data.models.migration import MigrationModel
+from core.config.database_config import SessionLocal, engine
+from sqlalchemy import Connection, text
+from sqlalchemy.orm import Session
+
+MIGRATION_LOCK = 'app_migrations'
+MIGRATION_LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", 600))
+
+migrations = [
+    post_tags,
+    post_indexes,
+    search,
+    post_counters,
+    unique_reactions,
+    chat_messages,
+    chat_summaries,
+    unique_team_members,
+    follow_indexes,
+    follow_counters,
+    image_variants,
+    job_leases,
+]
+
+
+def apply_migrations(db: Session):
+    applied = {name for name, in db.query(MigrationModel.name).all()}
+    for migration in migrations:
+        name = migration.__name__.rsplit('.', 1)[-1]
+        if name in applied:
+            continue
+        migration.upgrade(db)
+        db.add(MigrationModel(name=name))
+        db.commit()
+
+
+def acquire_migration_lock(connection: Connection):
+    if connection.dialect.name != 'mysql':
+        return
+    acquired = connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {
+        'name': MIGRATION_LOCK, 'timeout': MIGRATION_LOCK_TIMEOUT}).scalar()
+    if acquired != 1:
+        raise RuntimeError("Timed out waiting for the migration lock")
+
+
+def release_migration_lock(connection: Connection):
+    if connection.dialect.name == 'mysql':
+        connection.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': MIGRATION_LOCK})
+
+
+async def run_migrations():
+    async with engine.connect() as lock:
+        await lock.run_sync(acquire_migration_lock)
+        try:
+            async with SessionLocal() as db:
+                await db.run_sync(apply_migrations)
+        finally:
+            await lock.run_sync(release_migration_lock)
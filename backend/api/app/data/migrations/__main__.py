@@ -0,0 +1,5 @@
+import asyncio
+
+from app.data.migrations import run_migrations
+
+asyncio.run(run_migrations())
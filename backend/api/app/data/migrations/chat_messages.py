@@ -0,0 +1,41 @@
+import json
+from datetime import datetime
+
+from app.data.migrations.schema import add_missing_columns
+from app.data.models.chat import ChatMessageModel, ChatModel
+from sqlalchemy import insert, null, update
+from sqlalchemy.orm import Session
+
+BATCH_SIZE = 100
+
+
+def message_row(chat_id: str, seq: int, message) -> dict:
+    if isinstance(message, str):
+        message = json.loads(message)
+    return {
+        'chat_id': chat_id,
+        'seq': seq,
+        'id': message.get('id'),
+        'sender': message.get('sender'),
+        'content': message.get('content') or {},
+        'date': datetime.fromisoformat(message['date']) if message.get('date') else datetime.utcnow()
+    }
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, ChatModel.__table__)
+    while True:
+        chats = db.query(ChatModel.id, ChatModel.messages).filter(
+            ChatModel.messages.isnot(None)
+        ).order_by(ChatModel.id).limit(BATCH_SIZE).all()
+        if not chats:
+            break
+
+        for chat_id, messages in chats:
+            rows = [message_row(chat_id, seq, message)
+                    for seq, message in enumerate(messages or [], start=1)]
+            if rows:
+                db.execute(insert(ChatMessageModel), rows)
+            db.execute(update(ChatModel).where(ChatModel.id == chat_id).values(
+                messages=null(), message_count=len(rows)))
+        db.commit()
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from app.data.migrations.schema import add_missing_columns, create_missing_indexes
+from app.data.models.chat import ChatMessageModel, ChatModel, chat_preview
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+BATCH_SIZE = 500
+PREVIEW_MESSAGES = 2
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, ChatModel.__table__)
+    create_missing_indexes(db, ChatModel.__table__)
+    last_id = ''
+    while True:
+        chat_ids = [chat_id for chat_id, in db.query(ChatModel.id).filter(
+            ChatModel.id > last_id,
+            ChatModel.updated_at.is_(None)
+        ).order_by(ChatModel.id).limit(BATCH_SIZE)]
+        if not chat_ids:
+            break
+
+        for chat_id in chat_ids:
+            messages = db.query(ChatMessageModel.content, ChatMessageModel.date).filter(
+                ChatMessageModel.chat_id == chat_id
+            ).order_by(ChatMessageModel.seq.desc()).limit(PREVIEW_MESSAGES).all()
+            db.execute(update(ChatModel).where(ChatModel.id == chat_id).values(
+                last_message=chat_preview(content for content, _ in reversed(messages)),
+                updated_at=messages[0].date if messages else datetime.utcnow()
+            ))
+        db.commit()
+        last_id = chat_ids[-1]
@@ -0,0 +1,9 @@
+from app.data.counters import reconcile_follow_counters
+from app.data.migrations.schema import add_missing_columns
+from app.data.models.user import UserModel
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, UserModel.__table__)
+    reconcile_follow_counters(db)
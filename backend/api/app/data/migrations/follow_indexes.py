@@ -0,0 +1,7 @@
+from app.data.migrations.schema import create_missing_indexes
+from app.data.models.user import user_following
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    create_missing_indexes(db, user_following)
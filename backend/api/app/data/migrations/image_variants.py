@@ -0,0 +1,9 @@
+from app.data.migrations.schema import add_missing_columns
+from app.data.models.post import PostModel
+from app.data.models.team import TeamModel
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, PostModel.__table__)
+    add_missing_columns(db, TeamModel.__table__)
@@ -0,0 +1,7 @@
+from app.data.migrations.schema import add_missing_columns
+from app.data.models.job import JobModel
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, JobModel.__table__)
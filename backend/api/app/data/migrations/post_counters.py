@@ -0,0 +1,9 @@
+from app.data.counters import reconcile_post_counters
+from app.data.migrations.schema import add_missing_columns
+from app.data.models.post import PostModel
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    add_missing_columns(db, PostModel.__table__)
+    reconcile_post_counters(db)
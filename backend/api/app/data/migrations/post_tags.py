@@ -0,0 +1,21 @@
+from app.data.models.post import PostModel, PostTagModel, normalize_tags
+from sqlalchemy.orm import Session
+
+BATCH_SIZE = 500
+
+
+def upgrade(db: Session):
+    last_id = ''
+    while True:
+        posts = db.query(PostModel.id, PostModel.tags).filter(
+            PostModel.id > last_id,
+            ~PostModel.post_tags.any()
+        ).order_by(PostModel.id).limit(BATCH_SIZE).all()
+        if not posts:
+            break
+
+        for post_id, tags in posts:
+            for tag in normalize_tags(tags):
+                db.add(PostTagModel(post_id=post_id, tag=tag))
+        db.commit()
+        last_id = posts[-1].id
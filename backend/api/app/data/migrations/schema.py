@@ -0,0 +1,21 @@
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+
+def add_missing_columns(db: Session, table: Table):
+    bind = db.get_bind()
+    existing = {column['name'] for column in inspect(bind).get_columns(table.name)}
+    table_name = bind.dialect.identifier_preparer.format_table(table)
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        column_ddl = CreateColumn(column).compile(dialect=bind.dialect)
+        db.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_ddl}'))
+    db.commit()
+
+
+def create_missing_indexes(db: Session, table: Table):
+    bind = db.get_bind()
+    for index in table.indexes:
+        index.create(bind=bind, checkfirst=True)
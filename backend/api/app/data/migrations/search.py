@@ -0,0 +1,9 @@
+from app.data.datasources.local.search import get_post_search
+from app.data.migrations.schema import create_missing_indexes
+from app.data.models.user import UserModel
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    create_missing_indexes(db, UserModel.__table__)
+    get_post_search(db).upgrade(db)
@@ -0,0 +1,18 @@
+from app.data.counters import reconcile_post_counters
+from app.data.migrations.schema import create_missing_indexes
+from app.data.models.post import CloneModel, LikeModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    for model in (LikeModel, CloneModel):
+        table = model.__tablename__
+        db.execute(text(
+            f"DELETE FROM {table} WHERE id NOT IN ("
+            f"SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM {table} "
+            f"GROUP BY post_id, user_id) AS keep)"
+        ))
+        db.commit()
+        create_missing_indexes(db, model.__table__)
+    reconcile_post_counters(db)
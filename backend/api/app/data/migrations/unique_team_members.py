@@ -0,0 +1,15 @@
+from app.data.migrations.schema import create_missing_indexes
+from app.data.models.team import UserTeamModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def upgrade(db: Session):
+    table = UserTeamModel.__tablename__
+    db.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN ("
+        f"SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM {table} "
+        f"GROUP BY user_id, team_id) AS keep)"
+    ))
+    db.commit()
+    create_missing_indexes(db, UserTeamModel.__table__)
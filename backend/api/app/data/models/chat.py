@@ -1,17 +1,50 @@
+from datetime import datetime
+
 from core.config.database_config import Base
-from sqlalchemy import Column, String, JSON, ForeignKey
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
+PREVIEW_LENGTH = 255
+
+
+def chat_preview(contents) -> str:
+    for content in reversed(list(contents)):
+        analysis = content.get('analysis')
+        for text in (content.get('chat'), analysis.get('title') if isinstance(analysis, dict) else None,
+                     content.get('prompt')):
+            if isinstance(text, str) and text.strip():
+                return text.strip()[:PREVIEW_LENGTH]
+    return ''
+
+
 class ChatModel(Base):
     __tablename__ = 'chats'
+    __table_args__ = (
+        Index('ix_chats_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+    )
+
     id = Column(String(36), nullable=True, primary_key=True)
     user_id = user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     title = Column(String(512), nullable=False)
     user = relationship('UserModel', back_populates='chats')
-    messages = Column(JSON)
-    
+    messages = Column(JSON(none_as_null=True), nullable=True)
+    message_count = Column(Integer, nullable=False, default=0, server_default='0')
+    last_message = Column(String(PREVIEW_LENGTH), nullable=True)
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+
     def __repr__(self) -> str:
         return f'<ChatModel id={self.id} user_id={self.user_id} title={self.title}>'
-    
-    def add_message(self, message_dict):
-        self.messages.append(message_dict)
+
+
+class ChatMessageModel(Base):
+    __tablename__ = 'chat_messages'
+
+    chat_id = Column(String(36), ForeignKey('chats.id'), primary_key=True)
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    id = Column(String(36), nullable=False)
+    sender = Column(String(16), nullable=False)
+    content = Column(JSON, nullable=False)
+    date = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f'<ChatMessageModel chat_id={self.chat_id} seq={self.seq} sender={self.sender}>'
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from core.config.database_config import Base
+from sqlalchemy import Column, DateTime, Index, String
+
+
+class ImageModel(Base):
+    __tablename__ = 'images'
+    __table_args__ = (
+        Index('ix_images_phash_0', 'phash_0'),
+        Index('ix_images_phash_1', 'phash_1'),
+        Index('ix_images_phash_2', 'phash_2'),
+        Index('ix_images_phash_3', 'phash_3'),
+    )
+
+    sha256 = Column(String(64), primary_key=True)
+    phash = Column(String(16), nullable=False)
+    phash_0 = Column(String(4), nullable=False)
+    phash_1 = Column(String(4), nullable=False)
+    phash_2 = Column(String(4), nullable=False)
+    phash_3 = Column(String(4), nullable=False)
+    url = Column(String(512), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImageModel(sha256={self.sha256}, url={self.url})>'
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from core.config.database_config import Base
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_DEAD = 'dead'
+
+
+class JobModel(Base):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(32), nullable=False)
+    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    chat_id = Column(String(36), nullable=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=JOB_QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(String(1024), nullable=True)
+    result = Column(JSON, nullable=True)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<JobModel(id={self.id}, kind={self.kind}, status={self.status})>'
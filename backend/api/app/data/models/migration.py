@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from core.config.database_config import Base
+from sqlalchemy import Column, DateTime, String
+
+
+class MigrationModel(Base):
+    __tablename__ = 'schema_migrations'
+
+    name = Column(String(128), primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MigrationModel(name={self.name})>'
@@ -1,39 +1,41 @@
 from datetime import datetime
 
 from core.config.database_config import Base
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, String, func
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
+TAG_MAX_LENGTH = 64
+
+
+def normalize_tags(tags) -> list:
+    normalized = (tag.strip().casefold()[:TAG_MAX_LENGTH].strip() for tag in tags or [] if isinstance(tag, str))
+    return list(dict.fromkeys(tag for tag in normalized if tag))
+
 
 class PostModel(Base):
     __tablename__ = 'posts'
+    __table_args__ = (
+        Index('ix_posts_date_id', 'date', 'id'),
+        Index('ix_posts_user_id_date_id', 'user_id', 'date', 'id'),
+        Index('ix_posts_fulltext', 'title', 'content',
+              mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
 
     id = Column(String(36), primary_key=True, nullable=True)
     title = Column(String(512), nullable=False)
     content = Column(String(512), nullable=True)
     image = Column(String(128), nullable=True)
+    image_variants = Column(JSON, nullable=True)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     tags = Column(JSON, nullable=True)
     date = Column(DateTime, default=datetime.utcnow)
+    like_count = Column(Integer, nullable=False, default=0, server_default='0')
+    clone_count = Column(Integer, nullable=False, default=0, server_default='0')
     user = relationship('UserModel', back_populates='posts')
     likes = relationship('LikeModel', back_populates='post')
     clones = relationship('CloneModel', back_populates='post')
-
-    def is_liked(self, db, user_id):
-        return db.query(LikeModel).filter(LikeModel.post_id == self.id, LikeModel.user_id == user_id).first() is not None
-
-    def is_cloned(self, db, user_id):
-        return db.query(CloneModel).filter(CloneModel.post_id == self.id, CloneModel.user_id == user_id).first() is not None
-
-    def get_likes_count(self, db):
-        return db.query(func.count(LikeModel.post_id)).filter(
-            LikeModel.post_id == self.id
-        ).scalar()
-
-    def get_clones_count(self, db):
-        return db.query(func.count(CloneModel.post_id)).filter(
-            CloneModel.post_id == self.id
-        ).scalar()
+    post_tags = relationship('PostTagModel', back_populates='post',
+                             cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<PostModel(id={self.id}, title={self.title})>'
@@ -41,6 +43,9 @@ class PostModel(Base):
 
 class LikeModel(Base):
     __tablename__ = 'likes'
+    __table_args__ = (
+        Index('uq_likes_post_id_user_id', 'post_id', 'user_id', unique=True),
+    )
 
     id = Column(String(36), primary_key=True, nullable=True)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
@@ -54,6 +59,9 @@ class LikeModel(Base):
 
 class CloneModel(Base):
     __tablename__ = 'clones'
+    __table_args__ = (
+        Index('uq_clones_post_id_user_id', 'post_id', 'user_id', unique=True),
+    )
 
     id = Column(String(36), primary_key=True, nullable=True)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
@@ -63,3 +71,17 @@ class CloneModel(Base):
 
     def __repr__(self):
         return f'<CloneModel(id={self.id})>'
+
+
+class PostTagModel(Base):
+    __tablename__ = 'post_tags'
+    __table_args__ = (
+        Index('ix_post_tags_tag_post_id', 'tag', 'post_id'),
+    )
+
+    post_id = Column(String(36), ForeignKey('posts.id'), primary_key=True)
+    tag = Column(String(TAG_MAX_LENGTH), primary_key=True)
+    post = relationship('PostModel', back_populates='post_tags')
+
+    def __repr__(self):
+        return f'<PostTagModel(post_id={self.post_id}, tag={self.tag})>'
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from core.config.database_config import Base
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 
@@ -22,6 +22,7 @@ class TeamModel(Base):
     title = Column(String(512), nullable=False)
     description = Column(String(1024))
     image = Column(String(512))
+    image_variants = Column(JSON, nullable=True)
     date = Column(DateTime, default=datetime.utcnow)
     sketches = relationship('SketchModel', back_populates='team')
     members = relationship('UserTeamModel', back_populates='team')
@@ -36,6 +37,10 @@ class TeamModel(Base):
 
 class UserTeamModel(Base):
     __tablename__ = 'user_team'
+    __table_args__ = (
+        Index('uq_user_team_user_id_team_id', 'user_id', 'team_id', unique=True),
+        Index('ix_user_team_team_id', 'team_id'),
+    )
 
     id = Column(String(36), primary_key=True, nullable=True)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
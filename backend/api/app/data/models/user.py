@@ -1,10 +1,15 @@
 from core.config.database_config import Base
-from sqlalchemy import Column, ForeignKey, String, Table, func
+from sqlalchemy import (Column, ForeignKey, Index, Integer, String, Table,
+                        func, select)
 from sqlalchemy.orm import relationship
 
 
 class UserModel(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_fulltext', 'first_name', 'last_name',
+              mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
 
     id = Column(String(36), primary_key=True, nullable=True)
     first_name = Column(String(128), nullable=False)
@@ -14,6 +19,8 @@ class UserModel(Base):
     email = Column(String(128), nullable=False, unique=True)
     password = Column(String(128), nullable=False)
     country = Column(String(512), nullable=True)
+    followers_count = Column(Integer, nullable=False, default=0, server_default='0')
+    following_count = Column(Integer, nullable=False, default=0, server_default='0')
     posts = relationship('PostModel', back_populates='user', lazy=True)
     likes = relationship('LikeModel', back_populates='user')
     clones = relationship('CloneModel', back_populates='user')
@@ -28,15 +35,15 @@ class UserModel(Base):
         backref='followers'
     )
 
-    def get_followers_count(self, session):
-        return session.query(func.count(user_following.c.follower_id)).filter(
+    async def get_followers_count(self, session):
+        return await session.scalar(select(func.count(user_following.c.follower_id)).where(
             user_following.c.following_id == self.id
-        ).scalar()
+        ))
 
-    def get_following_count(self, session):
-        return session.query(func.count(user_following.c.following_id)).filter(
+    async def get_following_count(self, session):
+        return await session.scalar(select(func.count(user_following.c.following_id)).where(
             user_following.c.follower_id == self.id
-        ).scalar()
+        ))
 
     def __repr__(self):
         return f'<UserModel(id={self.id}, email={self.email})>'
@@ -46,5 +53,7 @@ user_following = Table('user_following', Base.metadata,
                        Column('follower_id', String(36), ForeignKey(
                            'users.id'), primary_key=True),
                        Column('following_id', String(36), ForeignKey(
-                           'users.id'), primary_key=True)
+                           'users.id'), primary_key=True),
+                       Index('ix_user_following_following_id', 'following_id')
                        )
+
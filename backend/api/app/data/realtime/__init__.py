@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Set
+
+from app.data.realtime.pubsub import MemoryPubSub, PubSub, RedisPubSub
+
+REALTIME_BACKEND = os.getenv("REALTIME_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REALTIME_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", 100))
+
+logger = logging.getLogger(__name__)
+
+
+def team_chat_channel(chat_id: str) -> str:
+    return f'team-chat:{chat_id}'
+
+
+class Subscriber:
+
+    def __init__(self, chat_id: str, queue_size: int) -> None:
+        self.chat_id = chat_id
+        self.queue = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def put(self, data: str) -> bool:
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self):
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        data = await self.queue.get()
+        if data is None:
+            raise StopAsyncIteration
+        return data
+
+
+class TeamChatHub:
+
+    def __init__(self, pubsub: PubSub, queue_size: int = REALTIME_QUEUE_SIZE) -> None:
+        self.pubsub = pubsub
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.tasks = set()
+        self.lock = asyncio.Lock()
+
+    async def join(self, chat_id: str) -> Subscriber:
+        subscriber = Subscriber(chat_id, self.queue_size)
+        async with self.lock:
+            if chat_id not in self.subscribers:
+                await self.pubsub.subscribe(
+                    team_chat_channel(chat_id), lambda data: self._deliver(chat_id, data))
+                self.subscribers[chat_id] = set()
+            self.subscribers[chat_id].add(subscriber)
+        return subscriber
+
+    async def leave(self, subscriber: Subscriber):
+        async with self.lock:
+            subscribers = self.subscribers.get(subscriber.chat_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.chat_id]
+                await self.pubsub.unsubscribe(team_chat_channel(subscriber.chat_id))
+
+    def publish(self, chat_id: str, messages: List[dict]) -> asyncio.Task:
+        task = asyncio.create_task(self.broadcast(chat_id, messages))
+        self.tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    async def broadcast(self, chat_id: str, messages: List[dict]):
+        for message in messages:
+            await self.pubsub.publish(team_chat_channel(chat_id), json.dumps({'message': message}))
+
+    async def close(self):
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        for subscribers in self.subscribers.values():
+            for subscriber in subscribers:
+                subscriber.drop()
+        self.subscribers = {}
+        await self.pubsub.close()
+
+    def _deliver(self, chat_id: str, data: str):
+        for subscriber in list(self.subscribers.get(chat_id, ())):
+            if not subscriber.dropped and not subscriber.put(data):
+                subscriber.drop()
+
+    def _done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Team chat hub task failed", exc_info=task.exception())
+
+
+def create_pubsub() -> PubSub:
+    if REALTIME_BACKEND == 'memory':
+        return MemoryPubSub()
+    if REALTIME_BACKEND == 'redis':
+        from redis.asyncio import Redis
+        return RedisPubSub(Redis.from_url(REDIS_URL))
+    raise ValueError(f"Unknown realtime backend {REALTIME_BACKEND}")
+
+
+_team_chat_hub = None
+
+
+def get_team_chat_hub() -> TeamChatHub:
+    global _team_chat_hub
+    if _team_chat_hub is None:
+        _team_chat_hub = TeamChatHub(create_pubsub())
+    return _team_chat_hub
+
+
+async def close_team_chat_hub():
+    global _team_chat_hub
+    if _team_chat_hub is not None:
+        await _team_chat_hub.close()
+    _team_chat_hub = None
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+
+Handler = Callable[[str], None]
+
+logger = logging.getLogger(__name__)
+
+
+def decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class PubSub(ABC):
+
+    @abstractmethod
+    async def publish(self, channel: str, data: str):
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: Handler):
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str):
+        ...
+
+    async def close(self):
+        ...
+
+
+class MemoryPubSub(PubSub):
+
+    def __init__(self) -> None:
+        self.handlers: Dict[str, Handler] = {}
+
+    async def publish(self, channel: str, data: str):
+        handler = self.handlers.get(channel)
+        if handler is not None:
+            handler(data)
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+
+    async def unsubscribe(self, channel: str):
+        self.handlers.pop(channel, None)
+
+
+class RedisPubSub(PubSub):
+
+    def __init__(self, client, poll_timeout: float = 1.0) -> None:
+        self.client = client
+        self.poll_timeout = poll_timeout
+        self.pubsub = client.pubsub()
+        self.handlers: Dict[str, Handler] = {}
+        self.reader = None
+
+    async def publish(self, channel: str, data: str):
+        await self.client.publish(channel, data)
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+        await self.pubsub.subscribe(channel)
+        if self.reader is None:
+            self.reader = asyncio.create_task(self._read())
+
+    async def unsubscribe(self, channel: str):
+        self.handlers.pop(channel, None)
+        await self.pubsub.unsubscribe(channel)
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+            await asyncio.gather(self.reader, return_exceptions=True)
+            self.reader = None
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def _read(self):
+        while True:
+            if not self.handlers:
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.poll_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis subscriber failed to read a message")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if message is None or message.get('type') != 'message':
+                continue
+            handler = self.handlers.get(decode(message['channel']))
+            if handler is not None:
+                handler(decode(message['data']))
@@ -1,7 +1,7 @@
-from typing import List
+from typing import List, Optional
 
 from app.data.datasources.local.chat import ChatLocalDataSource
-from app.domain.entities.chat import ChatEntity, Notify
+from app.domain.entities.chat import ChatEntity, ChatSummaryEntity, Notify
 from app.domain.entities.message import Message
 from app.domain.repositories.chat import BaseRepository
 from core.common.either import Either
@@ -28,9 +28,18 @@ class ChatRepositoryImpl(BaseRepository):
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
         
-    async def view_chat(self, chat_id: str) -> Either[Failure, ChatEntity]:
+    async def view_chat_summaries(self, user_id: str, cursor: Optional[str] = None,
+                                  limit: Optional[int] = None) -> Either[Failure, List[ChatSummaryEntity]]:
         try:
-            chat_entity = await self.chat_local_datasource.get_chat(chat_id)
+            chats = await self.chat_local_datasource.get_chat_summaries(user_id, cursor, limit)
+            return Either.right(chats)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
+
+    async def view_chat(self, chat_id: str, before: Optional[int] = None, after: Optional[int] = None,
+                        limit: Optional[int] = None) -> Either[Failure, ChatEntity]:
+        try:
+            chat_entity = await self.chat_local_datasource.get_chat(chat_id, before, after, limit)
             return Either.right(chat_entity)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from app.data.datasources.local.job import JobLocalDataSource
+from app.domain.entities.job import JobEntity
+from app.domain.entities.message import Message
+from app.domain.repositories.job import BaseRepository
+from core.common.either import Either
+from core.errors.exceptions import CacheException
+from core.errors.failure import CacheFailure, Failure
+
+
+class JobRepositoryImpl(BaseRepository):
+
+    def __init__(self, job_local_datasource: JobLocalDataSource):
+        self.job_local_datasource = job_local_datasource
+
+    async def submit_job(self, message: Message, user_id: str, chat_id: Optional[str] = None) -> Either[Failure, JobEntity]:
+        try:
+            job_entity = await self.job_local_datasource.submit_job(message, user_id, chat_id)
+            return Either.right(job_entity)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
+
+    async def view_job(self, job_id: str, user_id: str, wait: float = 0) -> Either[Failure, JobEntity]:
+        try:
+            job_entity = await self.job_local_datasource.view_job(job_id, user_id, wait)
+            return Either.right(job_entity)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
+
+    async def retry_job(self, job_id: str, user_id: str) -> Either[Failure, JobEntity]:
+        try:
+            job_entity = await self.job_local_datasource.retry_job(job_id, user_id)
+            return Either.right(job_entity)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
@@ -1,3 +1,4 @@
+from typing import AsyncIterator, Tuple
 from app.domain.entities.message import Message, MessageEntity
 from core.common.either import Either
 from core.errors.failure import Failure, CacheFailure
@@ -16,6 +17,10 @@ class MessageRepositoryImpl(BaseRepository):
             return Either.right(chat_entity)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
-        
 
-        
\ No newline at end of file
+    async def stream_message(self, message: Message, chat_id: str, user_id: str) -> Either[Failure, AsyncIterator[Tuple[str, object]]]:
+        try:
+            events = await self.message_local_datasource.stream_chat(message, chat_id, user_id)
+            return Either.right(events)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Iterable, Optional
 from core.common.either import Either
 from core.errors.failure import Failure, CacheFailure
 from core.errors.exceptions import CacheException
@@ -32,9 +32,9 @@ class PostRepositoryImpl(BaseRepository):
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
     
-    async def view_posts(self, user_id: str) -> Either[Failure, list]:
+    async def view_posts(self, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Either[Failure, list]:
         try:
-            posts = await self.post_local_datasource.view_posts(user_id)
+            posts = await self.post_local_datasource.view_posts(user_id, cursor, limit)
             return Either.right(posts)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
@@ -74,9 +74,9 @@ class PostRepositoryImpl(BaseRepository):
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
         
-    async def all_posts(self, tags: list, search_word: str, skip: int, limit: int, user_id: str) -> Either[Failure, Iterable[PostEntity]]:
+    async def all_posts(self, tags: list, search_word: str, skip: int, limit: int, user_id: str, cursor: Optional[str] = None) -> Either[Failure, Iterable[PostEntity]]:
         try:
-            posts = await self.post_local_datasource.all_posts(tags, search_word, skip, limit, user_id)
+            posts = await self.post_local_datasource.all_posts(tags, search_word, skip, limit, user_id, cursor)
             return Either.right(posts)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
\ No newline at end of file
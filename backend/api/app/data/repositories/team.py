@@ -75,4 +75,11 @@ class TeamRepositoryImpl(BaseRepository):
             team_entity = await self.team_local_datasource.add_team_member(team_id, creator_id, user_ids)
             return Either.right(team_entity)
         except CacheException as e:
-            return Either.left(CacheFailure(error_message=str(e)))
\ No newline at end of file
+            return Either.left(CacheFailure(error_message=str(e)))
+
+    async def is_team_member(self, team_id: str, user_id: str) -> Either[Failure, bool]:
+        try:
+            is_member = await self.team_local_datasource.is_team_member(team_id, user_id)
+            return Either.right(is_member)
+        except CacheException as e:
+            return Either.left(CacheFailure(error_message=str(e)))
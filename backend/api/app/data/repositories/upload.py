@@ -0,0 +1,21 @@
+from typing import BinaryIO
+
+from app.data.datasources.remote.upload import UploadRemoteDataSource
+from app.domain.entities.upload import UploadEntity
+from app.domain.repositories.upload import BaseRepository
+from core.common.either import Either
+from core.errors.exceptions import ServerException
+from core.errors.failure import Failure, ServerFailure
+
+
+class UploadRepositoryImpl(BaseRepository):
+
+    def __init__(self, upload_remote_datasource: UploadRemoteDataSource):
+        self.upload_remote_datasource = upload_remote_datasource
+
+    async def create_upload(self, file: BinaryIO) -> Either[Failure, UploadEntity]:
+        try:
+            upload_entity = await self.upload_remote_datasource.create_upload(file)
+            return Either.right(upload_entity)
+        except ServerException as e:
+            return Either.left(ServerFailure(error_message=str(e)))
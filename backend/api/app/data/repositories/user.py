@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Iterable, Optional
 
 from app.data.datasources.local.user import UserLocalDataSource
 from app.domain.entities.user import UpdatUserRequest, User, UserEntity
@@ -34,9 +34,9 @@ class UserRepositoryImpl(BaseRepository):
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
 
-    async def view_users(self) -> Either[Failure, list]:
+    async def view_users(self, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, list]:
         try:
-            users = await self.user_local_datasource.view_users()
+            users = await self.user_local_datasource.view_users(skip, limit)
             return Either.right(users)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
@@ -48,16 +48,16 @@ class UserRepositoryImpl(BaseRepository):
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
 
-    async def followers(self, user_id: str) -> Either[Failure, Iterable[UserEntity]]:
+    async def followers(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, Iterable[UserEntity]]:
         try:
-            _followers = await self.user_local_datasource.followers(user_id)
+            _followers = await self.user_local_datasource.followers(user_id, skip, limit)
             return Either.right(_followers)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
 
-    async def following(self, user_id: str) -> Either[Failure, list]:
+    async def following(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, list]:
         try:
-            _following = await self.user_local_datasource.following(user_id)
+            _following = await self.user_local_datasource.following(user_id, skip, limit)
             return Either.right(_following)
         except CacheException as e:
             return Either.left(CacheFailure(error_message=str(e)))
@@ -42,3 +42,28 @@ class AuthEntity(BaseEntity):
     def from_json(cls, json_str: str) -> 'AuthEntity':
         data = json.loads(json_str)
         return cls.from_dict(data)
+
+
+@dataclass
+class Principal(BaseEntity):
+    id: str
+    email: str
+    first_name: str
+    last_name: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Principal':
+        return cls(
+            id=data['id'],
+            email=data['email'],
+            first_name=data.get('first_name'),
+            last_name=data.get('last_name')
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name
+        }
@@ -1,3 +1,4 @@
+import datetime
 import json
 from dataclasses import dataclass
 from typing import Dict, List, Optional
@@ -24,12 +25,41 @@ class Notify(BaseModel):
     meta: Optional[Dict[str, str]]
 
 
+@dataclass
+class ChatSummaryEntity(BaseEntity):
+    id: Optional[str]
+    title: str
+    last_message: str
+    updated_at: datetime.datetime
+    message_count: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ChatSummaryEntity':
+        return cls(
+            id=data.get('id'),
+            title=data.get('title'),
+            last_message=data.get('last_message'),
+            updated_at=data.get('updated_at'),
+            message_count=data.get('message_count')
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'title': self.title,
+            'last_message': self.last_message,
+            'updated_at': self.updated_at,
+            'message_count': self.message_count
+        }
+
+
 @dataclass
 class ChatEntity(BaseEntity):
     id: Optional[str]
     title: str
     user_id: str
     messages: List[Message]
+    next_cursor: Optional[int] = None
 
     def add_message(self, message: Message) -> None:
         self.messages.append(message)
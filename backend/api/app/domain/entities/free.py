@@ -7,6 +7,7 @@ from pydantic import BaseModel
 
 class Free(BaseModel):
     prompt: Optional[str]
+    fresh: bool = False
 
     class Config:
         arbitrary_types_allowed = True
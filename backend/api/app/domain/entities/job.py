@@ -0,0 +1,45 @@
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain.entities import BaseEntity
+
+
+@dataclass
+class JobEntity(BaseEntity):
+    id: Optional[str]
+    kind: str
+    status: str
+    attempts: int
+    chat_id: Optional[str]
+    result: Optional[dict]
+    error: Optional[str]
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'JobEntity':
+        return cls(
+            id=data.get('id'),
+            kind=data.get('kind'),
+            status=data.get('status'),
+            attempts=data.get('attempts'),
+            chat_id=data.get('chat_id'),
+            result=data.get('result'),
+            error=data.get('error'),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at')
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'chat_id': self.chat_id,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
@@ -1,9 +1,16 @@
 import json
 from dataclasses import dataclass
+from typing import Optional
 
 from app.domain.entities import BaseEntity
 from pydantic import BaseModel
 
+message_models = (
+    'text_to_image', 'image_to_image', 'controlNet', 'painting', 'instruction',
+    'image_variant', 'image_from_text', 'edit_image', 'chatbot', 'analysis',
+    'text_to_3D', 'image_to_3D',
+)
+
 
 class Message(BaseModel):
     user_id: str
@@ -20,6 +27,7 @@ class MessageEntity(BaseEntity):
     sender: str
     content: dict
     date: str
+    seq: Optional[int] = None
     
     @classmethod
     def from_dict(cls, data: dict) -> 'MessageEntity':
@@ -27,7 +35,8 @@ class MessageEntity(BaseEntity):
             id=data.get('id'),
             sender=data.get('sender'),
             content=data.get('content'),
-            date=data.get('date')
+            date=data.get('date'),
+            seq=data.get('seq')
         )
     
     def to_dict(self) -> dict:
@@ -35,7 +44,8 @@ class MessageEntity(BaseEntity):
             'id': self.id,
             'sender': self.sender,
             'content': self.content,
-            'date': str(self.date)
+            'date': str(self.date),
+            'seq': self.seq
         }
     
     def to_json(self) -> str:
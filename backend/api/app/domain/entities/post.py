@@ -47,6 +47,7 @@ class PostEntity(BaseEntity):
     isLiked: bool
     isCloned: bool
     tags: List[str]
+    imageSrcset: Optional[str] = None
 
     @classmethod
     def from_dict(cls, data: dict) -> 'PostEntity':
@@ -64,7 +65,8 @@ class PostEntity(BaseEntity):
             clone=data.get('clone'),
             isLiked=data.get('isLiked'),
             isCloned=data.get('isCloned'),
-            tags=data.get('tags', [])
+            tags=data.get('tags', []),
+            imageSrcset=data.get('imageSrcset')
         )
 
     def to_dict(self) -> dict:
@@ -82,5 +84,6 @@ class PostEntity(BaseEntity):
             'clone': self.clone,
             'isLiked': self.isLiked,
             'isCloned': self.isCloned,
-            'tags': self.tags
+            'tags': self.tags,
+            'imageSrcset': self.imageSrcset
         }
@@ -26,6 +26,7 @@ class TeamEntity(BaseEntity):
     creator_image: Optional[str]
     image: Optional[str]
     create_at: str
+    image_srcset: Optional[str] = None
 
     @classmethod
     def from_dict(cls, data: dict) -> 'TeamEntity':
@@ -38,7 +39,8 @@ class TeamEntity(BaseEntity):
             last_name=data.get('last_name'),
             creator_image=data.get('creator_image'),
             image=data.get('image'),
-            create_at=data.get('create_at')
+            create_at=data.get('create_at'),
+            image_srcset=data.get('image_srcset')
         )
 
     def to_dict(self) -> dict:
@@ -51,5 +53,6 @@ class TeamEntity(BaseEntity):
             'last_name': self.last_name,
             'creator_image': self.creator_image,
             'image': self.image,
-            'create_at': self.create_at
+            'create_at': self.create_at,
+            'image_srcset': self.image_srcset
         }
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain.entities import BaseEntity
+
+
+@dataclass
+class UploadEntity(BaseEntity):
+    id: Optional[str]
+    url: str
+    content_type: str
+    size: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'UploadEntity':
+        return cls(
+            id=data.get('id'),
+            url=data.get('url'),
+            content_type=data.get('content_type'),
+            size=data.get('size')
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'url': self.url,
+            'content_type': self.content_type,
+            'size': self.size
+        }
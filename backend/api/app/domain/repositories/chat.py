@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
-from app.domain.entities.chat import Chat, ChatEntity
+from app.domain.entities.chat import Chat, ChatEntity, ChatSummaryEntity
 from app.domain.repositories import ContextManagerRepository
 from core.common.either import Either
 from core.errors.failure import Failure
@@ -23,7 +23,13 @@ class BaseReadOnlyRepository(ABC):
         ...
 
     @abstractmethod
-    async def view_chat(self, chat_id: str) -> Either[Failure, ChatEntity]:
+    async def view_chat_summaries(self, user_id: str, cursor: Optional[str] = None,
+                                  limit: Optional[int] = None) -> Either[Failure, List[ChatSummaryEntity]]:
+        ...
+
+    @abstractmethod
+    async def view_chat(self, chat_id: str, before: Optional[int] = None, after: Optional[int] = None,
+                        limit: Optional[int] = None) -> Either[Failure, ChatEntity]:
         ...
 
 class BaseRepository(BaseReadOnlyRepository, BaseWriteOnlyRepository, ABC):
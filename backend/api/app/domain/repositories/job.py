@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.domain.entities.job import JobEntity
+from app.domain.entities.message import Message
+from app.domain.repositories import ContextManagerRepository
+from core.common.either import Either
+from core.errors.failure import Failure
+
+
+class BaseWriteOnlyRepository(ContextManagerRepository):
+    @abstractmethod
+    async def submit_job(self, message: Message, user_id: str, chat_id: Optional[str] = None) -> Either[Failure, JobEntity]:
+        ...
+
+    @abstractmethod
+    async def retry_job(self, job_id: str, user_id: str) -> Either[Failure, JobEntity]:
+        ...
+
+
+class BaseReadOnlyRepository(ABC):
+    @abstractmethod
+    async def view_job(self, job_id: str, user_id: str, wait: float = 0) -> Either[Failure, JobEntity]:
+        ...
+
+
+class BaseRepository(BaseReadOnlyRepository, BaseWriteOnlyRepository, ABC):
+    ...
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Tuple
 from app.domain.repositories import ContextManagerRepository
 from core.common.either import Either
 from core.errors.failure import Failure
@@ -10,5 +11,9 @@ class BaseWriteOnlyRepository(ContextManagerRepository):
     async def create_message(self, message: Message, chat_id: str, user_id: str) -> Either[Failure, MessageEntity]:
         ...
 
+    @abstractmethod
+    async def stream_message(self, message: Message, chat_id: str, user_id: str) -> Either[Failure, AsyncIterator[Tuple[str, object]]]:
+        ...
+
 class BaseRepository(BaseWriteOnlyRepository, ABC):
     ...
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 from app.domain.entities.post import Post, PostEntity
 from app.domain.repositories import ContextManagerRepository
 from core.common.either import Either
@@ -35,12 +35,12 @@ class BaseWriteOnlyRepository(ContextManagerRepository):
         ...
 
     @abstractmethod
-    async def all_posts(self, tags: List[str], search_word: str, skip: int, limit: int, user_id: str) -> Either[Failure, Iterable[PostEntity]]:
+    async def all_posts(self, tags: List[str], search_word: str, skip: int, limit: int, user_id: str, cursor: Optional[str] = None) -> Either[Failure, Iterable[PostEntity]]:
         ...
 
 class BaseReadOnlyRepository(ABC):
     @abstractmethod
-    async def view_posts(self, user_id: str) -> Either[Failure, Iterable[PostEntity]]:
+    async def view_posts(self, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Either[Failure, Iterable[PostEntity]]:
         ...
 
     @abstractmethod
@@ -46,6 +46,10 @@ class BaseReadOnlyRepository(ABC):
     async def team_members(self, team_id: str) -> Either[Failure, Iterable[UserEntity]]:
         ...
 
+    @abstractmethod
+    async def is_team_member(self, team_id: str, user_id: str) -> Either[Failure, bool]:
+        ...
+
 
 class BaseRepository(BaseReadOnlyRepository, BaseWriteOnlyRepository, ABC):
     ...
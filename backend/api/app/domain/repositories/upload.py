@@ -0,0 +1,13 @@
+from abc import abstractmethod
+from typing import BinaryIO
+
+from app.domain.entities.upload import UploadEntity
+from app.domain.repositories import ContextManagerRepository
+from core.common.either import Either
+from core.errors.failure import Failure
+
+
+class BaseRepository(ContextManagerRepository):
+    @abstractmethod
+    async def create_upload(self, file: BinaryIO) -> Either[Failure, UploadEntity]:
+        ...
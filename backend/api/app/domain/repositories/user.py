@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterable
+from typing import Iterable, Optional
 from app.domain.repositories import ContextManagerRepository
 from core.common.either import Either
 from core.errors.failure import Failure
@@ -30,7 +30,7 @@ class BaseWriteOnlyRepository(ContextManagerRepository):
 
 class BaseReadOnlyRepository(ABC):
     @abstractmethod
-    async def view_users(self) -> Either[Failure, Iterable[UserEntity]]:
+    async def view_users(self, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, Iterable[UserEntity]]:
         ...
 
     @abstractmethod
@@ -38,11 +38,11 @@ class BaseReadOnlyRepository(ABC):
         ...
         
     @abstractmethod
-    async def followers(self, user_id: str) -> Either[Failure, Iterable[UserEntity]]:
+    async def followers(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, Iterable[UserEntity]]:
         ...
         
     @abstractmethod
-    async def following(self, user_id: str) -> Either[Failure, Iterable[UserEntity]]:
+    async def following(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> Either[Failure, Iterable[UserEntity]]:
         ...
 
 class BaseRepository(BaseReadOnlyRepository, BaseWriteOnlyRepository, ABC):
@@ -0,0 +1,23 @@
+from typing import List, Optional
+
+from app.domain.entities.chat import ChatSummaryEntity
+from app.domain.repositories.chat import BaseRepository
+from core.common.either import Either
+from core.common.equatable import Equatable
+from core.errors.failure import Failure
+from core.use_cases.use_case import UseCase
+
+
+class Params(Equatable):
+    def __init__(self, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> None:
+        self.user_id = user_id
+        self.cursor = cursor
+        self.limit = limit
+
+
+class ViewChatSummaries(UseCase[List[ChatSummaryEntity]]):
+    def __init__(self, repository: BaseRepository):
+        self.repository = repository
+
+    async def __call__(self, params: Params) -> Either[Failure, List[ChatSummaryEntity]]:
+        return await self.repository.view_chat_summaries(params.user_id, params.cursor, params.limit)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from core.use_cases.use_case import UseCase
 from app.domain.repositories.chat import BaseRepository
 from core.common.equatable import Equatable
@@ -6,12 +8,16 @@ from core.errors.failure import Failure
 from app.domain.entities.chat import ChatEntity
 
 class Params(Equatable):
-    def __init__(self, chat_id: str) -> None:
+    def __init__(self, chat_id: str, before: Optional[int] = None, after: Optional[int] = None,
+                 limit: Optional[int] = None) -> None:
         self.chat_id = chat_id
+        self.before = before
+        self.after = after
+        self.limit = limit
 
 class ViewChat(UseCase[ChatEntity]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
     async def __call__(self, params: Params) -> Either[Failure, ChatEntity]:
-        return await self.repository.view_chat(params.chat_id)
\ No newline at end of file
+        return await self.repository.view_chat(params.chat_id, params.before, params.after, params.limit)
\ No newline at end of file
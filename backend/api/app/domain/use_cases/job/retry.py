@@ -0,0 +1,20 @@
+from app.domain.entities.job import JobEntity
+from app.domain.repositories.job import BaseRepository
+from core.common.either import Either
+from core.common.equatable import Equatable
+from core.errors.failure import Failure
+from core.use_cases.use_case import UseCase
+
+
+class Params(Equatable):
+    def __init__(self, job_id: str, user_id: str) -> None:
+        self.job_id = job_id
+        self.user_id = user_id
+
+
+class RetryJob(UseCase[JobEntity]):
+    def __init__(self, repository: BaseRepository):
+        self.repository = repository
+
+    async def __call__(self, params: Params) -> Either[Failure, JobEntity]:
+        return await self.repository.retry_job(params.job_id, params.user_id)
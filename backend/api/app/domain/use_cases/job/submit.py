@@ -0,0 +1,24 @@
+from typing import Optional
+
+from app.domain.entities.job import JobEntity
+from app.domain.entities.message import Message
+from app.domain.repositories.job import BaseRepository
+from core.common.either import Either
+from core.common.equatable import Equatable
+from core.errors.failure import Failure
+from core.use_cases.use_case import UseCase
+
+
+class Params(Equatable):
+    def __init__(self, message: Message, user_id: str, chat_id: Optional[str] = None) -> None:
+        self.message = message
+        self.user_id = user_id
+        self.chat_id = chat_id
+
+
+class SubmitJob(UseCase[JobEntity]):
+    def __init__(self, repository: BaseRepository):
+        self.repository = repository
+
+    async def __call__(self, params: Params) -> Either[Failure, JobEntity]:
+        return await self.repository.submit_job(params.message, params.user_id, params.chat_id)
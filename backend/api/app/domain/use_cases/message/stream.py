@@ -0,0 +1,21 @@
+from typing import AsyncIterator, Tuple
+from core.use_cases.use_case import UseCase
+from app.domain.repositories.message import BaseRepository
+from core.common.equatable import Equatable
+from core.common.either import Either
+from core.errors.failure import Failure
+from app.domain.entities.message import Message
+
+class Params(Equatable):
+    def __init__(self, message: Message, chat_id: str, user_id: str) -> None:
+        self.chat_id = chat_id
+        self.message = message
+        self.user_id = user_id
+
+
+class StreamMessage(UseCase[AsyncIterator[Tuple[str, object]]]):
+    def __init__(self, repository: BaseRepository):
+        self.repository = repository
+    
+    async def __call__(self, params: Params) -> Either[Failure, AsyncIterator[Tuple[str, object]]]:
+        return await self.repository.stream_message(params.message, params.chat_id, params.user_id)
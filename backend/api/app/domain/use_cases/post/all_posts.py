@@ -1,4 +1,4 @@
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 from core.common.equatable import Equatable
 from core.use_cases.use_case import UseCase
 from app.domain.repositories.post import BaseRepository
@@ -7,18 +7,19 @@ from core.errors.failure import Failure
 from app.domain.entities.post import PostEntity
 
 class Params(Equatable):
-    def __init__(self, user_id: str, tags: List[str], search_word: str, skip:int, limit: int) -> None:
+    def __init__(self, user_id: str, tags: List[str], search_word: str, skip:int, limit: int, cursor: Optional[str] = None) -> None:
         self.user_id = user_id
         self.tags = tags
         self.search_word = search_word
         self.skip = skip
         self.limit = limit
+        self.cursor = cursor
         
 class AllPost(UseCase[Iterable[PostEntity]]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
     async def __call__(self, params: Params) -> Either[Failure, Iterable[PostEntity]]:
-        return await self.repository.all_posts(params.tags, params.search_word, params.skip, params.limit, params.user_id)
+        return await self.repository.all_posts(params.tags, params.search_word, params.skip, params.limit, params.user_id, params.cursor)
     
     
@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Iterable, Optional
 from core.common.equatable import Equatable
 from core.use_cases.use_case import UseCase
 from app.domain.repositories.post import BaseRepository
@@ -7,12 +7,14 @@ from core.errors.failure import Failure
 from app.domain.entities.post import Post, PostEntity
 
 class Params(Equatable):
-    def __init__(self, user_id: str) -> None:
+    def __init__(self, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> None:
         self.user_id = user_id
+        self.cursor = cursor
+        self.limit = limit
 
 class ViewPosts(UseCase[Iterable[PostEntity]]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
     async def __call__(self, params: Params) -> Either[Failure, Iterable[PostEntity]]:
-        return await self.repository.view_posts(params.user_id)
\ No newline at end of file
+        return await self.repository.view_posts(params.user_id, params.cursor, params.limit)
\ No newline at end of file
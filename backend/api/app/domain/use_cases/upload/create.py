@@ -0,0 +1,21 @@
+from typing import BinaryIO
+
+from app.domain.entities.upload import UploadEntity
+from app.domain.repositories.upload import BaseRepository
+from core.common.either import Either
+from core.common.equatable import Equatable
+from core.errors.failure import Failure
+from core.use_cases.use_case import UseCase
+
+
+class Params(Equatable):
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+
+
+class CreateUpload(UseCase[UploadEntity]):
+    def __init__(self, repository: BaseRepository):
+        self.repository = repository
+
+    async def __call__(self, params: Params) -> Either[Failure, UploadEntity]:
+        return await self.repository.create_upload(params.file)
@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Iterable, Optional
 from core.use_cases.use_case import UseCase
 from app.domain.repositories.user import BaseRepository
 from core.common.equatable import Equatable
@@ -7,12 +7,14 @@ from core.errors.failure import Failure
 from app.domain.entities.user import User, UserEntity
 
 class Params(Equatable):
-    def __init__(self, user_id: str) -> None:
+    def __init__(self, user_id: str, skip: int = 0, limit: Optional[int] = None) -> None:
         self.user_id = user_id
+        self.skip = skip
+        self.limit = limit
 
 class UserFollowers(UseCase[Iterable[UserEntity]]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
     async def __call__(self, params: Params) -> Either[Failure, Iterable[UserEntity]]:
-        return await self.repository.followers(params.user_id)
\ No newline at end of file
+        return await self.repository.followers(params.user_id, params.skip, params.limit)
\ No newline at end of file
@@ -1,13 +1,19 @@
-from typing import Iterable
-from core.use_cases.use_case import UseCase, NoParams
+from typing import Iterable, Optional
+from core.use_cases.use_case import UseCase
 from app.domain.repositories.user import BaseRepository
+from core.common.equatable import Equatable
 from core.common.either import Either
 from core.errors.failure import Failure
 from app.domain.entities.user import UserEntity
 
+class Params(Equatable):
+    def __init__(self, skip: int = 0, limit: Optional[int] = None) -> None:
+        self.skip = skip
+        self.limit = limit
+
 class ViewUsers(UseCase[Iterable[UserEntity]]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
-    async def __call__(self, params: NoParams) -> Either[Failure, Iterable[UserEntity]]:
-        return await self.repository.view_users()
\ No newline at end of file
+    async def __call__(self, params: Params) -> Either[Failure, Iterable[UserEntity]]:
+        return await self.repository.view_users(params.skip, params.limit)
\ No newline at end of file
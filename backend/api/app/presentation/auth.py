@@ -5,7 +5,7 @@ from app.domain.repositories.auth import BaseRepository as AuthRepository
 from core.config.database_config import get_db
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class AuthResponse(BaseModel):
@@ -17,7 +17,7 @@ class AuthResponse(BaseModel):
         
 router = APIRouter()
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     auth_local_datasource = AuthLocalDataSourceImpl(db=db)
     return AuthRepositoryImpl(auth_local_datasource)
 
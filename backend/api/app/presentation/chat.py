@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 
 from app.data.datasources.local.chat import ChatLocalDataSourceImpl
@@ -9,15 +10,18 @@ from app.domain.use_cases.chat.create import CreateChat
 from app.domain.use_cases.chat.create import Params as CreateChatParams
 from app.domain.use_cases.chat.delete import DeleteChat
 from app.domain.use_cases.chat.delete import Params as DeleteChatParams
+from app.domain.use_cases.chat.summaries import Params as ViewChatSummariesParams
+from app.domain.use_cases.chat.summaries import ViewChatSummaries
 from app.domain.use_cases.chat.view import Params as ViewChatParams
 from app.domain.use_cases.chat.view import ViewChat
 from app.domain.use_cases.chat.views import Params as ViewChatsParams
 from app.domain.use_cases.chat.views import ViewChats
 from core.common.current_user import get_current_user
+from core.common.cursor import encode_cursor
 from core.config.database_config import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class ChatResponse(BaseModel):
@@ -27,9 +31,17 @@ class ChatResponse(BaseModel):
     messages: List[str]
 
 
+class ChatSummaryResponse(BaseModel):
+    id: str
+    title: str
+    last_message: str
+    updated_at: Optional[datetime]
+    message_count: int
+
+
 router = APIRouter()
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     chat_local_datasource = ChatLocalDataSourceImpl(db=db)
     return ChatRepositoryImpl(chat_local_datasource)
 
@@ -62,17 +74,45 @@ async def view_chats(
         raise HTTPException(status_code=400, detail=result.get().error_message)
 
 
+@router.get("/users/{user_id}/chats/summary", response_model=List[ChatSummaryResponse])
+async def view_chat_summaries(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Number of chats to return per page"),
+    repository: ChatRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    view_chat_summaries_use_case = ViewChatSummaries(repository)
+    params = ViewChatSummariesParams(user_id=user_id, cursor=cursor, limit=limit)
+    result = await view_chat_summaries_use_case(params)
+    if result.is_right():
+        chats = result.get()
+        if limit and len(chats) == limit and chats[-1].updated_at is not None:
+            response.headers["X-Next-Cursor"] = encode_cursor(chats[-1].updated_at, chats[-1].id)
+        return chats
+    else:
+        raise HTTPException(status_code=400, detail=result.get().error_message)
+
+
 @router.get("/chats/{chat_id}", response_model=ChatResponse)
 async def view_chat(
     chat_id: str,
+    response: Response,
+    before: Optional[int] = Query(None, description="Only return messages older than this sequence number"),
+    after: Optional[int] = Query(None, description="Only return messages newer than this sequence number"),
+    limit: Optional[int] = Query(None, ge=1, description="Number of messages to return per page"),
     repository: ChatRepository = Depends(get_repository),
     current_user: User = Depends(get_current_user)
 ):
     view_chat_use_case = ViewChat(repository)
-    params = ViewChatParams(chat_id=chat_id)
+    params = ViewChatParams(chat_id=chat_id, before=before, after=after, limit=limit)
     result = await view_chat_use_case(params)
     if result.is_right():
-        return result.get()
+        chat = result.get()
+        if chat.next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(chat.next_cursor)
+        return chat
     else:
         raise HTTPException(status_code=400, detail=result.get().error_message)
     
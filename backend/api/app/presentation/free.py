@@ -9,7 +9,7 @@ from app.domain.use_cases.free.chat import Params as FreeChatParams
 from core.config.database_config import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class FreeResponse(BaseModel):
@@ -18,7 +18,7 @@ class FreeResponse(BaseModel):
     
 router = APIRouter()
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     message_local_datasource = FreeLocalDataSourceImpl(db=db)
     return FreeRepositoryImpl(message_local_datasource)
 
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.data.datasources.local.job import JobLocalDataSourceImpl
+from app.data.repositories.job import JobRepositoryImpl
+from app.domain.entities.message import Message
+from app.domain.entities.user import User
+from app.domain.repositories.job import BaseRepository as JobRepository
+from app.domain.use_cases.job.retry import Params as RetryJobParams
+from app.domain.use_cases.job.retry import RetryJob
+from app.domain.use_cases.job.submit import Params as SubmitJobParams
+from app.domain.use_cases.job.submit import SubmitJob
+from app.domain.use_cases.job.view import Params as ViewJobParams
+from app.domain.use_cases.job.view import ViewJob
+from core.common.current_user import get_current_user
+from core.config.database_config import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    attempts: int
+    chat_id: Optional[str]
+    result: Optional[Dict]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+router = APIRouter()
+
+
+def get_repository(db: AsyncSession = Depends(get_db)):
+    job_local_datasource = JobLocalDataSourceImpl(db=db)
+    return JobRepositoryImpl(job_local_datasource)
+
+
+async def submit_job(repository: JobRepository, message: Message, user_id: str, chat_id: Optional[str] = None):
+    submit_job_use_case = SubmitJob(repository)
+    params = SubmitJobParams(message=message, user_id=user_id, chat_id=chat_id)
+    result = await submit_job_use_case(params)
+    if result.is_right():
+        return result.get()
+    else:
+        raise HTTPException(status_code=400, detail=result.get().error_message)
+
+
+@router.post("/chats/jobs/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_chat_job(
+    message: Message,
+    repository: JobRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    return await submit_job(repository, message, current_user.id)
+
+
+@router.post("/chats/{chat_id}/messages/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_message_job(
+    chat_id: str,
+    message: Message,
+    repository: JobRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    return await submit_job(repository, message, current_user.id, chat_id)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def view_job(
+    job_id: str,
+    wait: float = Query(0, description="Seconds to wait for the job to finish before answering"),
+    repository: JobRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    view_job_use_case = ViewJob(repository)
+    params = ViewJobParams(job_id=job_id, user_id=current_user.id, wait=wait)
+    result = await view_job_use_case(params)
+    if result.is_right():
+        return result.get()
+    else:
+        raise HTTPException(status_code=404, detail=result.get().error_message)
+
+
+@router.post("/jobs/{job_id}/retry", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(
+    job_id: str,
+    repository: JobRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    retry_job_use_case = RetryJob(repository)
+    params = RetryJobParams(job_id=job_id, user_id=current_user.id)
+    result = await retry_job_use_case(params)
+    if result.is_right():
+        return result.get()
+    else:
+        raise HTTPException(status_code=400, detail=result.get().error_message)
@@ -1,5 +1,7 @@
+import json
 from datetime import datetime
 from fastapi import HTTPException, APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from typing import Optional, Dict
 from app.data.datasources.local.message import MessageLocalDataSourceImpl
 from app.domain.entities.message import Message
@@ -7,9 +9,10 @@ from app.domain.entities.user import User
 from app.domain.repositories.message import BaseRepository as MessageRepository
 from app.data.repositories.message import MessageRepositoryImpl
 from app.domain.use_cases.message.create import CreateMessage, Params as CreateMessageParams
+from app.domain.use_cases.message.stream import StreamMessage, Params as StreamMessageParams
 from core.common.current_user import get_current_user
 from core.config.database_config import get_db
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 class MessageResponse(BaseModel):
@@ -17,10 +20,18 @@ class MessageResponse(BaseModel):
     sender: str
     content: Dict
     date: datetime
+    seq: Optional[int] = None
     
 router = APIRouter()
 
-def get_repository(db: Session = Depends(get_db)):
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def sse_stream(events):
+    async for event, data in events:
+        yield sse_event(event, {'text': data} if event == 'token' else data)
+
+def get_repository(db: AsyncSession = Depends(get_db)):
     message_local_datasource = MessageLocalDataSourceImpl(db=db)
     return MessageRepositoryImpl(message_local_datasource)
 
@@ -38,3 +49,22 @@ async def create_chat(
         return result.get()
     else:
         raise HTTPException(status_code=400, detail=result.get().error_message)
+
+@router.post("/chats/{chat_id}/messages/stream")
+async def stream_chat(
+    chat_id: str,
+    message: Message,
+    repository: MessageRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    stream_message_use_case = StreamMessage(repository)
+    params = StreamMessageParams(message=message, chat_id=chat_id, user_id=current_user.id)
+    result = await stream_message_use_case(params)
+    if result.is_right():
+        return StreamingResponse(
+            sse_stream(result.get()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    else:
+        raise HTTPException(status_code=400, detail=result.get().error_message)
@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from app.data.datasources.remote.ai_cache import get_result_cache
+from app.data.datasources.remote.generation import generation_timings
+from app.domain.entities.user import User
+from core.common.current_user import get_current_user
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    backend: str
+    entries: int
+    max_entries: int
+    ttl: float
+    hits: int
+    misses: int
+    coalesced: int
+    bypasses: int
+    evictions: int
+    expirations: int
+    hit_ratio: float
+
+
+class GenerationTimingResponse(BaseModel):
+    model: str
+    count: int
+    generation_ms: float
+    upload_ms: float
+    total_ms: float
+    saved_ms: float
+
+
+router = APIRouter()
+
+
+@router.get("/metrics/ai-cache", response_model=Optional[CacheStatsResponse])
+async def ai_cache_stats(current_user: User = Depends(get_current_user)):
+    cache = get_result_cache()
+    return cache.stats() if cache is not None else None
+
+
+@router.get("/metrics/generation", response_model=List[GenerationTimingResponse])
+async def generation_timing_stats(current_user: User = Depends(get_current_user)):
+    return generation_timings.stats()
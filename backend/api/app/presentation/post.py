@@ -22,10 +22,11 @@ from app.domain.use_cases.post.view import ViewPost
 from app.domain.use_cases.post.views import Params as ViewPostsParams
 from app.domain.use_cases.post.views import ViewPosts
 from core.common.current_user import get_current_user
+from core.common.cursor import encode_cursor
 from core.config.database_config import get_db
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class PostResponse(BaseModel):
@@ -43,20 +44,30 @@ class PostResponse(BaseModel):
     isLiked: bool
     isCloned: bool
     tags: List[str]
+    imageSrcset: Optional[str] = None
 
 
 router = APIRouter()
 
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     post_local_datasource = PostLocalDataSourceImpl(db=db)
     return PostRepositoryImpl(post_local_datasource)
 
 
+def set_next_cursor(response: Response, posts, limit: Optional[int]):
+    if limit and len(posts) == limit:
+        last_post = posts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            last_post.date, last_post.id)
+
+
 @router.get("/posts/all", response_model=List[PostResponse])
 async def all_posts(
+    response: Response,
     skip: int = Query(0, description="Number of items to skip"),
     limit: int = Query(10, description="Number of items to return per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     tags: List[str] = Query([]),
     search_word: str = "",
     repository: PostRepository = Depends(get_repository),
@@ -64,10 +75,13 @@ async def all_posts(
 ):
     all_posts_use_case = AllPost(repository)
     params = AllPostParams(
-        tags=tags, search_word=search_word, skip=skip, limit=limit, user_id=current_user.id)
+        tags=tags, search_word=search_word, skip=skip, limit=limit, user_id=current_user.id, cursor=cursor)
     result = await all_posts_use_case(params)
     if result.is_right():
-        return result.get()
+        posts = result.get()
+        if not search_word:
+            set_next_cursor(response, posts, limit)
+        return posts
     else:
         raise HTTPException(status_code=404, detail=result.get().error_message)
 
@@ -120,14 +134,19 @@ async def delete_post(
 @router.get("/users/{user_id}/posts", response_model=List[PostResponse])
 async def view_all_posts(
     user_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    limit: Optional[int] = Query(None, description="Number of items to return per page"),
     repository: PostRepository = Depends(get_repository),
     current_user: User = Depends(get_current_user)
 ):
     view_all_posts_use_case = ViewPosts(repository)
-    params = ViewPostsParams(user_id=user_id)
+    params = ViewPostsParams(user_id=user_id, cursor=cursor, limit=limit)
     result = await view_all_posts_use_case(params)
     if result.is_right():
-        return result.get()
+        posts = result.get()
+        set_next_cursor(response, posts, limit)
+        return posts
     else:
         raise HTTPException(status_code=400, detail=result.get().error_message)
 
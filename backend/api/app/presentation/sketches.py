@@ -19,7 +19,7 @@ from core.common.current_user import get_current_user
 from core.config.database_config import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class SketchResponse(BaseModel):
@@ -28,7 +28,7 @@ class SketchResponse(BaseModel):
 
 router = APIRouter()
 
-def get_sketch_repository(db: Session = Depends(get_db)):
+def get_sketch_repository(db: AsyncSession = Depends(get_db)):
     sketch_local_datasource = SketchLocalDataSourceImpl(db=db)
     return SketchRepositoryImpl(sketch_local_datasource)
 
@@ -1,7 +1,9 @@
+import asyncio
 from datetime import datetime
 from typing import Optional
 
 from app.data.datasources.local.team import TeamLocalDataSourceImpl
+from app.data.realtime import get_team_chat_hub
 from app.data.repositories.team import TeamRepositoryImpl
 from app.domain.entities.team import Team
 from app.domain.entities.user import User
@@ -12,6 +14,8 @@ from app.domain.use_cases.team.create import CreateTeam
 from app.domain.use_cases.team.create import Params as CreateTeamParams
 from app.domain.use_cases.team.delete import DeleteTeam
 from app.domain.use_cases.team.delete import Params as DeleteTeamParams
+from app.domain.use_cases.team.is_member import IsTeamMember
+from app.domain.use_cases.team.is_member import Params as IsTeamMemberParams
 from app.domain.use_cases.team.join import JoinTeam
 from app.domain.use_cases.team.join import Params as JoinTeamParams
 from app.domain.use_cases.team.leave import LeaveTeam
@@ -25,11 +29,12 @@ from app.domain.use_cases.team.view import ViewTeam
 from app.domain.use_cases.team.views import Params as ViewTeamsParams
 from app.domain.use_cases.team.views import ViewTeams
 from app.presentation.user import UserResponse
-from core.common.current_user import get_current_user
-from core.config.database_config import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from core.common.current_user import get_current_user, get_user_from_token
+from core.config.database_config import SessionLocal, get_db
+from fastapi import (APIRouter, Depends, HTTPException, Query, WebSocket,
+                     WebSocketDisconnect, status)
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class TeamResponse(BaseModel):
@@ -42,6 +47,7 @@ class TeamResponse(BaseModel):
     creator_image: Optional[str]
     image: Optional[str]
     create_at: datetime
+    image_srcset: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -52,7 +58,7 @@ class TeamRequest(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     team_local_datasource = TeamLocalDataSourceImpl(db=db)
     return TeamRepositoryImpl(team_local_datasource)
 
@@ -198,3 +204,48 @@ async def add_team_member(
         return result.get()
     else:
         raise HTTPException(status_code=400, detail=result.get().error_message)
+
+
+async def is_team_chat_member(team_id: str, token: str) -> bool:
+    async with SessionLocal() as db:
+        try:
+            current_user = await get_user_from_token(token, db)
+        except HTTPException:
+            return False
+        is_team_member_use_case = IsTeamMember(TeamRepositoryImpl(TeamLocalDataSourceImpl(db=db)))
+        params = IsTeamMemberParams(team_id=team_id, user_id=current_user.id)
+        result = await is_team_member_use_case(params)
+        return result.is_right() and result.get()
+
+
+@router.websocket("/teams/{team_id}/chat/ws")
+async def team_chat(websocket: WebSocket, team_id: str, token: str = Query(...)):
+    if not await is_team_chat_member(team_id, token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    hub = get_team_chat_hub()
+    subscriber = await hub.join(team_id)
+
+    async def forward():
+        async for data in subscriber:
+            await websocket.send_text(data)
+
+    async def receive():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await hub.leave(subscriber)
+    if subscriber.dropped:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO
+
+from app.data.datasources.remote.upload import UPLOAD_MAX_BYTES, UploadRemoteDataSourceImpl
+from app.data.repositories.upload import UploadRepositoryImpl
+from app.domain.entities.user import User
+from app.domain.repositories.upload import BaseRepository as UploadRepository
+from app.domain.use_cases.upload.create import CreateUpload
+from app.domain.use_cases.upload.create import Params as CreateUploadParams
+from core.common.current_user import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel
+from starlette.datastructures import UploadFile
+
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadResponse(BaseModel):
+    id: str
+    url: str
+    content_type: str
+    size: int
+
+
+router = APIRouter()
+
+multipart_body = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
+stream_body = {
+    "requestBody": {
+        "required": True,
+        "content": {"image/*": {"schema": {"type": "string", "format": "binary"}}}
+    }
+}
+
+
+def get_repository():
+    upload_remote_datasource = UploadRemoteDataSourceImpl()
+    return UploadRepositoryImpl(upload_remote_datasource)
+
+
+def check_content_length(request: Request, overhead: int = 0):
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > UPLOAD_MAX_BYTES + overhead:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+
+
+async def spool(request: Request) -> BinaryIO:
+    file = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Upload is too large")
+            if size > UPLOAD_SPOOL_BYTES:
+                await asyncio.to_thread(file.write, chunk)
+            else:
+                file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+async def create_upload(repository: UploadRepository, file: BinaryIO):
+    create_upload_use_case = CreateUpload(repository)
+    params = CreateUploadParams(file=file)
+    result = await create_upload_use_case(params)
+    if result.is_right():
+        return result.get()
+    else:
+        raise HTTPException(status_code=400, detail=result.get().error_message)
+
+
+@router.post("/uploads/", response_model=UploadResponse, status_code=status.HTTP_201_CREATED,
+             openapi_extra=multipart_body)
+async def create_multipart_upload(
+    request: Request,
+    repository: UploadRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    check_content_length(request, MULTIPART_OVERHEAD)
+    async with request.form(max_files=1, max_fields=1) as form:
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            raise HTTPException(status_code=400, detail="No file found")
+        return await create_upload(repository, file.file)
+
+
+@router.put("/uploads/", response_model=UploadResponse, status_code=status.HTTP_201_CREATED,
+            openapi_extra=stream_body)
+async def create_stream_upload(
+    request: Request,
+    repository: UploadRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    check_content_length(request)
+    file = await spool(request)
+    with file:
+        return await create_upload(repository, file)
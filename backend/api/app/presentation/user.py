@@ -1,8 +1,8 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm.session import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.data.datasources.local.user import UserLocalDataSourceImpl
 from app.data.repositories.user import UserRepositoryImpl
@@ -24,10 +24,10 @@ from app.domain.use_cases.user.update import Params as UpdateUserParams
 from app.domain.use_cases.user.update import UpdateUser
 from app.domain.use_cases.user.view import Params as ViewUserParams
 from app.domain.use_cases.user.view import ViewUser
+from app.domain.use_cases.user.views import Params as ViewUsersParams
 from app.domain.use_cases.user.views import ViewUsers
 from core.common.current_user import get_current_user
 from core.config.database_config import get_db
-from core.use_cases.use_case import NoParams
 
 
 class UserResponse(BaseModel):
@@ -48,7 +48,7 @@ class UserResponse(BaseModel):
 router = APIRouter()
 
 
-def get_repository(db: Session = Depends(get_db)):
+def get_repository(db: AsyncSession = Depends(get_db)):
     user_local_datasource = UserLocalDataSourceImpl(db=db)
     return UserRepositoryImpl(user_local_datasource)
 
@@ -101,10 +101,12 @@ async def delete_user(
 
 @router.get("/users/", response_model=List[UserResponse])
 async def view_all_users(
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of items to return per page"),
     repository: UserRepository = Depends(get_repository)
 ):
     view_all_users_use_case = ViewUsers(repository)
-    params = NoParams()
+    params = ViewUsersParams(skip=skip, limit=limit)
     result = await view_all_users_use_case(params)
     if result.is_right():
         return result.get()
@@ -128,8 +130,17 @@ async def view_user(
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def read_users_me(
+    repository: UserRepository = Depends(get_repository),
+    current_user: User = Depends(get_current_user)
+):
+    view_user_use_case = ViewUser(repository)
+    params = ViewUserParams(user_id=current_user.id)
+    result = await view_user_use_case(params)
+    if result.is_right():
+        return result.get()
+    else:
+        raise HTTPException(status_code=404, detail=result.get().error_message)
 
 
 @router.get("/users/{user_id}/follow/", response_model=UserResponse)
@@ -165,11 +176,13 @@ async def unfollow_user(
 @router.get("/users/{user_id}/followers/", response_model=List[UserResponse])
 async def view_user_followers(
     user_id: str,
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of items to return per page"),
     repository: UserRepository = Depends(get_repository),
     current_user: User = Depends(get_current_user)
 ):
     view_user_followers_use_case = UserFollowers(repository)
-    params = UserFollowersParams(user_id=user_id)
+    params = UserFollowersParams(user_id=user_id, skip=skip, limit=limit)
     result = await view_user_followers_use_case(params)
     if result.is_right():
         return result.get()
@@ -180,11 +193,13 @@ async def view_user_followers(
 @router.get("/users/{user_id}/following/", response_model=List[UserResponse])
 async def view_user_following(
     user_id: str,
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of items to return per page"),
     repository: UserRepository = Depends(get_repository),
     current_user: User = Depends(get_current_user)
 ):
     view_user_following_use_case = UserFollowing(repository)
-    params = UserFollowingParams(user_id=user_id)
+    params = UserFollowingParams(user_id=user_id, skip=skip, limit=limit)
     result = await view_user_following_use_case(params)
     if result.is_right():
         return result.get()
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import base64
+import io
+import json
+import time
+from uuid import uuid4
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from PIL import Image
+
+
+def stub_png() -> bytes:
+    with io.BytesIO() as output:
+        Image.new('RGB', (8, 8), (200, 120, 40)).save(output, format='PNG')
+        return output.getvalue()
+
+
+PNG = stub_png()
+STREAM_TOKENS = ['Stub', ' streamed', ' answer', ' about', ' modern', ' villas', '.']
+
+
+def create_app(latency: float = 0.2, token_latency: float = 0.05) -> FastAPI:
+    app = FastAPI()
+    app.state.latency = latency
+    app.state.token_latency = token_latency
+    app.state.in_flight = 0
+    app.state.peak = 0
+    app.state.calls = 0
+    app.state.stream_fail_after = None
+    app.state.image_inputs = []
+
+    async def generate():
+        app.state.calls += 1
+        app.state.in_flight += 1
+        app.state.peak = max(app.state.peak, app.state.in_flight)
+        try:
+            await asyncio.sleep(app.state.latency)
+        finally:
+            app.state.in_flight -= 1
+
+    def file_url(request: Request) -> str:
+        return str(request.base_url) + 'files/image.png'
+
+    async def image_service(request: Request):
+        app.state.image_inputs.append((await request.json()).get('image'))
+        await generate()
+        return {'image': base64.b64encode(PNG).decode()}
+
+    for path in ('/text-to-image', '/image-to-image', '/controlnet', '/inpaint', '/instruct'):
+        app.add_api_route(path, image_service, methods=['POST'])
+
+    @app.post('/v1/images/{operation}')
+    async def openai_images(operation: str, request: Request):
+        await generate()
+        return {'created': int(time.time()), 'data': [{'url': file_url(request)}]}
+
+    def completion_chunk(completion_id: str, delta: dict, finish_reason=None) -> str:
+        chunk = {
+            'id': completion_id,
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': 'gpt-3.5-turbo',
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+        }
+        return f'data: {json.dumps(chunk)}\n\n'
+
+    async def stream_completion():
+        app.state.calls += 1
+        completion_id = str(uuid4())
+        yield completion_chunk(completion_id, {'role': 'assistant', 'content': ''})
+        for i, token in enumerate(STREAM_TOKENS):
+            if i == app.state.stream_fail_after:
+                raise RuntimeError('Stub stream interrupted')
+            await asyncio.sleep(app.state.token_latency)
+            yield completion_chunk(completion_id, {'content': token})
+        yield completion_chunk(completion_id, {}, 'stop')
+        yield 'data: [DONE]\n\n'
+
+    @app.post('/v1/chat/completions')
+    async def openai_chat(request: Request):
+        body = await request.json()
+        if body.get('stream'):
+            return StreamingResponse(stream_completion(), media_type='text/event-stream')
+        await generate()
+        return {
+            'id': str(uuid4()),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': 'gpt-3.5-turbo',
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': 'Stub answer'}
+            }]
+        }
+
+    @app.get('/v1/models/{owner}/{name}/versions/{version}')
+    async def replicate_version(owner: str, name: str, version: str):
+        return {
+            'id': version,
+            'created_at': '2023-01-01T00:00:00Z',
+            'cog_version': '0.8.0',
+            'openapi_schema': {}
+        }
+
+    @app.post('/v1/predictions')
+    async def replicate_prediction(request: Request):
+        body = await request.json()
+        await generate()
+        return {
+            'id': str(uuid4()),
+            'model': 'cjwbw/shap-e',
+            'version': body['version'],
+            'status': 'succeeded',
+            'input': body['input'],
+            'output': [file_url(request)],
+            'logs': '',
+            'error': None,
+            'metrics': {},
+            'created_at': None,
+            'started_at': None,
+            'completed_at': None,
+            'urls': {}
+        }
+
+    @app.post('/describe')
+    async def astica_describe():
+        await generate()
+        return {
+            'status': 'success',
+            'caption_GPTS': 'A stub building',
+            'caption': {'text': 'Stub building'}
+        }
+
+    @app.get('/files/image.png')
+    async def image_file():
+        return Response(PNG, media_type='image/png')
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve fake image, OpenAI, Astica and Replicate endpoints with a fixed latency.')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--token-latency', type=float, default=0.05)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.token_latency), host='127.0.0.1', port=args.port)
+
+
+if __name__ == '__main__':
+    main()
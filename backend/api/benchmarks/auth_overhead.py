@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+import httpx
+
+
+def configure(directory: str):
+    os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{os.path.join(directory, 'auth.db')}"
+    os.environ.setdefault('SECRET_KEY', 'auth-benchmark-secret-key-0123456789')
+    os.environ.setdefault('ALGORITHM', 'HS256')
+    os.environ.setdefault('OPENAI_API_KEY', 'unused')
+
+
+async def seed(session_factory, followers: int, posts: int) -> str:
+    from app.data.counters import reconcile_follow_counters
+    from app.data.models.post import PostModel
+    from app.data.models.user import UserModel, user_following
+    from sqlalchemy import insert
+
+    user_ids = [str(uuid4()) for _ in range(followers + 1)]
+    async with session_factory() as db:
+        await db.execute(insert(UserModel), [
+            {'id': user_id, 'first_name': 'First', 'last_name': 'Last',
+             'email': f'{user_id}@example.com', 'password': 'password'}
+            for user_id in user_ids
+        ])
+        await db.execute(insert(user_following), [
+            {'follower_id': user_id, 'following_id': user_ids[0]} for user_id in user_ids[1:]
+        ])
+        await db.execute(insert(PostModel), [
+            {'id': str(uuid4()), 'title': 'Post', 'content': 'Content', 'image': '',
+             'user_id': user_ids[i % len(user_ids)], 'tags': []}
+            for i in range(posts)
+        ])
+        await db.commit()
+        await db.run_sync(reconcile_follow_counters)
+    return user_ids[0]
+
+
+def legacy_current_user():
+    from app.data.models.user import UserModel
+    from app.domain.entities.user import UserEntity
+    from core.common.current_user import ALGORITHM, SECRET_KEY, oauth2_scheme
+    from core.config.database_config import get_db
+    from fastapi import Depends
+    from sqlalchemy import select
+    import jwt
+
+    async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user = await db.scalar(select(UserModel).where(UserModel.email == payload['email']))
+        return UserEntity(
+            id=user.id,
+            firstName=user.first_name,
+            lastName=user.last_name,
+            bio=user.bio,
+            email=user.email,
+            password=user.password,
+            image=user.image,
+            country=user.country,
+            followers=await user.get_followers_count(db),
+            following=await user.get_following_count(db)
+        )
+
+    return get_current_user
+
+
+async def measure(client: httpx.AsyncClient, engine, mode: str, requests: int, limit: int):
+    from sqlalchemy import event
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    samples = []
+    event.listen(engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get('/api/v1/posts/all', params={'limit': limit})
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', count)
+    print(f'{mode:>9}: median {statistics.median(samples):7.2f}ms '
+          f'p95 {statistics.quantiles(samples, n=20)[-1]:7.2f}ms '
+          f'{statements / requests:5.1f} statements/request')
+    return statistics.median(samples)
+
+
+async def run(args):
+    import jwt
+    from core.common.current_user import ALGORITHM, SECRET_KEY, get_current_user, principal_cache
+    from core.config.database_config import SessionLocal, create_database, engine
+    from main import app
+
+    await create_database()
+    user_id = await seed(SessionLocal, args.followers, args.posts)
+    token = jwt.encode({'email': f'{user_id}@example.com', 'id': user_id}, SECRET_KEY, algorithm=ALGORITHM)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        client.headers['Authorization'] = f'Bearer {token}'
+        await client.get('/api/v1/posts/all')
+
+        app.dependency_overrides[get_current_user] = legacy_current_user()
+        legacy = await measure(client, engine, 'legacy', args.requests, args.limit)
+        app.dependency_overrides.clear()
+
+        ttl = principal_cache.ttl
+        principal_cache.ttl = 0
+        principal_cache.clear()
+        await measure(client, engine, 'uncached', args.requests, args.limit)
+        principal_cache.ttl = ttl
+        cached = await measure(client, engine, 'cached', args.requests, args.limit)
+    await engine.dispose()
+    print(f'per-request saving: {legacy - cached:.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare /posts/all latency with the full-user, uncached principal and cached principal auth.')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--followers', type=int, default=20000)
+    parser.add_argument('--posts', type=int, default=200)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        configure(directory)
+        asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
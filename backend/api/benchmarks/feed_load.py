@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    email = f'load-{uuid4()}@example.com'
+    password = 'load-test-password'
+    response = await client.post('/api/v1/users/', json={
+        'firstName': 'Load', 'lastName': 'Test', 'bio': '', 'email': email,
+        'password': password, 'country': '', 'image': ''
+    })
+    response.raise_for_status()
+    response = await client.post('/api/v1/token/', json={'email': email, 'password': password})
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, requests: int, limit: int):
+    samples = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get('/api/v1/posts/all', params={'limit': limit})
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f'{concurrency:>11}: {requests / elapsed:8.1f} req/s '
+          f'median {statistics.median(samples):7.2f}ms '
+          f'p95 {statistics.quantiles(samples, n=20)[-1]:7.2f}ms errors {errors}')
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description='Measure /posts/all throughput against a running server at increasing concurrency.')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        client.headers['Authorization'] = f'Bearer {await get_token(client)}'
+        print('concurrency  throughput')
+        for concurrency in args.concurrency:
+            await run_level(client, concurrency, args.requests, args.limit)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import base64
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+
+
+def reference_image(size=(1920, 1080)) -> bytes:
+    generator = random.Random(1)
+    pixels = bytes(generator.randrange(256) for _ in range(16 * 9 * 3))
+    output = io.BytesIO()
+    Image.frombytes('RGB', (16, 9), pixels).resize(size, Image.BICUBIC).save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+async def measure(call, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(args):
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    os.environ['IMAGE_INDEX_BACKEND'] = 'none'
+    from app.data.datasources.remote.ai import AiClients, AiGeneration
+    from app.data.datasources.remote.image_index import DatabaseImageIndex
+    from app.data.datasources.remote.images import ImagePool
+    from app.data.datasources.remote.storage import LocalStorage
+    from core.config.database_config import Base
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    class SlowStorage(LocalStorage):
+
+        async def save(self, file, name):
+            await asyncio.sleep(args.upload_latency)
+            return await super().save(file, name)
+
+    image = base64.b64encode(reference_image()).decode()
+    clients = AiClients()
+    pool = ImagePool()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'images.db')}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        index = DatabaseImageIndex(async_sessionmaker(bind=engine, expire_on_commit=False))
+        generator = random.Random(2)
+        for start in range(0, args.entries, 1000):
+            await asyncio.gather(*(
+                index.add(f'{number:064x}', f'{generator.getrandbits(64):016x}', f'https://media.local/{number}.png')
+                for number in range(start, min(start + 1000, args.entries))
+            ))
+
+        storage = SlowStorage(os.path.join(directory, 'media'), 'http://media.local')
+        plain = AiGeneration(storage=storage, clients=clients, images=pool)
+        indexed = AiGeneration(storage=storage, clients=clients, images=pool, index=index)
+        await pool.dhash(base64.b64decode(image))
+
+        try:
+            before = await measure(lambda: plain.upload_image(image), args.iterations)
+            first = await measure(lambda: indexed.upload_image(image), 1)
+            after = await measure(lambda: indexed.upload_image(image), args.iterations)
+            lookup = await measure(lambda: indexed.similar_images(image), args.iterations)
+            uploads = len(os.listdir(os.path.join(directory, 'media')))
+        finally:
+            pool.close()
+            await clients.close()
+            await engine.dispose()
+
+    print(f'{args.entries} indexed images, upload latency {args.upload_latency * 1000:.0f}ms')
+    print(f'  re-upload without index: {before:7.1f}ms')
+    print(f'  first upload with index: {first:7.1f}ms')
+    print(f'  re-upload with index:    {after:7.1f}ms')
+    print(f'  near-duplicate lookup:   {lookup:7.1f}ms')
+    print(f'  files stored:            {uploads:7d} (of {2 * args.iterations + 1} uploads)')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare re-uploading the same reference image with and without the content-hash image index.')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--entries', type=int, default=20000)
+    parser.add_argument('--upload-latency', type=float, default=0.3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import base64
+import io
+import multiprocessing
+import time
+
+from PIL import Image
+
+from app.data.datasources.remote.images import prepare_png
+
+SIZE = (3840, 2160)
+
+
+def legacy_prepare(image: str) -> bytes:
+    image_data = base64.b64decode(image)
+    image = Image.open(io.BytesIO(image_data)).resize((512, 512))
+    with io.BytesIO() as output_image:
+        image.save(output_image, format="PNG")
+        return output_image.getvalue()
+
+
+def pipeline_prepare(image: str) -> memoryview:
+    return prepare_png(image).getbuffer()
+
+
+variants = {
+    'legacy': legacy_prepare,
+    'pipeline': pipeline_prepare,
+}
+
+
+def source_image(format: str) -> str:
+    noise = Image.effect_noise(SIZE, 48).convert('RGB')
+    gradient = Image.linear_gradient('L').resize(SIZE).convert('RGB')
+    output = io.BytesIO()
+    Image.blend(noise, gradient, 0.6).save(output, format=format, quality=90)
+    return base64.b64encode(output.getvalue()).decode()
+
+
+def memory_kb(field: str) -> int:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1])
+    raise RuntimeError(f'{field} is not available')
+
+
+def measure(variant: str, image: str, iterations: int, results):
+    function = variants[variant]
+    Image.init()
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+    baseline = memory_kb('VmRSS')
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(iterations):
+        output = function(image)
+    results.put({
+        'cpu_ms': (time.process_time() - cpu) / iterations * 1000,
+        'wall_ms': (time.perf_counter() - wall) / iterations * 1000,
+        'peak_mb': memory_kb('VmHWM') / 1024,
+        'growth_mb': (memory_kb('VmHWM') - baseline) / 1024,
+        'output_kb': len(output) / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare CPU time and peak memory of the old resize_png path and the image pipeline on 4K inputs.')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+    context = multiprocessing.get_context('spawn')
+
+    for format in ('PNG', 'JPEG'):
+        image = source_image(format)
+        print(f'{format} {SIZE[0]}x{SIZE[1]}, {len(image) * 3 / 4 / 1024 / 1024:.1f}MB')
+        for variant in variants:
+            results = context.Queue()
+            process = context.Process(target=measure, args=(variant, image, args.iterations, results))
+            process.start()
+            stats = results.get()
+            process.join()
+            print(f'  {variant:>8}: cpu {stats["cpu_ms"]:7.1f}ms wall {stats["wall_ms"]:7.1f}ms '
+                  f'peak rss {stats["peak_mb"]:6.1f}MB (+{stats["growth_mb"]:5.1f}MB) '
+                  f'output {stats["output_kb"]:6.1f}KB')
+
+
+if __name__ == '__main__':
+    main()
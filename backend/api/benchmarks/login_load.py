@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.auth_overhead import configure
+
+PASSWORD = 'login-load-password'
+PROBE_INTERVAL = 0.01
+
+
+async def seed(session_factory, hasher, users: int):
+    from app.data.models.user import UserModel
+    from sqlalchemy import insert
+
+    password = await hasher.hash(PASSWORD)
+    emails = [f'login-{uuid4()}@example.com' for _ in range(users)]
+    async with session_factory() as db:
+        await db.execute(insert(UserModel), [
+            {'id': str(uuid4()), 'first_name': 'Login', 'last_name': 'Load',
+             'email': email, 'password': password}
+            for email in emails
+        ])
+        await db.commit()
+    return emails
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method='inclusive')[p - 1] if len(samples) > 1 else samples[0]
+
+
+async def measure(client: httpx.AsyncClient, mode: str, emails, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    login_samples = []
+    probe_samples = []
+    done = asyncio.Event()
+
+    async def login(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post('/api/v1/token/', json={
+                'email': emails[i % len(emails)], 'password': PASSWORD})
+            login_samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            response = await client.get('/openapi.json')
+            probe_samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    print(f'{mode:>7}: {logins / elapsed:6.1f} logins/s '
+          f'login p50 {percentile(login_samples, 50):7.1f}ms p95 {percentile(login_samples, 95):7.1f}ms | '
+          f'probe p50 {percentile(probe_samples, 50):7.1f}ms p95 {percentile(probe_samples, 95):7.1f}ms '
+          f'max {max(probe_samples):7.1f}ms')
+
+
+async def run(args):
+    from core.common import password
+    from core.config.database_config import SessionLocal, create_database, engine
+    from main import app
+
+    await create_database()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=300) as client:
+        await client.get('/openapi.json')
+        for mode, workers in (('inline', 0), ('pool', args.workers)):
+            password.password_hasher = password.PasswordHasher(rounds=args.rounds, workers=workers)
+            emails = await seed(SessionLocal, password.password_hasher, args.users)
+            try:
+                await measure(client, mode, emails, args.logins, args.concurrency)
+            finally:
+                password.password_hasher.close()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure /token/ under a login burst and how long an unrelated request waits meanwhile.')
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        configure(directory)
+        asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
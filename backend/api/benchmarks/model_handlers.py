@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import tempfile
+import time
+
+import uvicorn
+
+from benchmarks.ai_stub import PNG, create_app
+
+
+async def serial(ai_generation, handler, payload, base_url):
+    output = await handler.generate(ai_generation, payload, base_url)
+    if handler.upload_user_image:
+        await ai_generation.upload_image(payload['image'])
+    return output
+
+
+async def measure(run, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(args):
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    os.environ.setdefault('IMAGE_INDEX_BACKEND', 'none')
+    from app.data.datasources.remote.ai import AiClients, AiGeneration
+    from app.data.datasources.remote.generation import generate, generation_timings, model_handlers
+    from app.data.datasources.remote.storage import LocalStorage
+
+    class SlowStorage(LocalStorage):
+
+        async def save(self, file, name):
+            await asyncio.sleep(args.upload_latency)
+            return await super().save(file, name)
+
+    stub = create_app(latency=args.latency)
+    server = uvicorn.Server(uvicorn.Config(stub, host='127.0.0.1', port=0, log_level='warning'))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    base_url = f'http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}'
+    clients = AiClients(openai_base_url=f'{base_url}/v1', replicate_base_url=base_url,
+                        astica_url=f'{base_url}/describe')
+    image = base64.b64encode(PNG).decode()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            ai_generation = AiGeneration(storage=SlowStorage(directory, 'http://media.local'), clients=clients)
+            for name, handler in model_handlers.items():
+                if args.model and name not in args.model:
+                    continue
+                payload = dict({key: 'villa' if key == 'prompt' else image for key in handler.inputs}, fresh=True)
+                generation_timings.clear()
+                before = await measure(lambda: serial(ai_generation, handler, payload, base_url),
+                                       args.iterations)
+                after = await measure(lambda: generate(ai_generation, name, payload, base_url),
+                                      args.iterations)
+                phases, = generation_timings.stats()
+                print(f'{name:>16}: serial {before:7.1f}ms | registry {after:7.1f}ms '
+                      f'(generation {phases["generation_ms"]:6.1f}ms, upload {phases["upload_ms"]:6.1f}ms, '
+                      f'overlap saved {phases["saved_ms"]:6.1f}ms)')
+    finally:
+        await clients.close()
+        server.should_exit = True
+        await serve
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time each model handler against the stub provider, with and without the concurrent user-image upload.')
+    parser.add_argument('--model', action='append', help='Only run this model; may be repeated')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--upload-latency', type=float, default=0.15)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
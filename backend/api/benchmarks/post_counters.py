@@ -0,0 +1,108 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from app.data.models.chat import ChatModel
+from app.data.models.post import CloneModel, LikeModel, PostModel
+from app.data.models.team import TeamModel
+from app.data.models.user import UserModel
+from core.config.database_config import Base
+from sqlalchemy import Index, create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+
+def seed(db, posts, likes, users):
+    user_ids = [str(uuid4()) for _ in range(users)]
+    db.execute(insert(UserModel), [
+        {'id': user_id, 'first_name': 'First', 'last_name': 'Last',
+         'email': f'{user_id}@example.com', 'password': 'password'}
+        for user_id in user_ids
+    ])
+    post_ids = [str(uuid4()) for _ in range(posts)]
+    db.execute(insert(PostModel), [
+        {'id': post_id, 'title': 'Post', 'user_id': random.choice(user_ids), 'tags': []}
+        for post_id in post_ids
+    ])
+
+    like_counts = dict.fromkeys(post_ids, 0)
+    batch = []
+    for _ in range(likes):
+        post_id = random.choice(post_ids)
+        like_counts[post_id] += 1
+        batch.append({'id': str(uuid4()), 'user_id': random.choice(user_ids), 'post_id': post_id})
+        if len(batch) == 50000:
+            db.execute(insert(LikeModel), batch)
+            batch = []
+    if batch:
+        db.execute(insert(LikeModel), batch)
+
+    for post_id, count in like_counts.items():
+        db.query(PostModel).filter(PostModel.id == post_id).update(
+            {PostModel.like_count: count}, synchronize_session=False)
+    db.commit()
+    return post_ids
+
+
+def time_page(read_page, pages, page_size, post_ids):
+    samples = []
+    for _ in range(pages):
+        page = random.sample(post_ids, page_size)
+        start = time.perf_counter()
+        read_page(page)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare COUNT(*) like/clone reads with the denormalized post counters.')
+    parser.add_argument('--url', help='Database URL, defaults to a temporary SQLite file')
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--likes', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=10)
+    args = parser.parse_args()
+
+    path = None
+    url = args.url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), 'post_counters.db')
+        url = f'sqlite:///{path}'
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    for model in (LikeModel, CloneModel):
+        Index(f'ix_bench_{model.__tablename__}_post_id', model.post_id).create(
+            bind=engine, checkfirst=True)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    post_ids = seed(db, args.posts, args.likes, args.users)
+    print(f'Seeded {args.likes} likes over {args.posts} posts in {time.perf_counter() - start:.1f}s')
+
+    def count_queries(page):
+        for post in db.query(PostModel).filter(PostModel.id.in_(page)).all():
+            db.scalar(select(func.count(LikeModel.id)).where(LikeModel.post_id == post.id))
+            db.scalar(select(func.count(CloneModel.id)).where(CloneModel.post_id == post.id))
+
+    def counter_columns(page):
+        db.execute(select(PostModel.id, PostModel.like_count, PostModel.clone_count)
+                   .where(PostModel.id.in_(page))).all()
+
+    for name, read_page in (('COUNT(*) per post', count_queries), ('like_count/clone_count', counter_columns)):
+        samples = time_page(read_page, args.pages, args.page_size, post_ids)
+        print(f'{name:>24}: median {statistics.median(samples):.2f}ms '
+              f'p95 {statistics.quantiles(samples, n=20)[-1]:.2f}ms')
+
+    db.close()
+    if path:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import base64
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.ai_stub import PNG
+
+API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 64 * 1024
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss(pid: int) -> int:
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError('VmHWM is not available')
+
+
+def image_file(directory: str, size: int) -> str:
+    path = os.path.join(directory, 'upload.png')
+    with open(path, 'wb') as file:
+        file.write(PNG)
+        file.truncate(size)
+    return path
+
+
+def read_chunks(path: str):
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+def start_server(directory: str, port: int, size: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(directory, 'upload.db')}",
+        STORAGE_BACKEND='local',
+        MEDIA_ROOT=os.path.join(directory, 'media'),
+        MEDIA_URL=f'http://127.0.0.1:{port}/media',
+        UPLOAD_MAX_BYTES=str(size * 2),
+        JOB_WORKERS='0',
+        OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'unused'),
+        SECRET_KEY=os.getenv('SECRET_KEY', 'upload-benchmark-secret-key-0123456789'),
+        ALGORITHM=os.getenv('ALGORITHM', 'HS256'),
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=API, env=env)
+    for _ in range(300):
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/docs')
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('Server did not start')
+
+
+def login(client: httpx.Client) -> str:
+    email = f'upload-{uuid4()}@example.com'
+    password = 'upload-test-password'
+    response = client.post('/api/v1/users/', json={
+        'firstName': 'Upload', 'lastName': 'Test', 'bio': '', 'email': email,
+        'password': password, 'country': '', 'image': ''
+    })
+    response.raise_for_status()
+    user_id = response.json()['id']
+    response = client.post('/api/v1/token/', json={'email': email, 'password': password})
+    response.raise_for_status()
+    client.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+    return user_id
+
+
+def upload(client: httpx.Client, mode: str, path: str, user_id: str) -> httpx.Response:
+    if mode == 'base64':
+        with open(path, 'rb') as file:
+            image = base64.b64encode(file.read()).decode()
+        return client.put(f'/api/v1/users/{user_id}', json={
+            'firstName': None, 'lastName': None, 'bio': None, 'email': None,
+            'country': None, 'image': image
+        })
+    if mode == 'multipart':
+        with open(path, 'rb') as file:
+            return client.post('/api/v1/uploads/', files={'file': ('upload.png', file, 'image/png')})
+    return client.put('/api/v1/uploads/', content=read_chunks(path),
+                      headers={'Content-Type': 'image/png'})
+
+
+def measure(mode: str, size: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = image_file(directory, size)
+        port = free_port()
+        server = start_server(directory, port, size)
+        try:
+            with httpx.Client(base_url=f'http://127.0.0.1:{port}', timeout=300) as client:
+                user_id = login(client)
+                baseline = peak_rss(server.pid)
+                start = time.perf_counter()
+                response = upload(client, mode, path, user_id)
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                peak = peak_rss(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+    mb = 1024 * 1024
+    print(f'{mode:>9}: {elapsed * 1000:8.1f}ms baseline {baseline / mb:7.1f}MB '
+          f'peak {peak / mb:7.1f}MB growth {(peak - baseline) / mb:7.1f}MB')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare server peak RSS for base64-in-JSON and direct uploads of one image.')
+    parser.add_argument('--size', type=int, default=32, help='Image size in MB')
+    parser.add_argument('--modes', nargs='+', default=['base64', 'multipart', 'stream'],
+                        choices=['base64', 'multipart', 'stream'])
+    args = parser.parse_args()
+    for mode in args.modes:
+        measure(mode, args.size * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 import jwt
 from app.data.models.user import UserModel
-from app.domain.entities.user import UserEntity
+from app.domain.entities.auth import Principal
+from sqlalchemy import select
 
 from core.config.database_config import get_db
-import os 
+import os
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = 1000 * 60 * 60 * 24 * 7 # 7 days
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get_db)):
+
+class PrincipalCache:
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        entry = self.entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self.entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, principal: Principal):
+        if self.ttl <= 0:
+            return
+        self.entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self.entries.move_to_end(principal.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self.entries.pop(user_id, None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get_db)) -> Principal:
+    return await get_user_from_token(token, db)
+
+async def get_user_from_token(token: str, db) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,19 +76,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get
         raise credentials_exception
     except Exception as e:
         raise credentials_exception
-    user = db.query(UserModel).filter(UserModel.email == email).first()
-    if user is None:
+
+    user_id = payload.get("id")
+    principal = principal_cache.get(user_id) if user_id else None
+    if principal is not None and principal.email == email:
+        return principal
+
+    user = (await db.execute(select(
+        UserModel.id, UserModel.email, UserModel.first_name, UserModel.last_name
+    ).where(UserModel.email == email))).first()
+    if user is None or (user_id and user.id != user_id):
         raise credentials_exception
-    return UserEntity(
-        id=user.id,
-        firstName=user.first_name,
-        lastName=user.last_name,
-        bio=user.bio,
-        email=user.email,
-        password=user.password,
-        image=user.image,
-        country=user.country,
-        followers=user.get_followers_count(db),
-        following=user.get_following_count(db)
-    )
-    
\ No newline at end of file
+    principal = Principal(id=user.id, email=user.email, first_name=user.first_name, last_name=user.last_name)
+    principal_cache.set(principal)
+    return principal
@@ -0,0 +1,18 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(date: datetime, id: str) -> str:
+    raw = json.dumps([date.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        date, id = json.loads(raw)
+        return datetime.fromisoformat(date), str(id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,9 +1,85 @@
-from passlib.context import CryptContext
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
 
-def verify_password(plain_password, hash_password):
-    return pwd_context.verify(plain_password, hash_password)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+BCRYPT_MAX_BYTES = 72
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+
+def _secret(password: str) -> bytes:
+    return password.encode()[:BCRYPT_MAX_BYTES]
+
+
+def hash_rounds(hash_password: str) -> Optional[int]:
+    try:
+        return int(hash_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, hash_password: str) -> bool:
+        return await self._run(self._verify, password, hash_password)
+
+    async def verify_and_update(self, password: str, hash_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(self._verify_and_update, password, hash_password)
+
+    def needs_update(self, hash_password: str) -> bool:
+        return hash_rounds(hash_password) != self.rounds
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _run(self, function, *args):
+        if self.workers <= 0:
+            return function(*args)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password')
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(_secret(password), bcrypt.gensalt(self.rounds)).decode()
+
+    def _verify(self, password: str, hash_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(_secret(password), hash_password.encode())
+        except (AttributeError, ValueError):
+            return False
+
+    def _verify_and_update(self, password: str, hash_password: str) -> Tuple[bool, Optional[str]]:
+        if not self._verify(password, hash_password):
+            return False, None
+        if self.needs_update(hash_password):
+            return True, self._hash(password)
+        return True, None
+
+
+password_hasher = PasswordHasher()
+
+
+async def verify_password(plain_password, hash_password):
+    return await password_hasher.verify(plain_password, hash_password)
+
+async def verify_and_update_password(plain_password, hash_password):
+    return await password_hasher.verify_and_update(plain_password, hash_password)
+
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
+
+def close_password_hasher():
+    password_hasher.close()
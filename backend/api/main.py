@@ -1,20 +1,51 @@
 import os
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
 
 import uvicorn
+from app.data.datasources.remote.ai import close_ai_clients
+from app.data.datasources.remote.ai_cache import close_result_cache
+from app.data.datasources.remote.images import close_image_pool
+from app.data.datasources.remote.storage import MEDIA_ROOT, MEDIA_URL, STORAGE_BACKEND
+from app.data.jobs import JOB_WORKERS, JobWorker
+from app.data.migrations import run_migrations
+from app.data.realtime import close_team_chat_hub
 from app.presentation.auth import router as auth_router
 from app.presentation.chat import router as chat_router
 from app.presentation.free import router as free_router
+from app.presentation.job import router as job_router
 from app.presentation.message import router as message_router
+from app.presentation.metrics import router as metrics_router
 from app.presentation.post import router as post_router
 from app.presentation.sketches import router as sketch_router
 from app.presentation.team import router as team_router
+from app.presentation.upload import router as upload_router
 from app.presentation.user import router as user_router
-from core.config.database_config import create_database
+from core.common.password import close_password_hasher
+from core.config.database_config import create_database, engine
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
-create_database()
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await create_database()
+    await run_migrations()
+    job_worker = JobWorker()
+    if JOB_WORKERS > 0:
+        await job_worker.start()
+    yield
+    await job_worker.stop()
+    await close_ai_clients()
+    await close_team_chat_hub()
+    close_password_hasher()
+    close_image_pool()
+    close_result_cache()
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.add_middleware(
@@ -23,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(user_router, prefix="/api/v1", tags=['user'])
@@ -33,6 +65,13 @@ app.include_router(team_router, prefix="/api/v1", tags=['team'])
 app.include_router(message_router, prefix="/api/v1", tags=['message'])
 app.include_router(free_router, prefix="/api/v1", tags=['free'])
 app.include_router(sketch_router, prefix="/api/v1", tags=['sketch'])
+app.include_router(job_router, prefix="/api/v1", tags=['job'])
+app.include_router(upload_router, prefix="/api/v1", tags=['upload'])
+app.include_router(metrics_router, prefix="/api/v1", tags=['metrics'])
+
+if STORAGE_BACKEND == "local":
+    os.makedirs(MEDIA_ROOT, exist_ok=True)
+    app.mount(urlparse(MEDIA_URL).path, StaticFiles(directory=MEDIA_ROOT), name="media")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=os.getenv("PORT", 8000))
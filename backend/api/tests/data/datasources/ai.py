@@ -0,0 +1,159 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import uvicorn
+from app.data.datasources.remote.ai import AiClients, AiGeneration, providers
+from app.data.datasources.remote.ai_cache import MemoryResultCache
+from app.data.datasources.remote.image_index import MemoryImageIndex
+from app.data.datasources.remote.storage import LocalStorage
+from benchmarks.ai_stub import PNG, create_app
+from core.errors.exceptions import CacheException, ServerException
+from PIL import Image
+
+MEDIA_URL = 'https://media.example.com'
+
+
+class TestAiGeneration(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        os.environ.setdefault('OPENAI_API_KEY', 'stub')
+        self.stub = create_app(latency=0.2)
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.stub, host='127.0.0.1', port=0, log_level='warning'))
+        self.serve = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{port}'
+
+        self.clients = AiClients(
+            openai_base_url=f'{self.base_url}/v1',
+            replicate_base_url=self.base_url,
+            astica_url=f'{self.base_url}/describe',
+            media_hosts={'127.0.0.1'}
+        )
+        self.media = tempfile.TemporaryDirectory()
+        self.cache = MemoryResultCache()
+        self.index = MemoryImageIndex()
+        self.ai_generation = AiGeneration(
+            storage=LocalStorage(self.media.name, MEDIA_URL), clients=self.clients, cache=self.cache,
+            index=self.index)
+
+    async def asyncTearDown(self) -> None:
+        await self.clients.close()
+        self.server.should_exit = True
+        await self.serve
+        self.media.cleanup()
+
+    def assertStored(self, url):
+        self.assertTrue(url.startswith(f'{MEDIA_URL}/'))
+        with open(os.path.join(self.media.name, url.rsplit('/', 1)[1]), 'rb') as image:
+            self.assertEqual(image.read(), PNG)
+
+    async def _get_image(self):
+        return await self.ai_generation.get_image(
+            f'{self.base_url}/text-to-image', {}, {'prompt': 'villa'})
+
+    async def test_fifty_concurrent_generations(self):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._get_image() for _ in range(50)))
+        elapsed = time.perf_counter() - start
+
+        serial = 50 * self.stub.state.latency
+        self.assertEqual(len(set(results)), 50)
+        for url in results:
+            self.assertStored(url)
+        self.assertEqual(self.stub.state.calls, 50)
+        self.assertLess(elapsed, serial / 4)
+        self.assertEqual(self.stub.state.peak, providers['image'].concurrency)
+
+    async def test_event_loop_stays_responsive(self):
+        generations = asyncio.gather(*(self._get_image() for _ in range(10)))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        self.assertLess(time.perf_counter() - start, self.stub.state.latency)
+        await generations
+
+    async def test_providers(self):
+        image = base64.b64encode(PNG).decode()
+        image_url = f'{self.base_url}/files/image.png'
+        self.assertStored(await self.ai_generation.create_from_text({'prompt': 'villa'}))
+        self.assertStored(await self.ai_generation.image_variant({'image': image}))
+        self.assertStored(await self.ai_generation.image_variant({'image': image_url}))
+        self.assertStored(await self.ai_generation.create_from_image(
+            {'prompt': 'villa', 'image': image, 'mask': image}))
+        self.assertStored(await self.ai_generation.create_from_image(
+            {'prompt': 'villa', 'image': image_url, 'mask': image_url}))
+        self.assertEqual(await self.ai_generation.chatbot({'prompt': 'villa'}), 'Stub answer')
+        self.assertEqual(await self.ai_generation.analysis({'prompt': 'villa', 'image': image}),
+                         {'detail': 'A stub building', 'title': 'Stub building'})
+        self.assertStored(await self.ai_generation.text_to_threeD({'prompt': 'villa'}))
+        self.assertStored(await self.ai_generation.upload_image(image))
+        self.assertEqual(await self.ai_generation.upload_image(image_url), image_url)
+        with self.assertRaises(CacheException):
+            await self.ai_generation.upload_image('https://images.example.com/villa.png')
+
+    async def test_deterministic_generations_are_cached(self):
+        image = await self.ai_generation.create_from_text({'prompt': 'modern villa'})
+        self.assertEqual(await self.ai_generation.create_from_text({'prompt': ' modern  villa'}), image)
+        self.assertEqual(self.stub.state.calls, 1)
+
+        fresh = await self.ai_generation.create_from_text({'prompt': 'modern villa', 'fresh': True})
+        self.assertNotEqual(fresh, image)
+        self.assertEqual(await self.ai_generation.create_from_text({'prompt': 'modern villa'}), fresh)
+        self.assertEqual(self.stub.state.calls, 2)
+
+        answers = await asyncio.gather(*(self.ai_generation.chatbot({'prompt': 'villa'}) for _ in range(5)))
+        self.assertEqual(answers, ['Stub answer'] * 5)
+        model = await self.ai_generation.text_to_threeD({'prompt': 'villa'})
+        self.assertEqual(await self.ai_generation.text_to_threeD({'prompt': 'villa'}), model)
+        self.assertEqual(self.stub.state.calls, 4)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['coalesced'], stats['bypasses']),
+                         (3, 3, 4, 1))
+
+    async def test_reuploads_are_deduplicated(self):
+        generated = await self.ai_generation.create_from_text({'prompt': 'villa'})
+        image = base64.b64encode(PNG).decode()
+        self.assertEqual(await self.ai_generation.upload_image(image), generated)
+        self.assertEqual(await self.ai_generation.upload_image(image), generated)
+        self.assertEqual(len(os.listdir(self.media.name)), 1)
+
+        output = io.BytesIO()
+        Image.open(io.BytesIO(PNG)).resize((64, 64)).save(output, format='JPEG')
+        copy = base64.b64encode(output.getvalue()).decode()
+        similar, = await self.ai_generation.similar_images(copy)
+        self.assertEqual((similar.url, similar.distance), (generated, 0))
+        self.assertNotEqual(await self.ai_generation.upload_image(copy), generated)
+        self.assertEqual(len(await self.ai_generation.similar_images(f'{self.base_url}/files/image.png')), 2)
+
+    async def test_downloads_are_restricted_and_capped(self):
+        image_url = f'{self.base_url}/files/image.png'
+        self.assertEqual(await self.clients.download(image_url, max_bytes=len(PNG)), PNG)
+        with self.assertRaises(ServerException):
+            await self.clients.download(image_url, max_bytes=len(PNG) - 1)
+        for image in (f'http://localhost:{self.base_url.rsplit(":", 1)[1]}/files/image.png',
+                      'http://169.254.169.254/latest/meta-data/'):
+            with self.subTest(image=image), self.assertRaises(ServerException):
+                await self.ai_generation.image_variant({'image': image})
+            with self.subTest(image=image), self.assertRaises(ServerException):
+                await self.ai_generation.similar_images(image)
+
+    async def test_provider_timeout(self):
+        timeout = providers['image'].timeout
+        providers['image'].timeout = 0.05
+        try:
+            with self.assertRaises(TimeoutError):
+                await self._get_image()
+        finally:
+            providers['image'].timeout = timeout
+
+
+if __name__ == '__main__':
+    unittest.main()
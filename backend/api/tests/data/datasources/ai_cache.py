@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from app.data.datasources.remote.ai_cache import MemoryResultCache, SqliteResultCache, cache_key
+
+
+class ResultCacheTests:
+
+    def create_cache(self, ttl=60, max_entries=3):
+        raise NotImplementedError
+
+    async def asyncSetUp(self) -> None:
+        self.calls = 0
+        self.cache = self.create_cache()
+
+    async def _generate(self, value='result', delay=0):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return value
+
+    def test_cache_key_normalizes_payload(self):
+        key = cache_key('dall-e-3', {'prompt': 'modern  villa ', 'size': '1024x1024'})
+        self.assertEqual(key, cache_key('dall-e-3', {'size': '1024x1024', 'prompt': ' modern villa',
+                                                     'fresh': True}))
+        self.assertNotEqual(key, cache_key('dall-e-2', {'prompt': 'modern villa', 'size': '1024x1024'}))
+        self.assertNotEqual(key, cache_key('dall-e-3', {'prompt': 'modern house', 'size': '1024x1024'}))
+
+    async def test_hit_and_miss(self):
+        self.assertEqual(await self.cache.get_or_create('a', self._generate), 'result')
+        self.assertEqual(await self.cache.get_or_create('a', lambda: self._generate('other')), 'result')
+        self.assertEqual(self.calls, 1)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries'], stats['hit_ratio']),
+                         (1, 1, 1, 0.5))
+
+    async def test_fresh_bypasses_and_refreshes(self):
+        await self.cache.get_or_create('a', self._generate)
+        value = await self.cache.get_or_create('a', lambda: self._generate('fresh'), fresh=True)
+        self.assertEqual(value, 'fresh')
+        self.assertEqual(await self.cache.get_or_create('a', self._generate), 'fresh')
+        self.assertEqual((self.calls, self.cache.stats()['bypasses']), (2, 1))
+
+    async def test_concurrent_requests_are_coalesced(self):
+        results = await asyncio.gather(*(
+            self.cache.get_or_create('a', lambda: self._generate(delay=0.05)) for _ in range(10)))
+        self.assertEqual(results, ['result'] * 10)
+        self.assertEqual((self.calls, self.cache.stats()['coalesced']), (1, 9))
+
+    async def test_cancelled_leader_hands_over_to_a_follower(self):
+        leader = asyncio.create_task(
+            self.cache.get_or_create('a', lambda: self._generate('leader', delay=0.05)))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(
+            self.cache.get_or_create('a', lambda: self._generate('follower', delay=0.05))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        self.assertEqual(await asyncio.gather(*followers), ['follower'] * 3)
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        self.assertEqual(self.calls, 2)
+
+    async def test_errors_are_not_cached(self):
+        async def fail():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError('provider down')
+
+        results = await asyncio.gather(*(self.cache.get_or_create('a', fail) for _ in range(3)),
+                                       return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(await self.cache.get_or_create('a', self._generate), 'result')
+        self.assertEqual(self.calls, 2)
+
+    async def test_ttl(self):
+        self.cache = self.create_cache(ttl=0.05)
+        await self.cache.get_or_create('a', self._generate)
+        await asyncio.sleep(0.1)
+        await self.cache.get_or_create('a', self._generate)
+        self.assertEqual((self.calls, self.cache.stats()['expirations']), (2, 1))
+
+    async def test_lru_eviction(self):
+        for key in 'abc':
+            await self.cache.get_or_create(key, self._generate)
+        await asyncio.sleep(0.01)
+        await self.cache.get_or_create('a', self._generate)
+        await self.cache.get_or_create('d', self._generate)
+        self.assertEqual(self.calls, 4)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['entries'], stats['evictions']), (3, 1))
+        self.assertIsNone(await self.cache.get('b'))
+        self.assertEqual(await self.cache.get('a'), 'result')
+
+
+class TestMemoryResultCache(ResultCacheTests, unittest.IsolatedAsyncioTestCase):
+
+    def create_cache(self, ttl=60, max_entries=3):
+        return MemoryResultCache(ttl=ttl, max_entries=max_entries)
+
+
+class TestSqliteResultCache(ResultCacheTests, unittest.IsolatedAsyncioTestCase):
+
+    def create_cache(self, ttl=60, max_entries=3):
+        return SqliteResultCache(os.path.join(self.directory.name, f'cache-{ttl}.sqlite3'),
+                                 ttl=ttl, max_entries=max_entries)
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        await super().asyncSetUp()
+
+    async def asyncTearDown(self) -> None:
+        self.cache.close()
+        self.directory.cleanup()
+
+    async def test_results_survive_restart(self):
+        await self.cache.get_or_create('a', lambda: self._generate({'url': 'image.png'}))
+        self.cache.close()
+        self.cache = self.create_cache()
+        self.assertEqual(await self.cache.get_or_create('a', self._generate), {'url': 'image.png'})
+        self.assertEqual((self.calls, self.cache.stats()['entries']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
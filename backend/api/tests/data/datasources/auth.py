@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from app.data.datasources.local.auth import AuthLocalDataSourceImpl
+from app.data.datasources.local.user import UserLocalDataSourceImpl
+from app.data.models.user import UserModel
+from app.domain.entities.auth import Auth
+from app.domain.entities.user import User
+from core.common.password import PasswordHasher, hash_rounds
+from core.errors.exceptions import CacheException
+from sqlalchemy import select
+from tests.database import AsyncDatabaseTestCase
+
+PASSWORD = 'correct horse battery'
+
+
+class TestAuthLocalDataSource(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = AuthLocalDataSourceImpl(db=self.db)
+
+        self.hasher = PasswordHasher(rounds=4, workers=2)
+        self.patches = [
+            patch('core.common.password.password_hasher', self.hasher),
+            patch.multiple('app.data.datasources.local.auth',
+                           SECRET_KEY='test-secret-key-0123456789abcdef', ALGORITHM='HS256'),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+        self.user = await UserLocalDataSourceImpl(db=self.db).create_user(User(
+            firstName='First', lastName='Last', bio='', email='user@example.com',
+            password=PASSWORD, country='', image=''))
+
+    async def asyncTearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.hasher.close()
+        await super().asyncTearDown()
+
+    async def _stored_hash(self):
+        return await self.db.scalar(select(UserModel.password).where(UserModel.id == self.user.id)
+                                    .execution_options(populate_existing=True))
+
+    async def test_login(self):
+        self.assertEqual(hash_rounds(await self._stored_hash()), 4)
+        token = await self.datasource.get_token(Auth(email='user@example.com', password=PASSWORD))
+        self.assertEqual(token.id, self.user.id)
+
+        with self.assertRaises(CacheException):
+            await self.datasource.get_token(Auth(email='user@example.com', password='wrong password'))
+
+    async def test_rehash_on_cost_change(self):
+        stored = await self._stored_hash()
+        await self.datasource.get_token(Auth(email='user@example.com', password=PASSWORD))
+        self.assertEqual(await self._stored_hash(), stored)
+
+        self.hasher.rounds = 5
+        await self.datasource.get_token(Auth(email='user@example.com', password=PASSWORD))
+        rehashed = await self._stored_hash()
+        self.assertEqual(hash_rounds(rehashed), 5)
+        self.assertTrue(await self.hasher.verify(PASSWORD, rehashed))
+
+        await self.datasource.get_token(Auth(email='user@example.com', password=PASSWORD))
+        self.assertEqual(await self._stored_hash(), rehashed)
+
+    async def test_long_passwords_match_truncated_hashes(self):
+        password = 'x' * 100
+        hashed = await self.hasher.hash(password)
+        self.assertTrue(await self.hasher.verify(password, hashed))
+        self.assertTrue(await self.hasher.verify('x' * 72, hashed))
+        self.assertFalse(await self.hasher.verify(password, 'not a hash'))
+
+    async def test_event_loop_stays_responsive(self):
+        self.hasher.rounds = 10
+        start = time.perf_counter()
+        self.hasher._hash(PASSWORD)
+        single = time.perf_counter() - start
+        gaps = []
+
+        async def tick():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.create_task(tick())
+        hashes = await asyncio.gather(*(self.hasher.hash(PASSWORD) for _ in range(4)))
+        ticker.cancel()
+
+        self.assertEqual(len(set(hashes)), 4)
+        self.assertTrue(gaps)
+        self.assertLess(max(gaps), single / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
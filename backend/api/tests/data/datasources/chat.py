@@ -0,0 +1,189 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.data.datasources.local.chat import ChatLocalDataSourceImpl, append_chat_messages
+from app.data.migrations import chat_messages, chat_summaries
+from app.data.models.chat import ChatMessageModel, ChatModel
+from app.data.models.user import UserModel
+from app.domain.entities.message import MessageEntity
+from core.common.cursor import encode_cursor
+from core.errors.exceptions import CacheException
+from sqlalchemy import event, func, select, text, update
+from tests.database import AsyncDatabaseTestCase
+
+
+class TestChatMessages(AsyncDatabaseTestCase):
+
+    foreign_keys = True
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = ChatLocalDataSourceImpl(db=self.db)
+
+        self.user_id = str(uuid4())
+        self.db.add(UserModel(id=self.user_id, first_name="First", last_name="Last",
+                              email="user@example.com", password="password"))
+        self.chat_id = await self._add_chat()
+        self.start = datetime(2023, 1, 1)
+
+    async def _add_chat(self, messages=None):
+        chat_id = str(uuid4())
+        self.db.add(ChatModel(id=chat_id, user_id=self.user_id, title="Chat", messages=messages))
+        await self.db.commit()
+        return chat_id
+
+    def _message(self, i):
+        return MessageEntity(
+            id=str(uuid4()),
+            sender='user' if i % 2 == 0 else 'ai',
+            content={'prompt': f'prompt {i}', 'chat': ''},
+            date=self.start + timedelta(minutes=i)
+        )
+
+    async def _append(self, chat_id, count, first=0):
+        messages = [self._message(i) for i in range(first, first + count)]
+        await append_chat_messages(self.db, chat_id, messages)
+        await self.db.commit()
+        return messages
+
+    def _seqs(self, chat):
+        return [json.loads(message)['seq'] for message in chat.messages]
+
+    async def test_append_assigns_sequences(self):
+        first = await self._append(self.chat_id, 2)
+        second = await self._append(self.chat_id, 2, first=2)
+        self.assertEqual([message.seq for message in first + second], [1, 2, 3, 4])
+
+        chat = await self.db.scalar(select(ChatModel).where(ChatModel.id == self.chat_id)
+                                    .execution_options(populate_existing=True))
+        self.assertEqual(chat.message_count, 4)
+        self.assertIsNone(chat.messages)
+
+        chat = await self.datasource.get_chat(self.chat_id)
+        self.assertEqual(chat.messages, [message.to_json() for message in first + second])
+        self.assertIsNone(chat.next_cursor)
+
+    async def test_pagination(self):
+        await self._append(self.chat_id, 10)
+
+        chat = await self.datasource.get_chat(self.chat_id, limit=3)
+        self.assertEqual((self._seqs(chat), chat.next_cursor), ([8, 9, 10], 8))
+        chat = await self.datasource.get_chat(self.chat_id, before=8, limit=3)
+        self.assertEqual((self._seqs(chat), chat.next_cursor), ([5, 6, 7], 5))
+        chat = await self.datasource.get_chat(self.chat_id, before=3, limit=3)
+        self.assertEqual((self._seqs(chat), chat.next_cursor), ([1, 2], None))
+
+        chat = await self.datasource.get_chat(self.chat_id, after=7, limit=2)
+        self.assertEqual((self._seqs(chat), chat.next_cursor), ([8, 9], 9))
+        chat = await self.datasource.get_chat(self.chat_id, after=9, limit=2)
+        self.assertEqual((self._seqs(chat), chat.next_cursor), ([10], None))
+
+        chat = await self.datasource.get_chat(self.chat_id, after=2, before=6)
+        self.assertEqual(self._seqs(chat), [3, 4, 5])
+        chat = await self.datasource.get_chat(self.chat_id)
+        self.assertEqual(self._seqs(chat), list(range(1, 11)))
+
+        with self.assertRaises(CacheException):
+            await self.datasource.get_chat(str(uuid4()))
+
+    async def test_migration_explodes_json_messages(self):
+        legacy = [self._message(i) for i in range(3)]
+        legacy_chat_id = await self._add_chat([message.to_json() for message in legacy])
+        empty_chat_id = await self._add_chat([])
+        await self._append(self.chat_id, 2)
+
+        await self.db.run_sync(chat_messages.upgrade)
+
+        chat = await self.datasource.get_chat(legacy_chat_id)
+        self.assertEqual([json.loads(message) for message in chat.messages],
+                         [dict(message.to_dict(), seq=seq) for seq, message in enumerate(legacy, start=1)])
+        self.assertEqual(self._seqs(await self.datasource.get_chat(self.chat_id)), [1, 2])
+        self.assertEqual((await self.datasource.get_chat(empty_chat_id)).messages, [])
+
+        counts = dict((await self.db.execute(select(ChatModel.id, ChatModel.message_count))).all())
+        self.assertEqual(counts, {legacy_chat_id: 3, empty_chat_id: 0, self.chat_id: 2})
+        remaining = await self.db.scalar(select(func.count()).select_from(ChatModel).where(
+            ChatModel.messages.isnot(None)))
+        self.assertEqual(remaining, 0)
+
+        await self._append(legacy_chat_id, 1, first=3)
+        self.assertEqual(self._seqs(await self.datasource.get_chat(legacy_chat_id)), [1, 2, 3, 4])
+
+        await self.db.run_sync(chat_messages.upgrade)
+        self.assertEqual(self._seqs(await self.datasource.get_chat(legacy_chat_id)), [1, 2, 3, 4])
+
+    async def test_get_and_delete_chats(self):
+        other_chat_id = await self._add_chat()
+        await self._append(self.chat_id, 3)
+        await self._append(other_chat_id, 2)
+
+        chats = {chat.id: chat for chat in await self.datasource.get_chats(self.user_id)}
+        self.assertEqual(self._seqs(chats[self.chat_id]), [1, 2, 3])
+        self.assertEqual(self._seqs(chats[other_chat_id]), [1, 2])
+
+        await self.datasource.delete_chat(self.chat_id)
+        remaining = (await self.db.scalars(select(ChatMessageModel.chat_id).distinct())).all()
+        self.assertEqual(remaining, [other_chat_id])
+
+    async def _summaries(self, **kwargs):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", record)
+        try:
+            summaries = await self.datasource.get_chat_summaries(self.user_id, **kwargs)
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", record)
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn('chats.messages', statements[0])
+        return summaries
+
+    async def test_chat_summaries(self):
+        chat_ids = [self.chat_id] + [await self._add_chat() for _ in range(4)]
+        for i, chat_id in enumerate(chat_ids):
+            await self._append(chat_id, 2 + i, first=10 * i)
+
+        summaries = await self._summaries()
+        self.assertEqual([summary.id for summary in summaries], chat_ids[::-1])
+        latest = summaries[0]
+        self.assertEqual((latest.last_message, latest.message_count, latest.updated_at),
+                         ('prompt 45', 6, self.start + timedelta(minutes=45)))
+
+        page = await self._summaries(limit=2)
+        self.assertEqual([summary.id for summary in page], chat_ids[:2:-1])
+        cursor = encode_cursor(page[-1].updated_at, page[-1].id)
+        page = await self._summaries(cursor=cursor, limit=2)
+        self.assertEqual([summary.id for summary in page], chat_ids[2:0:-1])
+
+        with self.assertRaises(CacheException):
+            await self.datasource.get_chat_summaries(self.user_id, cursor='invalid')
+
+        plan = (await self.db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id, title FROM chats WHERE user_id = :user_id "
+            "ORDER BY updated_at DESC, id DESC"), {'user_id': self.user_id})).all()
+        self.assertIn('ix_chats_user_id_updated_at_id', str(plan))
+
+    async def test_summary_migration_backfills_chats(self):
+        legacy_chat_id = await self._add_chat([message.to_json() for message in
+                                               [self._message(0), self._message(1)]])
+        empty_chat_id = await self._add_chat()
+        await self.db.execute(update(ChatModel).values(updated_at=None, last_message=None))
+        await self.db.commit()
+
+        await self.db.run_sync(chat_messages.upgrade)
+        await self.db.run_sync(chat_summaries.upgrade)
+
+        summaries = {summary.id: summary for summary in await self._summaries()}
+        self.assertEqual((summaries[legacy_chat_id].last_message, summaries[legacy_chat_id].updated_at),
+                         ('prompt 1', self.start + timedelta(minutes=1)))
+        self.assertEqual((summaries[empty_chat_id].last_message, summaries[empty_chat_id].message_count),
+                         ('', 0))
+        self.assertIsNotNone(summaries[empty_chat_id].updated_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import base64
+import io
+import os
+import unittest
+from uuid import uuid4
+
+import httpx
+from app.data.datasources.local.post import PostLocalDataSourceImpl
+from app.data.datasources.local.team import TeamLocalDataSourceImpl
+from app.data.datasources.remote.ai import AiClients
+from app.data.datasources.remote.derivatives import ImageDerivatives, srcset
+from app.data.datasources.remote.images import ImagePool, make_variants
+from app.data.datasources.remote.storage import MEDIA_HOSTS, LocalStorage
+from app.data.jobs import JobWorker, run_image_variants_job
+from app.data.migrations import search
+from app.data.models.job import JOB_DEAD, JOB_SUCCEEDED, JobModel
+from app.data.models.user import UserModel
+from app.domain.entities.post import Post
+from app.domain.entities.team import Team
+from core.errors.exceptions import ServerException
+from PIL import Image
+from sqlalchemy import select
+from tests.database import AsyncDatabaseTestCase
+
+MEDIA_URL = 'https://media.example.com'
+IMAGES_URL = f'https://{min(MEDIA_HOSTS)}'
+WIDTHS = (320, 640, 1024)
+
+
+def encode(size, format='JPEG') -> bytes:
+    output = io.BytesIO()
+    Image.linear_gradient('L').resize(size).convert('RGB').save(output, format=format)
+    return output.getvalue()
+
+
+class TestImageDerivatives(AsyncDatabaseTestCase):
+
+    database_file = True
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        await self.db.run_sync(search.upgrade)
+
+        self.images = {
+            '/villa.jpg': encode((2000, 1000)),
+            '/facade.png': encode((1600, 1200), 'PNG'),
+            '/icon.png': encode((64, 64), 'PNG'),
+        }
+        self.downloads = []
+        self.clients = AiClients()
+        await self.clients.http.aclose()
+        self.clients.http = httpx.AsyncClient(transport=httpx.MockTransport(self._serve))
+        self.media = os.path.join(self.directory.name, 'media')
+        self.pool = ImagePool(workers=1)
+        self.derivatives = ImageDerivatives(
+            storage=LocalStorage(self.media, MEDIA_URL), clients=self.clients, images=self.pool, widths=WIDTHS)
+        self.worker = JobWorker(
+            session_factory=self.session_factory,
+            handlers={'image_variants': lambda db, job: run_image_variants_job(db, job, self.derivatives)},
+            workers=1,
+            poll_interval=0.05,
+            retry_delay=0
+        )
+
+        self.user_id = str(uuid4())
+        self.db.add(UserModel(id=self.user_id, first_name="First", last_name="Last",
+                              email="user@example.com", password="password"))
+        await self.db.commit()
+
+    async def asyncTearDown(self) -> None:
+        self.pool.close()
+        await self.clients.close()
+        await super().asyncTearDown()
+
+    def _serve(self, request):
+        self.downloads.append(request.url.path)
+        if request.url.path not in self.images:
+            return httpx.Response(404)
+        return httpx.Response(200, content=self.images[request.url.path])
+
+    async def _run_jobs(self):
+        while await self.worker.run_once():
+            pass
+
+    def _assert_variants(self, variants, size):
+        self.assertEqual(list(variants), [str(width) for width in WIDTHS])
+        for width, url in variants.items():
+            self.assertTrue(url.startswith(f'{MEDIA_URL}/') and url.endswith(f'-{width}w.webp'))
+            with Image.open(os.path.join(self.media, url.rsplit('/', 1)[-1])) as variant:
+                self.assertEqual(variant.format, 'WEBP')
+                self.assertEqual(variant.size, (int(width), round(int(width) * size[1] / size[0])))
+
+    def test_make_variants(self):
+        variants = make_variants(encode((2000, 1000)), WIDTHS, 'AVIF')
+        self.assertEqual([width for width, _ in variants], list(WIDTHS))
+        for width, output in variants:
+            with Image.open(output) as variant:
+                self.assertEqual((variant.format, variant.size), ('AVIF', (width, width // 2)))
+
+        self.assertEqual([width for width, _ in make_variants(encode((640, 480)), WIDTHS)], [320])
+        self.assertEqual(make_variants(encode((64, 64)), WIDTHS), [])
+
+    def test_srcset(self):
+        self.assertEqual(srcset({'1024': 'c', '320': 'a', '640': 'b'}), 'a 320w, b 640w, c 1024w')
+        self.assertIsNone(srcset({}))
+        self.assertIsNone(srcset(None))
+
+    async def test_create_from_url_and_base64(self):
+        self._assert_variants(await self.derivatives.create(f'{IMAGES_URL}/villa.jpg'), (2000, 1000))
+        image = base64.b64encode(self.images['/facade.png']).decode()
+        self._assert_variants(await self.derivatives.create(image), (1600, 1200))
+        self.assertEqual(await self.derivatives.create(f'{IMAGES_URL}/icon.png'), {})
+
+        with self.assertRaises(ServerException):
+            await self.derivatives.create(f'{IMAGES_URL}/missing.png')
+
+    async def test_downloads_are_restricted_and_capped(self):
+        for url in ('http://127.0.0.1:8000/villa.jpg', 'http://169.254.169.254/latest/meta-data/'):
+            with self.subTest(url=url), self.assertRaises(ServerException):
+                await self.derivatives.create(url)
+        self.assertEqual(self.downloads, [])
+
+        self.derivatives.max_bytes = len(self.images['/villa.jpg']) - 1
+        with self.assertRaises(ServerException):
+            await self.derivatives.create(f'{IMAGES_URL}/villa.jpg')
+
+    async def test_oversized_image_fails_the_job(self):
+        self.derivatives.max_bytes = 1024
+        datasource = PostLocalDataSourceImpl(db=self.db)
+        post = await datasource.create_post(Post(
+            userId=self.user_id, image=f'{IMAGES_URL}/villa.jpg', title='Villa', content='', tags=[]))
+
+        await self._run_jobs()
+        job = await self.db.scalar(select(JobModel))
+        self.assertEqual((job.status, job.error), (JOB_DEAD, 'Image is too large'))
+        self.assertIsNone((await datasource.view_post(post.id)).imageSrcset)
+        self.assertFalse(os.path.exists(self.media))
+
+    async def test_only_media_hosts_are_queued(self):
+        datasource = PostLocalDataSourceImpl(db=self.db)
+        await datasource.create_post(Post(
+            userId=self.user_id, image='https://images.example.com/villa.jpg', title='Villa', content='', tags=[]))
+        self.assertIsNone(await self.db.scalar(select(JobModel)))
+
+    async def test_post_variants_are_generated_in_background(self):
+        datasource = PostLocalDataSourceImpl(db=self.db)
+        post = await datasource.create_post(Post(
+            userId=self.user_id, image=f'{IMAGES_URL}/villa.jpg', title='Villa', content='', tags=[]))
+        self.assertIsNone(post.imageSrcset)
+        self.assertEqual(self.downloads, [])
+
+        await self._run_jobs()
+        post = await datasource.view_post(post.id)
+        self.assertEqual(post.imageSrcset.count('w, '), len(WIDTHS) - 1)
+        self.assertIn(post.imageSrcset.split(', ')[0].split(' ')[0].rsplit('/', 1)[-1], os.listdir(self.media))
+
+        updated = await datasource.update_post(Post(
+            userId=self.user_id, image=f'{IMAGES_URL}/facade.png', title='Villa', content='', tags=[]),
+            post.id)
+        self.assertIsNone(updated.imageSrcset)
+        await datasource.update_post(Post(
+            userId=self.user_id, image=f'{IMAGES_URL}/villa.jpg', title='Villa', content='', tags=[]),
+            post.id)
+        await self._run_jobs()
+
+        jobs = (await self.db.scalars(select(JobModel).order_by(JobModel.run_at))).all()
+        self.assertEqual([job.status for job in jobs], [JOB_SUCCEEDED] * 3)
+        post = await datasource.view_post(post.id)
+        self.assertEqual(post.imageSrcset, srcset(jobs[-1].result))
+
+    async def test_team_variants_are_generated_in_background(self):
+        datasource = TeamLocalDataSourceImpl(db=self.db)
+        datasource.ai_generation.clients = self.clients
+        team = await datasource.create_team(
+            Team(title='Team', description='', image=f'{IMAGES_URL}/facade.png', user_ids=[]),
+            self.user_id, [])
+        self.assertIsNone(team.image_srcset)
+
+        await self._run_jobs()
+        team = await datasource.view_team(team.id)
+        self.assertEqual(team.image_srcset, srcset((await self.db.scalar(select(JobModel))).result))
+        self.assertEqual(len(team.image_srcset.split(', ')), len(WIDTHS))
+
+
+if __name__ == '__main__':
+    unittest.main()
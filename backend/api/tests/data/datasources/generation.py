@@ -0,0 +1,138 @@
+import asyncio
+import base64
+import os
+import tempfile
+import time
+import unittest
+
+import uvicorn
+from app.data.datasources.remote.ai import AiClients, AiGeneration
+from app.data.datasources.remote.ai_cache import MemoryResultCache
+from app.data.datasources.remote.generation import generate, generation_timings, model_handlers
+from app.data.datasources.remote.image_index import MemoryImageIndex
+from app.data.datasources.remote.storage import LocalStorage
+from app.domain.entities.message import message_models
+from benchmarks.ai_stub import PNG, create_app
+from core.errors.exceptions import CacheException
+
+MEDIA_URL = 'https://media.example.com'
+UPLOAD_LATENCY = 0.2
+
+
+class SlowStorage(LocalStorage):
+
+    async def save(self, file, name):
+        await asyncio.sleep(UPLOAD_LATENCY)
+        return await super().save(file, name)
+
+
+class TestModelHandlers(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        os.environ.setdefault('OPENAI_API_KEY', 'stub')
+        self.stub = create_app(latency=0.2)
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.stub, host='127.0.0.1', port=0, log_level='warning'))
+        self.serve = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{port}'
+
+        self.clients = AiClients(
+            openai_base_url=f'{self.base_url}/v1',
+            replicate_base_url=self.base_url,
+            astica_url=f'{self.base_url}/describe',
+            media_hosts={'127.0.0.1'}
+        )
+        self.media = tempfile.TemporaryDirectory()
+        self.storage = SlowStorage(self.media.name, MEDIA_URL)
+        self.ai_generation = AiGeneration(storage=self.storage, clients=self.clients, cache=MemoryResultCache(),
+                                          index=MemoryImageIndex())
+        self.image = base64.b64encode(PNG).decode()
+        generation_timings.clear()
+
+    async def asyncTearDown(self) -> None:
+        await self.clients.close()
+        self.server.should_exit = True
+        await self.serve
+        self.media.cleanup()
+
+    def _payload(self, handler):
+        return {name: 'villa' if name == 'prompt' else self.image for name in handler.inputs}
+
+    async def test_registry_covers_every_model(self):
+        self.assertEqual(set(model_handlers), set(message_models))
+        with self.assertRaises(CacheException):
+            await generate(self.ai_generation, 'unknown', {'prompt': 'villa'}, self.base_url)
+
+    async def test_every_handler(self):
+        for name, handler in model_handlers.items():
+            with self.subTest(model=name):
+                generation = await generate(self.ai_generation, name, self._payload(handler), self.base_url)
+                output = getattr(generation, handler.output)
+                self.assertTrue(output)
+                self.assertEqual(bool(generation.user_image), handler.upload_user_image)
+                if handler.upload_user_image:
+                    self.assertTrue(generation.user_image.startswith(f'{MEDIA_URL}/'))
+
+    async def test_image_urls_are_sent_as_base64(self):
+        image_url = f'{self.base_url}/files/image.png'
+        for name in ('image_to_image', 'controlNet', 'painting', 'instruction'):
+            with self.subTest(model=name):
+                generation = await generate(self.ai_generation, name, {'prompt': 'villa', 'image': image_url},
+                                            self.base_url)
+                self.assertEqual(generation.user_image, image_url)
+                self.assertEqual(self.stub.state.image_inputs[-1], self.image)
+
+        with self.assertRaises(CacheException):
+            await generate(self.ai_generation, 'image_to_image',
+                           {'prompt': 'villa', 'image': 'https://images.example.com/villa.png'}, self.base_url)
+
+    async def test_user_image_uploads_during_generation(self):
+        start = time.perf_counter()
+        generation = await generate(self.ai_generation, 'image_to_image',
+                                    {'prompt': 'villa', 'image': self.image}, self.base_url)
+        elapsed = time.perf_counter() - start
+
+        serial = self.stub.state.latency + 2 * UPLOAD_LATENCY
+        self.assertNotEqual(generation.image, generation.user_image)
+        self.assertLess(elapsed, serial - UPLOAD_LATENCY / 2)
+
+        timings = generation.timings
+        self.assertGreaterEqual(timings['generation'], self.stub.state.latency + UPLOAD_LATENCY)
+        self.assertGreaterEqual(timings['upload'], UPLOAD_LATENCY)
+        self.assertLess(timings['total'], timings['generation'] + timings['upload'])
+        stats, = generation_timings.stats()
+        self.assertEqual((stats['model'], stats['count']), ('image_to_image', 1))
+        self.assertAlmostEqual(stats['saved_ms'], UPLOAD_LATENCY * 1000, delta=UPLOAD_LATENCY * 250)
+
+    async def test_failed_generation_cancels_upload(self):
+        self.stub.state.latency = 0
+        with self.assertRaises(CacheException) as error:
+            await generate(self.ai_generation, 'image_to_image',
+                           {'prompt': 'villa', 'image': self.image}, f'{self.base_url}/missing')
+        self.assertEqual(str(error.exception), model_handlers['image_to_image'].error)
+        await asyncio.sleep(UPLOAD_LATENCY)
+        self.assertEqual(os.listdir(self.media.name), [])
+        self.assertEqual(generation_timings.stats(), [])
+
+        with self.assertRaises(CacheException) as error:
+            await generate(self.ai_generation, 'edit_image', {'prompt': 'villa', 'image': self.image}, self.base_url)
+        self.assertEqual(str(error.exception), "No mask found")
+
+    async def test_cancelled_request_cancels_generation_and_upload(self):
+        task = asyncio.create_task(generate(self.ai_generation, 'image_to_image',
+                                            {'prompt': 'villa', 'image': self.image}, self.base_url))
+        await asyncio.sleep(UPLOAD_LATENCY / 4)
+        start = time.perf_counter()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertLess(time.perf_counter() - start, UPLOAD_LATENCY / 2)
+        await asyncio.sleep(UPLOAD_LATENCY)
+        self.assertEqual(os.listdir(self.media.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
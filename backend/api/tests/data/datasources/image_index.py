@@ -0,0 +1,99 @@
+import io
+import random
+import unittest
+
+from app.data.datasources.remote.image_index import (DatabaseImageIndex, MemoryImageIndex, content_hash,
+                                                     hamming_distance)
+from app.data.datasources.remote.images import dhash
+from PIL import Image, ImageOps
+from tests.database import AsyncDatabaseTestCase
+
+PHASH = 'a7e6b0b089d925a4'
+
+
+def source_image(seed: int, size=(1200, 800)) -> Image.Image:
+    generator = random.Random(seed)
+    pixels = bytes(generator.randrange(256) for _ in range(12 * 8 * 3))
+    return Image.frombytes('RGB', (12, 8), pixels).resize(size, Image.BICUBIC)
+
+
+def encode(image: Image.Image, format: str, **options) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format, **options)
+    return output.getvalue()
+
+
+def flip_bits(phash: str, count: int) -> str:
+    return f'{int(phash, 16) ^ ((1 << count) - 1) << 3:016x}'
+
+
+class ImageIndexTests:
+
+    def create_index(self):
+        raise NotImplementedError
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.index = self.create_index()
+
+    def test_dhash_matches_resized_and_reencoded_copies(self):
+        for seed in range(1, 4):
+            with self.subTest(seed=seed):
+                image = source_image(seed)
+                phash = dhash(encode(image, 'PNG'))
+                for copy in (encode(image.resize((600, 400)), 'JPEG', quality=60),
+                             encode(image.resize((300, 200)), 'WEBP'),
+                             encode(image.convert('P'), 'PNG')):
+                    self.assertLessEqual(hamming_distance(phash, dhash(copy)), 1)
+                for other in (ImageOps.mirror(image), source_image(seed + 10)):
+                    self.assertGreater(hamming_distance(phash, dhash(encode(other, 'PNG'))), 16)
+
+    async def test_exact_lookup(self):
+        sha256 = content_hash(b'image')
+        self.assertIsNone(await self.index.find(sha256))
+        await self.index.add(sha256, PHASH, 'https://media.example.com/a.png')
+        await self.index.add(sha256, PHASH, 'https://media.example.com/b.png')
+        self.assertEqual(await self.index.find(sha256), 'https://media.example.com/a.png')
+        self.assertIsNone(await self.index.find(content_hash(b'other')))
+
+    async def test_near_duplicates(self):
+        for name, phash in (('same', PHASH), ('near', flip_bits(PHASH, 2)), ('far', flip_bits(PHASH, 12))):
+            await self.index.add(content_hash(name.encode()), phash, f'https://media.example.com/{name}.png')
+
+        matches = await self.index.near_duplicates(PHASH)
+        self.assertEqual([(match.url.rsplit('/', 1)[1], match.distance) for match in matches],
+                         [('same.png', 0), ('near.png', 2)])
+        self.assertEqual(len(await self.index.near_duplicates(PHASH, 0)), 1)
+        with self.assertRaises(ValueError):
+            await self.index.near_duplicates(PHASH, 4)
+
+
+class TestMemoryImageIndex(ImageIndexTests, unittest.IsolatedAsyncioTestCase):
+
+    def create_index(self):
+        return MemoryImageIndex(max_entries=3)
+
+    async def test_lru_eviction(self):
+        for name in 'abc':
+            await self.index.add(name, PHASH, name)
+        await self.index.find('a')
+        await self.index.add('d', PHASH, 'd')
+        self.assertIsNone(await self.index.find('b'))
+        self.assertEqual(await self.index.find('a'), 'a')
+
+
+class TestDatabaseImageIndex(ImageIndexTests, AsyncDatabaseTestCase):
+
+    database_file = True
+
+    def create_index(self):
+        return DatabaseImageIndex(self.session_factory)
+
+    async def test_near_duplicates_only_load_matching_bands(self):
+        await self.index.add('near', flip_bits(PHASH, 3), 'near')
+        await self.index.add('unrelated', f'{int(PHASH, 16) ^ 0x1111111111111111:016x}', 'unrelated')
+        self.assertEqual([row[0] for row in await self.index.candidates(PHASH)], ['near'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import base64
+import io
+import unittest
+
+from app.data.datasources.remote.images import OPAQUE, ImagePool, fit_size, prepare_png
+from PIL import Image
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format)
+    return output.getvalue()
+
+
+class TestPreparePng(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.pool = ImagePool(workers=1)
+
+    async def asyncTearDown(self) -> None:
+        self.pool.close()
+
+    def test_fit_size(self):
+        self.assertEqual(fit_size((3840, 2160), (512, 512)), (512, 288))
+        self.assertEqual(fit_size((100, 400), (512, 512)), (128, 512))
+        self.assertEqual(fit_size((5000, 1), (512, 512)), (512, 1))
+
+    def test_preserves_aspect_ratio_with_padding(self):
+        source = Image.new('RGB', (3840, 2160), (200, 120, 40))
+        for format in ('PNG', 'JPEG'):
+            with self.subTest(format=format), Image.open(prepare_png(encode(source, format))) as prepared:
+                self.assertEqual((prepared.format, prepared.mode, prepared.size), ('PNG', 'RGBA', (512, 512)))
+                self.assertEqual(prepared.getpixel((0, 0))[3], 0)
+                self.assertEqual(prepared.getpixel((0, 111))[3], 0)
+                self.assertEqual(prepared.getpixel((256, 256))[3], 255)
+                self.assertEqual(prepared.getbbox(), (0, 112, 512, 400))
+
+    def test_mask_padding_is_opaque(self):
+        mask = Image.new('RGBA', (200, 100), (0, 0, 0, 0))
+        with Image.open(prepare_png(encode(mask, 'PNG'), (64, 64), OPAQUE)) as prepared:
+            self.assertEqual(prepared.getpixel((0, 0)), OPAQUE)
+            self.assertEqual(prepared.getpixel((0, 63)), OPAQUE)
+            self.assertEqual(prepared.getpixel((32, 32))[3], 0)
+
+    def test_accepts_base64_and_palette_images(self):
+        source = Image.new('P', (64, 32))
+        prepared = prepare_png(base64.b64encode(encode(source, 'PNG')).decode(), (16, 16))
+        with Image.open(prepared) as image:
+            self.assertEqual(image.size, (16, 16))
+
+    async def test_pool_matches_inline(self):
+        data = encode(Image.new('RGB', (1024, 768), (10, 20, 30)), 'JPEG')
+        prepared = await self.pool.prepare_png(data)
+        self.assertEqual(prepared.getvalue(), prepare_png(data).getvalue())
+        self.assertEqual(prepared.tell(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.data.datasources.local.job import JobLocalDataSourceImpl
+from app.data.jobs import JobWorker
+from app.data.models.chat import ChatModel
+from app.data.models.job import JOB_DEAD, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobModel
+from app.data.models.user import UserModel
+from app.domain.entities.message import Message
+from core.errors.exceptions import CacheException
+from sqlalchemy import delete, update
+from tests.database import AsyncDatabaseTestCase
+
+
+class TestJobs(AsyncDatabaseTestCase):
+
+    database_file = True
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = JobLocalDataSourceImpl(db=self.db)
+
+        self.user_id = str(uuid4())
+        self.chat_id = str(uuid4())
+        self.db.add(UserModel(id=self.user_id, first_name="First", last_name="Last",
+                              email="user@example.com", password="password"))
+        self.db.add(ChatModel(id=self.chat_id, user_id=self.user_id, title="Chat", messages=[]))
+        await self.db.commit()
+
+        self.calls = []
+        self.failures = 0
+        self.worker = JobWorker(
+            session_factory=self.session_factory,
+            handlers={'chat': self._handle, 'message': self._handle},
+            workers=2,
+            poll_interval=0.05,
+            retry_delay=0
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.worker.stop()
+        await super().asyncTearDown()
+
+    async def _handle(self, db, job):
+        self.calls.append(job.id)
+        if self.failures:
+            self.failures -= 1
+            raise CacheException("Provider unavailable")
+        await asyncio.sleep(0.01)
+        return {'prompt': job.payload['payload']['prompt']}
+
+    async def _submit(self, chat_id=None):
+        message = Message(user_id=self.user_id, payload={'prompt': 'villa'}, model='text_to_3D')
+        return await self.datasource.submit_job(message, self.user_id, chat_id)
+
+    async def test_submit_returns_queued_job(self):
+        job = await self._submit(self.chat_id)
+        self.assertEqual((job.kind, job.status, job.attempts), ('message', JOB_QUEUED, 0))
+        self.assertEqual(job.chat_id, self.chat_id)
+        self.assertEqual(self.calls, [])
+
+    async def test_payload_belongs_to_job_owner(self):
+        message = Message(user_id=str(uuid4()), payload={'prompt': 'villa'}, model='text_to_3D')
+        job = await self.datasource.submit_job(message, self.user_id)
+        row = await self.db.get(JobModel, job.id)
+        self.assertEqual((row.user_id, row.payload['user_id']), (self.user_id, self.user_id))
+
+    async def test_run_job(self):
+        job = await self._submit()
+        self.assertTrue(await self.worker.run_once())
+        self.assertFalse(await self.worker.run_once())
+
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual((job.kind, job.status, job.attempts), ('chat', JOB_SUCCEEDED, 1))
+        self.assertEqual(job.result, {'prompt': 'villa'})
+        self.assertEqual(self.calls, [job.id])
+
+    async def test_retry_then_dead_letter(self):
+        job = await self._submit()
+        self.failures = 5
+
+        for _ in range(3):
+            self.assertTrue(await self.worker.run_once())
+        self.assertFalse(await self.worker.run_once())
+
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual((job.status, job.attempts), (JOB_DEAD, 3))
+        self.assertEqual(job.error, "Provider unavailable")
+
+        self.failures = 0
+        job = await self.datasource.retry_job(job.id, self.user_id)
+        self.assertEqual((job.status, job.attempts), (JOB_QUEUED, 0))
+        self.assertTrue(await self.worker.run_once())
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual(job.status, JOB_SUCCEEDED)
+
+    async def test_retry_waits_for_backoff(self):
+        self.worker.retry_delay = 60
+        job = await self._submit()
+        self.failures = 1
+
+        self.assertTrue(await self.worker.run_once())
+        self.assertFalse(await self.worker.run_once())
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual((job.status, job.attempts), (JOB_QUEUED, 1))
+
+    async def test_recover_requeues_expired_leases(self):
+        job = await self._submit()
+        await self.db.execute(update(JobModel).where(JobModel.id == job.id).values(
+            status=JOB_RUNNING, attempts=1, locked_until=datetime.utcnow() + timedelta(minutes=1)))
+        await self.db.commit()
+
+        self.assertEqual(await self.worker.recover(), 0)
+        self.assertFalse(await self.worker.run_once())
+
+        await self.db.execute(update(JobModel).where(JobModel.id == job.id).values(
+            locked_until=datetime.utcnow() - timedelta(seconds=1)))
+        await self.db.commit()
+        self.assertEqual(await self.worker.recover(), 1)
+        self.assertTrue(await self.worker.run_once())
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual((job.status, job.attempts), (JOB_SUCCEEDED, 2))
+
+    async def test_expired_lease_is_reclaimed_without_restart(self):
+        job = await self._submit()
+        await self.db.execute(update(JobModel).where(JobModel.id == job.id).values(
+            status=JOB_RUNNING, attempts=1, locked_until=datetime.utcnow() - timedelta(seconds=1)))
+        await self.db.commit()
+
+        self.assertTrue(await self.worker.run_once())
+        job = await self.datasource.view_job(job.id, self.user_id)
+        self.assertEqual((job.status, job.attempts), (JOB_SUCCEEDED, 2))
+
+    async def test_running_job_keeps_its_lease(self):
+        self.worker.lease = 0.15
+        leases = []
+
+        async def handle(db, job):
+            for _ in range(4):
+                await asyncio.sleep(0.1)
+                leases.append(await other.run_once())
+            return {}
+
+        other = JobWorker(session_factory=self.session_factory, handlers={'chat': handle}, workers=1)
+        self.worker.handlers = {'chat': handle}
+        job = await self._submit()
+        self.assertTrue(await self.worker.run_once())
+
+        self.assertEqual(leases, [False] * 4)
+        row = await self.db.get(JobModel, job.id)
+        self.assertEqual((row.status, row.attempts, row.locked_until), (JOB_SUCCEEDED, 1, None))
+
+    async def test_workers_pick_up_submitted_jobs(self):
+        await self.worker.start()
+        jobs = [await self._submit() for _ in range(5)]
+        for job in jobs:
+            job = await self.datasource.view_job(job.id, self.user_id, wait=5)
+            self.assertEqual(job.status, JOB_SUCCEEDED)
+        self.assertEqual(sorted(self.calls), sorted(job.id for job in jobs))
+
+    async def test_workers_survive_database_errors(self):
+        claim = self.worker._claim
+        failures = []
+
+        async def flaky_claim():
+            if not failures:
+                failures.append(True)
+                raise OSError("database unavailable")
+            return await claim()
+
+        self.worker._claim = flaky_claim
+        with self.assertLogs('app.data.jobs', 'ERROR'):
+            await self.worker.start()
+            job = await self._submit()
+            job = await self.datasource.view_job(job.id, self.user_id, wait=5)
+        self.assertEqual(job.status, JOB_SUCCEEDED)
+
+    async def test_deleted_job_is_skipped(self):
+        job = await self._submit()
+        await self.db.execute(delete(JobModel).where(JobModel.id == job.id))
+        await self.db.commit()
+        await self.worker._execute(job.id)
+        self.assertEqual(self.calls, [])
+
+    async def test_submit_validation(self):
+        with self.assertRaises(CacheException):
+            await self.datasource.submit_job(
+                Message(user_id=self.user_id, payload={}, model='text_to_3D'), self.user_id)
+        with self.assertRaises(CacheException):
+            await self.datasource.submit_job(
+                Message(user_id=self.user_id, payload={'prompt': 'villa'}, model='unknown'), self.user_id)
+        with self.assertRaises(CacheException):
+            await self._submit(str(uuid4()))
+
+        job = await self._submit()
+        with self.assertRaises(CacheException):
+            await self.datasource.view_job(job.id, str(uuid4()))
+        with self.assertRaises(CacheException):
+            await self.datasource.retry_job(job.id, self.user_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
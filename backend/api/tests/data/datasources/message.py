@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import time
+import unittest
+from uuid import uuid4
+
+import uvicorn
+from app.data.datasources.local.message import MessageLocalDataSourceImpl
+from app.data.datasources.remote.ai import AiClients, AiGeneration, providers
+from app.data.datasources.remote.ai_cache import MemoryResultCache
+from app.data.datasources.remote.image_index import MemoryImageIndex
+from app.data.models.chat import ChatMessageModel, ChatModel
+from app.data.models.user import UserModel
+from app.data.realtime import TeamChatHub
+from app.data.realtime.pubsub import MemoryPubSub
+from app.domain.entities.message import Message
+from benchmarks.ai_stub import STREAM_TOKENS, create_app
+from core.errors.exceptions import CacheException
+from sqlalchemy import func, select
+from tests.database import AsyncDatabaseTestCase
+
+
+class TestStreamChat(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        os.environ.setdefault('OPENAI_API_KEY', 'stub')
+        self.stub = create_app(token_latency=0.05)
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.stub, host='127.0.0.1', port=0, log_level='warning'))
+        self.serve = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.clients = AiClients(openai_base_url=f'http://127.0.0.1:{port}/v1')
+        self.cache = MemoryResultCache()
+
+        await super().asyncSetUp()
+        self.hub = TeamChatHub(MemoryPubSub())
+        self.datasource = MessageLocalDataSourceImpl(
+            db=self.db, ai_generation=AiGeneration(
+                clients=self.clients, cache=self.cache, index=MemoryImageIndex()), hub=self.hub)
+
+        self.user_id = str(uuid4())
+        self.chat_id = str(uuid4())
+        self.db.add(UserModel(id=self.user_id, first_name="First", last_name="Last",
+                              email="user@example.com", password="password"))
+        self.db.add(ChatModel(id=self.chat_id, user_id=self.user_id, title="Chat"))
+        await self.db.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.clients.close()
+        await self.hub.close()
+        self.server.should_exit = True
+        await self.serve
+        await super().asyncTearDown()
+
+    def _message(self, model='chatbot', prompt='Describe a modern villa', isTeam=False):
+        return Message(user_id=self.user_id, payload={'prompt': prompt}, model=model, isTeam=isTeam)
+
+    async def _collect(self, message=None):
+        events = await self.datasource.stream_chat(message or self._message(), self.chat_id, self.user_id)
+        start = time.perf_counter()
+        first_token = None
+        collected = []
+        async for event, data in events:
+            if event == 'token' and first_token is None:
+                first_token = time.perf_counter() - start
+            collected.append((event, data))
+        return collected, first_token, time.perf_counter() - start
+
+    async def _message_count(self):
+        return await self.db.scalar(select(func.count()).select_from(ChatMessageModel))
+
+    async def test_tokens_arrive_before_completion(self):
+        events, first_token, total = await self._collect()
+
+        tokens = [data for event, data in events if event == 'token']
+        self.assertEqual(tokens, STREAM_TOKENS)
+        self.assertLess(first_token, total / 3)
+
+        event, message = events[-1]
+        self.assertEqual(event, 'message')
+        self.assertEqual((message['sender'], message['seq'], message['content']['chat']),
+                         ('ai', 2, ''.join(STREAM_TOKENS)))
+
+        rows = (await self.db.execute(select(ChatMessageModel.seq, ChatMessageModel.sender)
+                                      .order_by(ChatMessageModel.seq))).all()
+        self.assertEqual([tuple(row) for row in rows], [(1, 'user'), (2, 'ai')])
+        chat = await self.db.scalar(select(ChatModel).where(ChatModel.id == self.chat_id)
+                                    .execution_options(populate_existing=True))
+        self.assertEqual((chat.message_count, chat.last_message), (2, ''.join(STREAM_TOKENS)))
+
+    async def test_cached_answer_is_replayed(self):
+        await self._collect()
+        events, _, _ = await self._collect()
+        self.assertEqual(events[0], ('token', ''.join(STREAM_TOKENS)))
+        self.assertEqual(self.stub.state.calls, 1)
+        self.assertEqual(await self._message_count(), 4)
+
+    async def test_interrupted_stream_is_not_persisted(self):
+        self.stub.state.stream_fail_after = 2
+        events, _, _ = await self._collect()
+        self.assertEqual(events, [('token', token) for token in STREAM_TOKENS[:2]] +
+                         [('error', 'Chatbot error')])
+        self.assertEqual(await self._message_count(), 0)
+        self.assertEqual(self.cache.size(), 0)
+
+    async def test_provider_timeout_is_reported(self):
+        timeout = providers['openai'].timeout
+        providers['openai'].timeout = 0.12
+        events = []
+        try:
+            async for event in await self.datasource.stream_chat(self._message(), self.chat_id, self.user_id):
+                events.append(event)
+                await asyncio.sleep(0.05)
+        finally:
+            providers['openai'].timeout = timeout
+        self.assertEqual(events[-1], ('error', 'Chatbot error'))
+        self.assertLess(len(events), len(STREAM_TOKENS))
+        self.assertEqual(await self._message_count(), 0)
+
+    async def test_slow_consumer_releases_provider_slot(self):
+        self.clients.semaphores['openai'] = semaphore = asyncio.Semaphore(1)
+        events = await self.datasource.stream_chat(self._message(), self.chat_id, self.user_id)
+        self.assertEqual(await anext(events), ('token', STREAM_TOKENS[0]))
+        self.assertTrue(semaphore.locked())
+
+        await asyncio.sleep(0.05 * len(STREAM_TOKENS) + 0.2)
+        self.assertFalse(semaphore.locked())
+        remaining = [data async for event, data in events if event == 'token']
+        self.assertEqual(remaining, STREAM_TOKENS[1:])
+
+    async def test_team_messages_are_broadcast(self):
+        subscriber = await self.hub.join(self.chat_id)
+        created = await self.datasource.create_chat(self._message(isTeam=True), self.chat_id, self.user_id)
+        events, _, _ = await self._collect(self._message(prompt='Describe a cabin', isTeam=True))
+        await self.datasource.create_chat(self._message(), self.chat_id, self.user_id)
+
+        received = [json.loads(await asyncio.wait_for(subscriber.queue.get(), 1))['message'] for _ in range(4)]
+        self.assertEqual([(message['seq'], message['sender']) for message in received],
+                         [(1, 'user'), (2, 'ai'), (3, 'user'), (4, 'ai')])
+        self.assertEqual((received[1], received[3]), (created.to_dict(), events[-1][1]))
+        await asyncio.sleep(0.05)
+        self.assertTrue(subscriber.queue.empty())
+
+    async def test_invalid_requests_fail_before_streaming(self):
+        with self.assertRaises(CacheException):
+            await self.datasource.stream_chat(self._message(model='text_to_image'), self.chat_id, self.user_id)
+        with self.assertRaises(CacheException):
+            await self.datasource.stream_chat(self._message(), str(uuid4()), self.user_id)
+        self.assertEqual(self.stub.state.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.data.counters import reconcile_post_counters
+from app.data.datasources.local.post import PostLocalDataSourceImpl
+from app.data.migrations import post_tags, search, unique_reactions
+from app.data.models.post import LikeModel, CloneModel, PostModel, PostTagModel
+from app.data.models.user import UserModel
+from app.domain.entities.post import Post
+from core.common.cursor import encode_cursor
+from core.errors.exceptions import CacheException
+from sqlalchemy import delete, event, func, select, text
+from sqlalchemy.exc import IntegrityError
+from tests.database import AsyncDatabaseTestCase
+
+
+class TestPostLocalDataSource(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = PostLocalDataSourceImpl(db=self.db)
+        self.queries = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._count_query)
+
+        self.viewer = self._add_user("viewer@example.com", "Viewer")
+        self.authors = [self._add_user(f"author{i}@example.com", f"Author{i}") for i in range(5)]
+        start = datetime(2023, 1, 1)
+        self.posts = []
+        for i in range(30):
+            tags = ["exterior"] if i % 2 == 0 else ["interior", "lighting"]
+            post = PostModel(
+                id=str(uuid4()),
+                title=f"Modern villa {i}" if i % 5 == 0 else f"Post {i}",
+                content="content",
+                image="image",
+                user_id=self.authors[i % len(self.authors)].id,
+                tags=tags,
+                post_tags=[PostTagModel(tag=tag) for tag in tags],
+                date=start + timedelta(minutes=i)
+            )
+            self.db.add(post)
+            self.posts.append(post)
+        await self.db.flush()
+        for i, post in enumerate(self.posts):
+            for author in self.authors[:i % 4]:
+                self.db.add(LikeModel(id=str(uuid4()), user_id=author.id, post_id=post.id))
+            if i % 3 == 0:
+                self.db.add(LikeModel(id=str(uuid4()), user_id=self.viewer.id, post_id=post.id))
+                self.db.add(CloneModel(id=str(uuid4()), user_id=self.viewer.id, post_id=post.id))
+        await self.db.commit()
+        await self.db.run_sync(reconcile_post_counters)
+        await self.db.run_sync(search.upgrade)
+        await self.db.scalars(select(PostModel).execution_options(populate_existing=True))
+
+    def _count_query(self, *args, **kwargs):
+        self.queries += 1
+
+    def _add_user(self, email, first_name):
+        user = UserModel(
+            id=str(uuid4()),
+            first_name=first_name,
+            last_name="Last",
+            email=email,
+            password="password"
+        )
+        self.db.add(user)
+        return user
+
+    async def _count(self, model, **filters):
+        return await self.db.scalar(
+            select(func.count()).select_from(model).filter_by(**filters))
+
+    async def _page_cost(self, limit):
+        viewer_id = self.viewer.id
+        self.db.expunge_all()
+        self.queries = 0
+        posts = await self.datasource.all_posts([], "", 0, limit, viewer_id)
+        self.assertEqual(len(posts), limit)
+        return self.queries
+
+    async def test_all_posts_query_count_is_flat(self):
+        small = await self._page_cost(5)
+        large = await self._page_cost(25)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 4)
+
+    async def test_all_posts_hydrates_counts_and_flags(self):
+        posts = await self.datasource.all_posts([], "", 0, 30, self.viewer.id)
+        by_id = {post.id: post for post in posts}
+        for i, post in enumerate(self.posts):
+            entity = by_id[post.id]
+            viewer_action = i % 3 == 0
+            self.assertEqual(entity.like, i % 4 + int(viewer_action))
+            self.assertEqual(entity.clone, int(viewer_action))
+            self.assertEqual(entity.isLiked, viewer_action)
+            self.assertEqual(entity.isCloned, viewer_action)
+            self.assertEqual(entity.userId, post.user_id)
+
+    async def test_all_posts_filters_tags_before_paginating(self):
+        first = await self.datasource.all_posts(["lighting"], "", 0, 10, self.viewer.id)
+        second = await self.datasource.all_posts(["lighting"], "", 10, 10, self.viewer.id)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(len(second), 5)
+        self.assertTrue(all("lighting" in post.tags for post in first + second))
+        self.assertFalse({post.id for post in first} & {post.id for post in second})
+
+    async def test_all_posts_cursor_pagination(self):
+        seen = []
+        cursor = None
+        while True:
+            page = await self.datasource.all_posts([], "", 0, 7, self.viewer.id, cursor)
+            seen.extend(post.id for post in page)
+            if len(page) < 7:
+                break
+            cursor = encode_cursor(page[-1].date, page[-1].id)
+            self.db.add(PostModel(
+                id=str(uuid4()),
+                title="Newer post",
+                user_id=self.authors[0].id,
+                tags=[],
+                date=datetime(2024, 1, 1)
+            ))
+            await self.db.commit()
+
+        expected = [post.id for post in sorted(self.posts, key=lambda post: post.date, reverse=True)]
+        self.assertEqual(seen, expected)
+
+    async def test_view_posts_cursor_pagination(self):
+        author = self.authors[0]
+        first = await self.datasource.view_posts(author.id, None, 4)
+        cursor = encode_cursor(first[-1].date, first[-1].id)
+        second = await self.datasource.view_posts(author.id, cursor, 4)
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(second), 2)
+        self.assertTrue(first[-1].date > second[0].date)
+
+    async def test_invalid_cursor(self):
+        with self.assertRaises(CacheException):
+            await self.datasource.all_posts([], "", 0, 7, self.viewer.id, "not-a-cursor")
+
+    async def test_all_posts_search_title(self):
+        posts = await self.datasource.all_posts([], "villa", 0, 30, self.viewer.id)
+        self.assertEqual(sorted(post.title for post in posts),
+                         sorted(post.title for post in self.posts if "villa" in post.title))
+
+    async def test_all_posts_search_author(self):
+        author = self.authors[2]
+        posts = await self.datasource.all_posts([], "Author2", 0, 30, self.viewer.id)
+        self.assertEqual(len(posts), 6)
+        self.assertTrue(all(post.userId == author.id for post in posts))
+
+    async def test_all_posts_search_ranks_best_match_first(self):
+        await self.datasource.create_post(Post(
+            userId=self.authors[1].id,
+            image="image",
+            title="Villa villa villa",
+            content="villa",
+            tags=["exterior"]
+        ))
+        posts = await self.datasource.all_posts(["exterior"], "villa", 0, 3, self.viewer.id)
+        self.assertEqual(posts[0].title, "Villa villa villa")
+
+    async def test_like_and_clone_counters(self):
+        post = self.posts[1]
+        author = self.authors[3]
+
+        liked = await self.datasource.like_post(post.id, author.id)
+        cloned = await self.datasource.clone_post(post.id, author.id)
+        self.assertEqual((liked.like, liked.isLiked), (2, True))
+        self.assertEqual((cloned.clone, cloned.isCloned), (1, True))
+
+        unliked = await self.datasource.unlike_post(post.id, author.id)
+        uncloned = await self.datasource.unclone_post(post.id, author.id)
+        self.assertEqual((unliked.like, unliked.isLiked), (1, False))
+        self.assertEqual((uncloned.clone, uncloned.isCloned), (0, False))
+
+    async def test_like_and_clone_are_idempotent(self):
+        post = self.posts[1]
+        author = self.authors[3]
+
+        await self.datasource.like_post(post.id, author.id)
+        liked = await self.datasource.like_post(post.id, author.id)
+        await self.datasource.clone_post(post.id, author.id)
+        cloned = await self.datasource.clone_post(post.id, author.id)
+        self.assertEqual((liked.like, cloned.clone), (2, 1))
+        self.assertEqual(await self._count(LikeModel, post_id=post.id), 2)
+
+        await self.datasource.unlike_post(post.id, author.id)
+        unliked = await self.datasource.unlike_post(post.id, author.id)
+        self.assertEqual((unliked.like, unliked.isLiked), (1, False))
+
+        with self.assertRaises(CacheException):
+            await self.datasource.like_post(str(uuid4()), author.id)
+
+    async def test_unique_reactions_migration(self):
+        await self.db.execute(text("DROP INDEX uq_likes_post_id_user_id"))
+        post = self.posts[0]
+        self.db.add(LikeModel(id=str(uuid4()), user_id=self.viewer.id, post_id=post.id))
+        await self.db.commit()
+
+        await self.db.run_sync(unique_reactions.upgrade)
+
+        self.assertEqual(await self._count(
+            LikeModel, post_id=post.id, user_id=self.viewer.id), 1)
+        await self.db.refresh(post)
+        self.assertEqual(post.like_count, 1)
+        with self.assertRaises(IntegrityError):
+            self.db.add(LikeModel(id=str(uuid4()), user_id=self.viewer.id, post_id=post.id))
+            await self.db.commit()
+
+    async def test_reconcile_post_counters(self):
+        post = self.posts[3]
+        post.like_count = 99
+        post.clone_count = 0
+        await self.db.commit()
+
+        self.assertEqual(await self.db.run_sync(reconcile_post_counters), 1)
+        self.assertEqual(await self.db.run_sync(reconcile_post_counters), 0)
+        await self.db.refresh(post)
+        self.assertEqual((post.like_count, post.clone_count), (4, 1))
+
+    async def test_post_tags_backfill(self):
+        await self.db.execute(delete(PostTagModel))
+        await self.db.commit()
+
+        await self.db.run_sync(post_tags.upgrade)
+        await self.db.run_sync(post_tags.upgrade)
+
+        self.assertEqual(await self._count(PostTagModel), 45)
+        posts = await self.datasource.all_posts(["exterior"], "", 0, 30, self.viewer.id)
+        self.assertEqual(len(posts), 15)
+
+    async def test_tags_are_normalized(self):
+        tags = ["Exterior", " exterior ", "EXTERIOR", "x" * 100, "X" * 80, "  "]
+        post = await self.datasource.create_post(Post.construct(
+            userId=self.authors[0].id, image="image", title="Tags", content="", tags=tags))
+        self.assertEqual(post.tags, ["exterior", "x" * 64])
+
+        updated = await self.datasource.update_post(Post.construct(
+            userId=self.authors[0].id, image="image", title="Tags", content="", tags=["Lighting", "lighting "]),
+            post.id)
+        self.assertEqual(updated.tags, ["lighting"])
+        self.assertEqual(await self._count(PostTagModel, post_id=post.id), 1)
+        self.assertIn(post.id, [post.id for post in await self.datasource.all_posts(
+            [" LIGHTING"], "", 0, 50, self.viewer.id)])
+
+        legacy = PostModel(id=str(uuid4()), title="Legacy", user_id=self.authors[0].id, tags=tags)
+        self.db.add(legacy)
+        await self.db.commit()
+        await self.db.run_sync(post_tags.upgrade)
+        rows = await self.db.scalars(select(PostTagModel.tag).where(PostTagModel.post_id == legacy.id))
+        self.assertEqual(sorted(rows.all()), ["exterior", "x" * 64])
+
+    async def test_view_posts_returns_author_posts(self):
+        author = self.authors[0]
+        posts = await self.datasource.view_posts(author.id)
+        self.assertEqual(len(posts), 6)
+        self.assertTrue(all(post.userId == author.id for post in posts))
+
+    async def test_view_post(self):
+        post = self.posts[3]
+        entity = await self.datasource.view_post(post.id)
+        self.assertEqual(entity.id, post.id)
+        self.assertEqual(entity.like, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from uuid import uuid4
+
+from app.data.counters import reconcile_follow_counters
+from app.data.datasources.local.team import TeamLocalDataSourceImpl
+from app.data.migrations import unique_team_members
+from app.data.models.chat import ChatModel
+from app.data.models.team import SketchModel, TeamModel, UserTeamModel
+from app.data.models.user import UserModel, user_following
+from app.domain.entities.team import Team
+from core.errors.exceptions import CacheException
+from sqlalchemy import event, func, insert, select, text
+from tests.database import AsyncDatabaseTestCase
+
+
+class TestTeamMembership(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = TeamLocalDataSourceImpl(db=self.db)
+        self.queries = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._count_query)
+
+        self.creator_id = (await self._add_users(1))[0]
+        self.team = await self.datasource.create_team(
+            Team(title='Team', description='', image='', user_ids=[]), self.creator_id, [])
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    async def _add_users(self, count):
+        user_ids = [str(uuid4()) for _ in range(count)]
+        await self.db.execute(insert(UserModel), [
+            {'id': user_id, 'first_name': 'First', 'last_name': 'Last',
+             'email': f'{user_id}@example.com', 'password': 'password'}
+            for user_id in user_ids
+        ])
+        await self.db.commit()
+        return user_ids
+
+    async def _count(self, model, **filters):
+        return await self.db.scalar(select(func.count()).select_from(model).filter_by(**filters))
+
+    async def _queries(self, call):
+        self.queries = 0
+        result = await call
+        return result, self.queries
+
+    async def test_adding_members_costs_constant_queries(self):
+        few = await self._add_users(5)
+        many = await self._add_users(500)
+
+        _, few_queries = await self._queries(self.datasource.add_team_member(self.team.id, self.creator_id, few))
+        _, many_queries = await self._queries(self.datasource.add_team_member(self.team.id, self.creator_id, many))
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(await self._count(UserTeamModel, team_id=self.team.id), 506)
+
+        await self.datasource.add_team_member(self.team.id, self.creator_id, few + few + [self.creator_id])
+        self.assertEqual(await self._count(UserTeamModel, team_id=self.team.id), 506)
+
+    async def test_missing_users_are_rejected(self):
+        user_ids = await self._add_users(3)
+        with self.assertRaises(CacheException):
+            await self.datasource.add_team_member(self.team.id, self.creator_id, user_ids + [str(uuid4())])
+        self.assertEqual(await self._count(UserTeamModel, team_id=self.team.id), 1)
+
+        with self.assertRaises(CacheException):
+            await self.datasource.add_team_member(self.team.id, user_ids[0], user_ids)
+
+    async def test_create_team_with_members(self):
+        user_ids = await self._add_users(3)
+        with self.assertRaises(CacheException):
+            await self.datasource.create_team(
+                Team(title='Other', description='', image='', user_ids=[]), self.creator_id,
+                user_ids + [str(uuid4())])
+        self.assertEqual(await self._count(TeamModel), 1)
+        self.assertEqual(await self._count(ChatModel), 1)
+
+        team = await self.datasource.create_team(
+            Team(title='Other', description='', image='', user_ids=[]), self.creator_id,
+            user_ids + [self.creator_id])
+        self.assertEqual(await self._count(UserTeamModel, team_id=team.id), 4)
+
+    async def test_members_load_counts_in_bulk(self):
+        user_ids = await self._add_users(3)
+        await self.datasource.add_team_member(self.team.id, self.creator_id, user_ids[:1])
+        _, few_queries = await self._queries(self.datasource.team_members(self.team.id))
+
+        await self.datasource.add_team_member(self.team.id, self.creator_id, user_ids)
+        await self.db.execute(insert(user_following), [
+            {'follower_id': user_ids[0], 'following_id': self.creator_id},
+            {'follower_id': user_ids[1], 'following_id': self.creator_id},
+            {'follower_id': self.creator_id, 'following_id': user_ids[2]},
+        ])
+        await self.db.commit()
+        await self.db.run_sync(reconcile_follow_counters)
+
+        members, many_queries = await self._queries(self.datasource.team_members(self.team.id))
+        self.assertEqual(few_queries, many_queries)
+        counts = {member.id: (member.followers, member.following) for member in members}
+        self.assertEqual(counts, {self.creator_id: (2, 1), user_ids[0]: (0, 1),
+                                  user_ids[1]: (0, 1), user_ids[2]: (1, 0)})
+
+    async def test_delete_team_uses_bulk_deletes(self):
+        await self.datasource.add_team_member(self.team.id, self.creator_id, await self._add_users(50))
+        self.db.add_all([SketchModel(id=str(uuid4()), name=f'Sketch {i}', team_id=self.team.id) for i in range(20)])
+        await self.db.commit()
+
+        deleted, queries = await self._queries(self.datasource.delete_team(self.team.id))
+        self.assertEqual(deleted.id, self.team.id)
+        self.assertLessEqual(queries, 5)
+        for model, filters in ((UserTeamModel, {'team_id': self.team.id}), (SketchModel, {'team_id': self.team.id}),
+                               (TeamModel, {'id': self.team.id})):
+            self.assertEqual(await self._count(model, **filters), 0)
+
+    async def test_leave_team(self):
+        user_ids = await self._add_users(2)
+        await self.datasource.add_team_member(self.team.id, self.creator_id, user_ids)
+
+        await self.datasource.leave_team(self.team.id, user_ids[0])
+        self.assertEqual(await self._count(UserTeamModel, team_id=self.team.id), 2)
+        self.assertFalse(await self.datasource.is_team_member(self.team.id, user_ids[0]))
+
+        await self.datasource.leave_team(self.team.id, self.creator_id)
+        self.assertEqual(await self._count(UserTeamModel, team_id=self.team.id), 0)
+        self.assertEqual(await self._count(TeamModel, id=self.team.id), 0)
+
+    async def test_migration_removes_duplicate_memberships(self):
+        user_id = (await self._add_users(1))[0]
+        await self.db.execute(text("DROP INDEX uq_user_team_user_id_team_id"))
+        await self.db.execute(insert(UserTeamModel), [
+            {'id': str(uuid4()), 'user_id': user_id, 'team_id': self.team.id} for _ in range(3)])
+        await self.db.commit()
+
+        await self.db.run_sync(unique_team_members.upgrade)
+        self.assertEqual(await self._count(UserTeamModel, user_id=user_id), 1)
+        indexes = (await self.db.execute(text("PRAGMA index_list('user_team')"))).all()
+        self.assertIn('uq_user_team_user_id_team_id', [index[1] for index in indexes])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from app.data.datasources.remote.image_index import MemoryImageIndex, content_hash
+from app.data.datasources.remote.images import dhash
+from app.data.datasources.remote.storage import LocalStorage
+from app.data.datasources.remote.upload import UploadRemoteDataSourceImpl
+from benchmarks.ai_stub import PNG
+from core.errors.exceptions import ServerException
+
+MEDIA_URL = 'https://media.example.com'
+
+
+class TestUploads(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.media = tempfile.TemporaryDirectory()
+        self.index = MemoryImageIndex()
+        self.datasource = UploadRemoteDataSourceImpl(
+            storage=LocalStorage(self.media.name, MEDIA_URL, chunk_size=64 * 1024),
+            max_bytes=64 * 1024 * 1024,
+            index=self.index
+        )
+
+    async def asyncTearDown(self) -> None:
+        self.media.cleanup()
+
+    def _stored(self, upload):
+        return os.path.join(self.media.name, upload.url.rsplit('/', 1)[1])
+
+    async def test_create_upload(self):
+        upload = await self.datasource.create_upload(io.BytesIO(PNG))
+        self.assertEqual(upload.url, f'{MEDIA_URL}/{upload.id}.png')
+        self.assertEqual((upload.content_type, upload.size), ('image/png', len(PNG)))
+        with open(self._stored(upload), 'rb') as stored:
+            self.assertEqual(stored.read(), PNG)
+
+    async def test_reuploads_are_deduplicated(self):
+        upload = await self.datasource.create_upload(io.BytesIO(PNG))
+        again = await self.datasource.create_upload(io.BytesIO(PNG))
+        self.assertEqual((again.id, again.url, again.size), (upload.id, upload.url, len(PNG)))
+        self.assertEqual(os.listdir(self.media.name), [f'{upload.id}.png'])
+
+        similar, = await self.index.near_duplicates(dhash(PNG))
+        self.assertEqual((similar.sha256, similar.url), (content_hash(PNG), upload.url))
+
+    async def test_rejects_invalid_uploads(self):
+        with self.assertRaises(ServerException):
+            await self.datasource.create_upload(io.BytesIO(b''))
+        with self.assertRaises(ServerException):
+            await self.datasource.create_upload(io.BytesIO(b'not an image' * 100))
+        self.datasource.max_bytes = len(PNG) - 1
+        with self.assertRaises(ServerException):
+            await self.datasource.create_upload(io.BytesIO(PNG))
+        self.assertEqual(os.listdir(self.media.name), [])
+
+    async def test_large_upload_is_streamed(self):
+        size = 32 * 1024 * 1024
+        with tempfile.TemporaryFile() as file:
+            file.write(PNG)
+            file.truncate(size)
+
+            tracemalloc.start()
+            try:
+                upload = await self.datasource.create_upload(file)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertEqual(upload.size, size)
+        self.assertEqual(os.path.getsize(self._stored(upload)), size)
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
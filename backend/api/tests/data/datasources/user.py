@@ -0,0 +1,185 @@
+import random
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+import jwt
+from app.data.counters import reconcile_follow_counters
+from app.data.datasources.local.user import UserLocalDataSourceImpl
+from app.data.migrations import follow_counters, follow_indexes, search
+from app.data.models.user import UserModel, user_following
+from app.domain.entities.user import UpdatUserRequest
+from core.common.current_user import get_user_from_token, principal_cache
+from core.errors.exceptions import CacheException
+from fastapi import HTTPException
+from sqlalchemy import event, func, insert, select, text, update
+from tests.database import AsyncDatabaseTestCase
+
+SECRET_KEY = 'test-secret-key-0123456789abcdef'
+ALGORITHM = 'HS256'
+
+
+class TestCurrentUser(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        await self.db.run_sync(search.upgrade)
+        self.datasource = UserLocalDataSourceImpl(db=self.db)
+
+        self.user_id = str(uuid4())
+        self.email = 'user@example.com'
+        self.db.add(UserModel(id=self.user_id, first_name="First", last_name="Last",
+                              email=self.email, password="password"))
+        await self.db.commit()
+
+        self.keys = patch.multiple('core.common.current_user', SECRET_KEY=SECRET_KEY, ALGORITHM=ALGORITHM)
+        self.keys.start()
+        principal_cache.clear()
+        self.queries = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._count_query)
+
+    async def asyncTearDown(self) -> None:
+        self.keys.stop()
+        principal_cache.clear()
+        await super().asyncTearDown()
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    def _token(self, **claims):
+        return jwt.encode(dict({'email': self.email, 'id': self.user_id}, **claims), SECRET_KEY, algorithm=ALGORITHM)
+
+    async def _authenticate(self, token=None):
+        self.queries = 0
+        principal = await get_user_from_token(token or self._token(), self.db)
+        return principal, self.queries
+
+    async def test_principal_is_cached(self):
+        principal, queries = await self._authenticate()
+        self.assertEqual((principal.id, principal.email, principal.first_name, queries),
+                         (self.user_id, self.email, 'First', 1))
+        self.assertEqual(await self._authenticate(), (principal, 0))
+
+    async def test_update_and_delete_invalidate(self):
+        await self._authenticate()
+        await self.datasource.update_user(UpdatUserRequest(
+            firstName='Renamed', lastName=None, bio=None, email=None, country=None, image=None), self.user_id)
+        principal, queries = await self._authenticate()
+        self.assertEqual((principal.first_name, queries), ('Renamed', 1))
+
+        await self.datasource.delete_user(self.user_id)
+        with self.assertRaises(HTTPException):
+            await self._authenticate()
+
+    async def test_invalid_tokens_are_rejected(self):
+        await self._authenticate()
+        for token in (self._token(id=str(uuid4())), self._token(email='other@example.com'),
+                      jwt.encode({'email': self.email, 'id': self.user_id}, 'wrong-secret-key-0123456789abcdef',
+                                 algorithm=ALGORITHM)):
+            with self.assertRaises(HTTPException):
+                await self._authenticate(token)
+
+
+class TestUserLists(AsyncDatabaseTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.datasource = UserLocalDataSourceImpl(db=self.db)
+        self.user_ids = sorted(str(uuid4()) for _ in range(30))
+        await self.db.execute(insert(UserModel), [
+            {'id': user_id, 'first_name': 'First', 'last_name': 'Last',
+             'email': f'{user_id}@example.com', 'password': 'password'}
+            for user_id in self.user_ids
+        ])
+        self.user_id = self.user_ids[0]
+        await self.db.execute(insert(user_following), [
+            {'follower_id': user_id, 'following_id': self.user_id} for user_id in self.user_ids[1:]
+        ] + [{'follower_id': self.user_id, 'following_id': user_id} for user_id in self.user_ids[1:4]])
+        await self.db.commit()
+        await self.db.run_sync(reconcile_follow_counters)
+        self.queries = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._count_query)
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    async def _queries(self, call):
+        self.queries = 0
+        result = await call
+        return result, self.queries
+
+    async def test_pages_cost_constant_queries(self):
+        for method, args in ((self.datasource.view_users, ()), (self.datasource.followers, (self.user_id,)),
+                             (self.datasource.following, (self.user_id,))):
+            _, few_queries = await self._queries(method(*args, limit=2))
+            _, many_queries = await self._queries(method(*args, limit=25))
+            self.assertEqual(few_queries, many_queries)
+
+    async def test_followers_are_paginated(self):
+        first = await self.datasource.followers(self.user_id, limit=10)
+        rest = await self.datasource.followers(self.user_id, skip=10, limit=100)
+        self.assertEqual([user.id for user in first + rest], self.user_ids[1:])
+        self.assertEqual({(user.followers, user.following) for user in rest}, {(0, 1)})
+
+        following = await self.datasource.following(self.user_id, skip=1, limit=10)
+        self.assertEqual([(user.id, user.followers, user.following) for user in following],
+                         [(user_id, 1, 1) for user_id in self.user_ids[2:4]])
+
+        users = await self.datasource.view_users(limit=1)
+        self.assertEqual([(user.id, user.followers, user.following) for user in users], [(self.user_id, 29, 3)])
+
+        with self.assertRaises(CacheException):
+            await self.datasource.followers(str(uuid4()))
+
+    async def test_migration_adds_reverse_index(self):
+        await self.db.execute(text("DROP INDEX ix_user_following_following_id"))
+        await self.db.run_sync(follow_indexes.upgrade)
+        indexes = (await self.db.execute(text("PRAGMA index_list('user_following')"))).all()
+        self.assertIn('ix_user_following_following_id', [index[1] for index in indexes])
+
+
+    async def test_profile_read_is_one_query(self):
+        user, queries = await self._queries(self.datasource.view_user(self.user_id))
+        self.assertEqual((user.followers, user.following, queries), (29, 3, 1))
+
+    async def _actual_counts(self):
+        followers = dict((await self.db.execute(
+            select(user_following.c.following_id, func.count()).group_by(user_following.c.following_id))).all())
+        following = dict((await self.db.execute(
+            select(user_following.c.follower_id, func.count()).group_by(user_following.c.follower_id))).all())
+        users = (await self.db.execute(
+            select(UserModel.id, UserModel.followers_count, UserModel.following_count)
+            .execution_options(populate_existing=True))).all()
+        return ({user_id: (followers.get(user_id, 0), following.get(user_id, 0)) for user_id, _, _ in users},
+                {user_id: (followers_count, following_count) for user_id, followers_count, following_count in users})
+
+    async def test_counters_stay_consistent(self):
+        rng = random.Random(20)
+        for _ in range(200):
+            user_id, other_id = rng.sample(self.user_ids, 2)
+            if rng.random() < 0.6:
+                user = await self.datasource.follow(user_id, other_id)
+            else:
+                user = await self.datasource.unfollow(user_id, other_id)
+            self.assertEqual(user.following, await self.db.scalar(
+                select(func.count()).select_from(user_following).where(user_following.c.follower_id == user_id)))
+
+        for user_id in rng.sample(self.user_ids, 5):
+            await self.datasource.delete_user(user_id)
+
+        actual, stored = await self._actual_counts()
+        self.assertEqual(stored, actual)
+        self.assertEqual(await self.db.run_sync(reconcile_follow_counters), 0)
+
+    async def test_migration_repairs_counters(self):
+        await self.db.execute(update(UserModel).values(followers_count=0, following_count=7))
+        await self.db.commit()
+
+        await self.db.run_sync(follow_counters.upgrade)
+        actual, stored = await self._actual_counts()
+        self.assertEqual(stored, actual)
+        self.assertEqual(stored[self.user_id], (29, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import unittest
+
+from app.data.realtime import TeamChatHub
+from app.data.realtime.pubsub import MemoryPubSub, RedisPubSub
+
+
+class LocalRedis:
+
+    def __init__(self) -> None:
+        self.subscriptions = {}
+        self.failures = 0
+
+    async def publish(self, channel, data):
+        queues = self.subscriptions.get(channel, set())
+        for queue in queues:
+            queue.put_nowait({'type': 'message', 'channel': channel.encode(), 'data': data.encode()})
+        return len(queues)
+
+    def pubsub(self):
+        return LocalRedisPubSub(self)
+
+    async def aclose(self):
+        ...
+
+
+class LocalRedisPubSub:
+
+    def __init__(self, redis: LocalRedis) -> None:
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.redis.subscriptions.setdefault(channel, set()).add(self.queue)
+            self.queue.put_nowait({'type': 'subscribe', 'channel': channel.encode(), 'data': 1})
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            self.redis.subscriptions.get(channel, set()).discard(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if self.redis.failures:
+            self.redis.failures -= 1
+            raise ConnectionError('Connection reset by peer')
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+        if ignore_subscribe_messages and message['type'] != 'message':
+            return None
+        return message
+
+    async def aclose(self):
+        for queues in self.redis.subscriptions.values():
+            queues.discard(self.queue)
+
+
+class TestTeamChatHub(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.hub = TeamChatHub(MemoryPubSub(), queue_size=4)
+
+    async def asyncTearDown(self) -> None:
+        await self.hub.close()
+
+    async def _receive(self, subscriber, count):
+        received = []
+        async for data in subscriber:
+            received.append(json.loads(data)['message'])
+            if len(received) == count:
+                return received
+        return received
+
+    async def test_publish_fans_out_to_chat_members(self):
+        first = await self.hub.join('team')
+        second = await self.hub.join('team')
+        other = await self.hub.join('other')
+
+        task = self.hub.publish('team', [{'seq': 1}, {'seq': 2}])
+        self.assertFalse(task.done())
+        await task
+
+        for subscriber in (first, second):
+            self.assertEqual(await asyncio.wait_for(self._receive(subscriber, 2), 1), [{'seq': 1}, {'seq': 2}])
+        self.assertTrue(other.queue.empty())
+
+        await self.hub.leave(first)
+        await self.hub.leave(second)
+        self.assertEqual(list(self.hub.subscribers), ['other'])
+        self.assertNotIn('team-chat:team', self.hub.pubsub.handlers)
+
+    async def test_slow_subscriber_is_dropped(self):
+        slow = await self.hub.join('team')
+        fast = await self.hub.join('team')
+        received = asyncio.create_task(self._receive(fast, 6))
+        for seq in range(6):
+            await self.hub.publish('team', [{'seq': seq}])
+            await asyncio.sleep(0)
+
+        self.assertEqual([message['seq'] for message in await asyncio.wait_for(received, 1)], list(range(6)))
+        self.assertTrue(slow.dropped)
+        self.assertEqual([data async for data in slow], [])
+
+    async def test_redis_backend_fans_out_across_workers(self):
+        redis = LocalRedis()
+        workers = [TeamChatHub(RedisPubSub(redis, poll_timeout=0.05)) for _ in range(2)]
+        try:
+            subscribers = [await worker.join('team') for worker in workers]
+            await workers[0].publish('team', [{'seq': 1}])
+            for subscriber in subscribers:
+                self.assertEqual(await asyncio.wait_for(self._receive(subscriber, 1), 1), [{'seq': 1}])
+
+            await workers[1].leave(subscribers[1])
+            self.assertEqual(len(redis.subscriptions['team-chat:team']), 1)
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    async def test_redis_read_errors_are_logged(self):
+        redis = LocalRedis()
+        worker = TeamChatHub(RedisPubSub(redis, poll_timeout=0.05))
+        try:
+            subscriber = await worker.join('team')
+            with self.assertLogs('app.data.realtime.pubsub', 'ERROR') as logs:
+                redis.failures = 1
+                await asyncio.sleep(0.1)
+            self.assertIn('Connection reset by peer', logs.output[0])
+
+            await worker.publish('team', [{'seq': 1}])
+            self.assertEqual(await asyncio.wait_for(self._receive(subscriber, 1), 1), [{'seq': 1}])
+        finally:
+            await worker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from app.data.models import chat, image, job, migration, post, team, user
+from core.config.database_config import Base
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+
+def enable_foreign_keys(connection, record):
+    connection.execute("PRAGMA foreign_keys=ON")
+
+
+class AsyncDatabaseTestCase(unittest.IsolatedAsyncioTestCase):
+
+    database_file = False
+    foreign_keys = False
+
+    async def asyncSetUp(self) -> None:
+        if self.database_file:
+            self.directory = tempfile.TemporaryDirectory()
+            self.engine = create_async_engine(
+                f"sqlite+aiosqlite:///{os.path.join(self.directory.name, 'test.db')}")
+        else:
+            self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        if self.foreign_keys:
+            event.listen(self.engine.sync_engine, "connect", enable_foreign_keys)
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        self.session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.db = self.session_factory()
+
+    async def asyncTearDown(self) -> None:
+        await self.db.close()
+        await self.engine.dispose()
+        if self.database_file:
+            self.directory.cleanup()
@@ -22,7 +22,7 @@ class TestViewChat(unittest.IsolatedAsyncioTestCase):
         result = await self.use_case(params)
         self.assertTrue(result.is_right())
         self.assertEqual(result.get(), expected_chat_entity)
-        self.repository.view_chat.assert_called_once_with(chat_id)
+        self.repository.view_chat.assert_called_once_with(chat_id, None, None, None)
         
     async def test_view_chat_failure(self):
         chat_id = '2'  # Replace with a valid chat ID
@@ -32,7 +32,15 @@ class TestViewChat(unittest.IsolatedAsyncioTestCase):
         result = await self.use_case(params)
         self.assertTrue(result.is_left())
         self.assertEqual(result.get(), Failure())
-        self.repository.view_chat.assert_called_once_with(chat_id)
+        self.repository.view_chat.assert_called_once_with(chat_id, None, None, None)
+
+    async def test_view_chat_pagination(self):
+        chat_id = '3'
+        params = Params(chat_id, before=40, after=10, limit=20)
+        self.repository.view_chat.return_value = Either.left(Failure())
+
+        await self.use_case(params)
+        self.repository.view_chat.assert_called_once_with(chat_id, 40, 10, 20)
 
 if __name__ == '__main__':
     unittest.main()